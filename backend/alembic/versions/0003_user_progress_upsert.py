@@ -0,0 +1,30 @@
+"""user_progress: target_id for one row per (user, type, target)
+
+Revision ID: 0003_progress_upsert
+Revises: 0002_holds_rollups
+Create Date: 2026-10-19 16:05:41.208317
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003_progress_upsert'
+down_revision = '0002_holds_rollups'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Expand only: the build still serving traffic while this runs inserts a
+    # new row per save with target_id left at 0, so the collapse and the
+    # unique index wait for 0009_contract_progress_units, which deploy.sh
+    # runs once this release is live.
+    op.add_column('user_progress', sa.Column('target_id', sa.Integer(), server_default='0', nullable=False))
+    op.execute("UPDATE user_progress SET target_id = COALESCE(lesson_id, roadmap_id, 0)")
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('user_progress') as batch_op:
+        batch_op.drop_column('target_id')
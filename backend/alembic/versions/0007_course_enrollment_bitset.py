@@ -0,0 +1,76 @@
+"""course_enrollments: bitset progress with completion computed on write
+
+Revision ID: 0007_enrollment_bitset
+Revises: 0006_ledger_archive
+Create Date: 2026-10-19 21:02:13.550184
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007_enrollment_bitset'
+down_revision = '0006_ledger_archive'
+branch_labels = None
+depends_on = None
+
+# Unit counts from app/services/course_catalog.py when this was written,
+# frozen so later catalog edits don't change what the migration computes.
+# 0009_contract_progress_units carries the same map.
+_COURSE_UNITS = {
+    "python-fundamentals": 10,
+    "javascript-essentials": 10,
+    "react-development": 10,
+    "data-science-python": 10,
+    "web-development-fullstack": 10,
+    "sql-databases": 10,
+    "git-devops": 10,
+    "machine-learning": 10,
+}
+
+
+def upgrade() -> None:
+    op.add_column('course_enrollments', sa.Column('completed_mask', sa.BigInteger(), server_default='0', nullable=False))
+    op.add_column('course_enrollments', sa.Column('completed_count', sa.Integer(), server_default='0', nullable=False))
+
+    # Fold the JSON unit lists into the bitset, and set `completed`, which
+    # nothing wrote before. completed_units stays for the previous build,
+    # which still reads and writes it until the contract migration drops it.
+    bind = op.get_bind()
+    enrollments = sa.table(
+        'course_enrollments',
+        sa.column('id', sa.Integer()), sa.column('course_id', sa.String()),
+        sa.column('completed_units', sa.JSON()), sa.column('completed_mask', sa.BigInteger()),
+        sa.column('completed_count', sa.Integer()), sa.column('completed', sa.Boolean()),
+    )
+    rows = bind.execute(sa.select(enrollments.c.id, enrollments.c.course_id, enrollments.c.completed_units)).all()
+    for row in rows:
+        mask = 0
+        for unit in row.completed_units or []:
+            if isinstance(unit, int) and 0 <= unit < 63:
+                mask |= 1 << unit
+        if mask:
+            values = {'completed_mask': mask, 'completed_count': bin(mask).count('1')}
+            if row.course_id in _COURSE_UNITS:
+                full = (1 << _COURSE_UNITS[row.course_id]) - 1
+                values['completed'] = mask & full == full
+            bind.execute(enrollments.update().where(enrollments.c.id == row.id).values(**values))
+
+    op.create_index('ix_course_enrollments_user_course', 'course_enrollments', ['user_id', 'course_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_course_enrollments_user_course', table_name='course_enrollments')
+    bind = op.get_bind()
+    enrollments = sa.table(
+        'course_enrollments',
+        sa.column('id', sa.Integer()), sa.column('completed_units', sa.JSON()),
+        sa.column('completed_mask', sa.BigInteger()),
+    )
+    for row in bind.execute(sa.select(enrollments.c.id, enrollments.c.completed_mask)).all():
+        units = [i for i in range(row.completed_mask.bit_length()) if row.completed_mask >> i & 1]
+        bind.execute(enrollments.update().where(enrollments.c.id == row.id).values(completed_units=units))
+    with op.batch_alter_table('course_enrollments') as batch_op:
+        batch_op.drop_column('completed_count')
+        batch_op.drop_column('completed_mask')
@@ -0,0 +1,28 @@
+"""users.deletion_requested_at: the account purge sweep's marker
+
+Not backfilled: an inactive account may be an operator suspension rather
+than a pending deletion, and only DELETE /api/auth/me sets the marker.
+
+Revision ID: 0008_deletion_requested
+Revises: 0007_enrollment_bitset
+Create Date: 2026-10-20 00:14:52.604118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0008_deletion_requested'
+down_revision = '0007_enrollment_bitset'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('deletion_requested_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('deletion_requested_at')
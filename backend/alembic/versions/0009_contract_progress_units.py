@@ -0,0 +1,112 @@
+"""contract: unique user_progress key, drop course_enrollments.completed_units
+
+Runs once this release's build is live (scripts/deploy.sh), so the
+previous build never sees the destructive half of this release's changes.
+
+Revision ID: 0009_contract_progress_units
+Revises: 0008_deletion_requested
+Create Date: 2026-10-19 23:41:07.316952
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0009_contract_progress_units'
+down_revision = '0008_deletion_requested'
+branch_labels = None
+depends_on = None
+
+# Frozen copy of 0007_enrollment_bitset's map
+_COURSE_UNITS = {
+    "python-fundamentals": 10,
+    "javascript-essentials": 10,
+    "react-development": 10,
+    "data-science-python": 10,
+    "web-development-fullstack": 10,
+    "sql-databases": 10,
+    "git-devops": 10,
+    "machine-learning": 10,
+}
+
+
+def upgrade() -> None:
+    # Rows the previous build inserted after 0003 left target_id at 0
+    op.execute("UPDATE user_progress SET target_id = COALESCE(lesson_id, roadmap_id, 0) WHERE target_id = 0")
+
+    # Collapse the append-only history into one row per key before the unique
+    # index goes on: keep the newest row (latest completion), sum time_spent
+    # and concatenate quiz_scores oldest-first — what the upsert would have built.
+    bind = op.get_bind()
+    progress = sa.table(
+        'user_progress',
+        sa.column('id', sa.Integer()), sa.column('user_id', sa.Integer()),
+        sa.column('progress_type', sa.String()), sa.column('target_id', sa.Integer()),
+        sa.column('time_spent', sa.Integer()), sa.column('quiz_scores', sa.JSON()),
+    )
+    duplicated = bind.execute(
+        sa.select(progress.c.user_id, progress.c.progress_type, progress.c.target_id)
+        .group_by(progress.c.user_id, progress.c.progress_type, progress.c.target_id)
+        .having(sa.func.count() > 1)
+    ).all()
+    for user_id, progress_type, target_id in duplicated:
+        rows = bind.execute(
+            sa.select(progress.c.id, progress.c.time_spent, progress.c.quiz_scores)
+            .where(progress.c.user_id == user_id, progress.c.progress_type == progress_type,
+                   progress.c.target_id == target_id)
+            .order_by(progress.c.id)
+        ).all()
+        keep_id = rows[-1].id
+        scores = [score for row in rows for score in (row.quiz_scores or [])]
+        bind.execute(
+            progress.update().where(progress.c.id == keep_id).values(
+                time_spent=sum(row.time_spent or 0 for row in rows),
+                quiz_scores=scores or sa.null(),
+            )
+        )
+        bind.execute(progress.delete().where(progress.c.id.in_([row.id for row in rows[:-1]])))
+
+    op.create_index('uq_user_progress_user_type_target', 'user_progress',
+                    ['user_id', 'progress_type', 'target_id'], unique=True)
+
+    # Units the previous build recorded in completed_units after 0007 ran are
+    # OR'ed into the bitset before the column goes
+    enrollments = sa.table(
+        'course_enrollments',
+        sa.column('id', sa.Integer()), sa.column('course_id', sa.String()),
+        sa.column('completed_units', sa.JSON()), sa.column('completed_mask', sa.BigInteger()),
+        sa.column('completed_count', sa.Integer()), sa.column('completed', sa.Boolean()),
+    )
+    rows = bind.execute(
+        sa.select(enrollments.c.id, enrollments.c.course_id, enrollments.c.completed_units, enrollments.c.completed_mask)
+        .where(enrollments.c.completed_units.isnot(None))
+    ).all()
+    for row in rows:
+        mask = row.completed_mask or 0
+        for unit in row.completed_units or []:
+            if isinstance(unit, int) and 0 <= unit < 63:
+                mask |= 1 << unit
+        if mask != row.completed_mask:
+            values = {'completed_mask': mask, 'completed_count': bin(mask).count('1')}
+            if row.course_id in _COURSE_UNITS:
+                full = (1 << _COURSE_UNITS[row.course_id]) - 1
+                values['completed'] = mask & full == full
+            bind.execute(enrollments.update().where(enrollments.c.id == row.id).values(**values))
+
+    with op.batch_alter_table('course_enrollments') as batch_op:
+        batch_op.drop_column('completed_units')
+
+
+def downgrade() -> None:
+    op.add_column('course_enrollments', sa.Column('completed_units', sa.JSON(), nullable=True))
+    bind = op.get_bind()
+    enrollments = sa.table(
+        'course_enrollments',
+        sa.column('id', sa.Integer()), sa.column('completed_units', sa.JSON()),
+        sa.column('completed_mask', sa.BigInteger()),
+    )
+    for row in bind.execute(sa.select(enrollments.c.id, enrollments.c.completed_mask)).all():
+        units = [i for i in range(row.completed_mask.bit_length()) if row.completed_mask >> i & 1]
+        bind.execute(enrollments.update().where(enrollments.c.id == row.id).values(completed_units=units))
+    op.drop_index('uq_user_progress_user_type_target', table_name='user_progress')
@@ -4,10 +4,12 @@ from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials, OAuth2PasswordBearer
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from authlib.integrations.starlette_client import OAuth
-from app.database import get_db
+from app.database import get_async_db, get_db
 from app.models import User
+from app import user_cache
 import os
 
 SECRET_KEY = os.environ["SECRET_KEY"]
@@ -53,26 +55,44 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def _user_id_from_token(token: str) -> int:
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         sub = payload.get("sub")
         if sub is None:
-            raise credentials_exception
+            raise _credentials_exception()
         try:
-            user_id = int(sub)
+            return int(sub)
         except (TypeError, ValueError):
-            raise credentials_exception
+            raise _credentials_exception()
     except JWTError:
-        raise credentials_exception
-    user = db.query(User).filter(User.id == user_id).first()
+        raise _credentials_exception()
+
+
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    user_id = _user_id_from_token(token)
+    # Usually served from the short-TTL user cache — see app/user_cache.py
+    user = user_cache.get_user(db, user_id)
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
+    return user
+
+
+async def get_current_user_async(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
+    """get_current_user for async routes — same user cache, with a cache
+    miss awaiting on the async engine instead of blocking the event loop."""
+    user_id = _user_id_from_token(token)
+    user = await db.run_sync(user_cache.get_user, user_id)
+    if user is None:
+        raise _credentials_exception()
     return user
 
 
@@ -88,7 +108,24 @@ def get_current_user_optional(
         user_id = payload.get("sub")
         if user_id is None:
             return None
-        return db.query(User).filter(User.id == int(user_id)).first()
+        return user_cache.get_user(db, int(user_id))
     except JWTError:
         return None
 
+
+
+async def get_current_user_optional_async(
+    credentials: HTTPAuthorizationCredentials | None = Depends(optional_bearer),
+    db: AsyncSession = Depends(get_async_db),
+) -> User | None:
+    """get_current_user_optional for async routes."""
+    if not credentials or not credentials.credentials:
+        return None
+    try:
+        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
+        user_id = payload.get("sub")
+        if user_id is None:
+            return None
+        return await db.run_sync(user_cache.get_user, int(user_id))
+    except JWTError:
+        return None
@@ -9,12 +9,45 @@ vars are set — this makes Redis an upgrade, not a hard requirement.
 Also the basis for rate_limit.py's cross-instance limiting: it uses
 cache_incr() to get a true global count when Redis is configured, falling
 back to its own per-process in-memory sliding window otherwise.
+
+The in-memory store is a bounded LRU (CACHE_MEMORY_MAX_ENTRIES, default
+10000): video/job search keys and the per-window ratelimit:* counters are
+all unique-per-time keys that are never read again once they expire, so a
+plain dict grew for the life of the worker. Expired entries are also swept
+in bulk every CACHE_MEMORY_SWEEP_SECONDS (default 60), piggybacking on
+writes — no background thread, so it behaves the same on serverless.
+cache_stats() reports entries, approximate bytes, hits/misses and evictions.
+
+With Upstash configured, every cache_get is an HTTPS round trip (tens of
+ms). Keys whose prefix has a near-cache policy (CACHE_NEAR_POLICIES, e.g.
+video_search:=300) are also kept in a second, smaller in-process LRU (L1)
+for that many seconds, so a hot search is answered in microseconds; Redis
+stays the cross-instance source of truth (L2) and is always written
+through. An L1 hit can be up to the policy TTL stale relative to Redis, so
+only prefixes that tolerate that get a policy — not db:primary_until:*,
+whose read-your-writes pin must be seen by every instance at once.
+
+Expensive upstream lookups (YouTube for video.py, Adzuna for jobs.py) go
+through cache_get_or_fetch(), which adds stale-while-revalidate: an entry
+is fresh for its soft TTL and kept until its hard TTL. A stale hit is
+returned at once while the route's BackgroundTasks refetch it after the
+response is sent — deduplicated across instances by a short swr_lock:*
+counter — so a popular query never waits on the upstream; only a miss or
+an entry past its hard TTL blocks. The refresh is tied to the request
+rather than a detached asyncio task, which a serverless runtime may freeze
+before it runs while the lock holds every other instance off. A failed
+refresh is logged and the stale value served until the hard TTL.
 """
 import os
 import json
+import sys
+import threading
 import time
 import logging
-from typing import Any
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable
+
+from fastapi import BackgroundTasks
 
 logger = logging.getLogger(__name__)
 
@@ -44,63 +77,390 @@ def _get_redis():
         return None
 
 
-# In-memory fallback store: key -> {value, expires_at}
-_memory_store: dict[str, dict] = {}
+CACHE_MEMORY_MAX_ENTRIES = int(os.getenv("CACHE_MEMORY_MAX_ENTRIES", "10000"))
+CACHE_MEMORY_SWEEP_SECONDS = float(os.getenv("CACHE_MEMORY_SWEEP_SECONDS", "60"))
+
+
+def _approx_size(key: str, value: Any) -> int:
+    """Rough bytes held for an entry — the JSON size of the value stands in
+    for the object graph, which sys.getsizeof doesn't follow."""
+    if isinstance(value, (int, float)):
+        return sys.getsizeof(key) + sys.getsizeof(value)
+    try:
+        return sys.getsizeof(key) + len(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return sys.getsizeof(key) + sys.getsizeof(value)
+
+
+class MemoryCache:
+    """Thread-safe LRU of key -> (expires_at, size, value), bounded by entry
+    count, with expired entries dropped on read, when evicting, and by a
+    periodic sweep."""
+
+    def __init__(self, max_entries: int, sweep_seconds: float):
+        self.max_entries = max_entries
+        self.sweep_seconds = sweep_seconds
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[float, int, Any]] = OrderedDict()
+        self._bytes = 0
+        self._next_sweep = time.monotonic() + sweep_seconds
+        self.hits = self.misses = self.evictions = self.expirations = self.sweeps = 0
+
+    def get(self, key: str) -> Any | None:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[2]
+            if entry is not None:
+                self._drop(key)
+                self.expirations += 1
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: Any, ttl_seconds: float) -> None:
+        size = _approx_size(key, value)
+        now = time.monotonic()
+        with self._lock:
+            self._store(key, value, now + ttl_seconds, size, now)
+
+    def incr(self, key: str, ttl_seconds: float) -> int:
+        """Increment a live counter, keeping its expiry; start a new one at 1."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now and isinstance(entry[2], int):
+                self._entries[key] = (entry[0], entry[1], entry[2] + 1)
+                self._entries.move_to_end(key)
+                return entry[2] + 1
+            self._store(key, 1, now + ttl_seconds, _approx_size(key, 1), now)
+            return 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "approx_bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "sweeps": self.sweeps,
+            }
+
+    # ─── Internals (caller holds the lock) ─────────────────────────────────
+
+    def _store(self, key: str, value: Any, expires_at: float, size: int, now: float) -> None:
+        if key in self._entries:
+            self._drop(key)
+        self._entries[key] = (expires_at, size, value)
+        self._bytes += size
+        if now >= self._next_sweep:
+            self._sweep(now)
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            expired = self._entries[oldest][0] <= now
+            self._drop(oldest)
+            if expired:
+                self.expirations += 1
+            else:
+                self.evictions += 1
+
+    def _drop(self, key: str) -> None:
+        self._bytes -= self._entries.pop(key)[1]
+
+    def _sweep(self, now: float) -> None:
+        expired = [key for key, (expires_at, _, _) in self._entries.items() if expires_at <= now]
+        for key in expired:
+            self._drop(key)
+        self.expirations += len(expired)
+        self.sweeps += 1
+        self._next_sweep = now + self.sweep_seconds
+
+
+# In-memory fallback store, also used for the rest of a request when a Redis call fails
+_memory = MemoryCache(CACHE_MEMORY_MAX_ENTRIES, CACHE_MEMORY_SWEEP_SECONDS)
+
+
+# ─── L1 near-cache in front of Upstash ────────────────────────────────────
+
+CACHE_NEAR_MAX_ENTRIES = int(os.getenv("CACHE_NEAR_MAX_ENTRIES", "2000"))
+_DEFAULT_NEAR_POLICIES = "video_search:=300,jobs_search:=120"
+
+
+def _parse_near_policies(raw: str) -> dict[str, float]:
+    """"prefix=seconds,..." -> {prefix: seconds}; 0 or a bad entry disables a prefix."""
+    policies = {}
+    for item in raw.split(","):
+        prefix, _, seconds = item.strip().rpartition("=")
+        try:
+            if prefix and float(seconds) > 0:
+                policies[prefix] = float(seconds)
+        except ValueError:
+            logger.warning("Ignoring malformed CACHE_NEAR_POLICIES entry %r", item)
+    return policies
+
+
+CACHE_NEAR_POLICIES = _parse_near_policies(os.getenv("CACHE_NEAR_POLICIES", _DEFAULT_NEAR_POLICIES))
+
+_near = MemoryCache(CACHE_NEAR_MAX_ENTRIES, CACHE_MEMORY_SWEEP_SECONDS)
+_redis_stats_lock = threading.Lock()
+_redis_stats = {"hits": 0, "misses": 0, "errors": 0}
+
+
+def _near_ttl(key: str) -> float | None:
+    """L1 TTL for `key` from the longest matching prefix policy, or None."""
+    matches = [prefix for prefix in CACHE_NEAR_POLICIES if key.startswith(prefix)]
+    return CACHE_NEAR_POLICIES[max(matches, key=len)] if matches else None
+
+
+def _count_redis(outcome: str) -> None:
+    with _redis_stats_lock:
+        _redis_stats[outcome] += 1
 
 
 def cache_get(key: str) -> Any | None:
     """Get a cached value (JSON-decoded). Returns None on miss or if expired."""
     client = _get_redis()
     if client is not None:
+        near_ttl = _near_ttl(key)
+        if near_ttl is not None:
+            value = _near.get(key)
+            if value is not None:
+                return value
         try:
             raw = client.get(key)
-            return json.loads(raw) if raw else None
         except Exception as e:
+            _count_redis("errors")
             logger.warning("Redis get failed for key %s: %s", key, e)
             return None
+        _count_redis("hits" if raw else "misses")
+        value = json.loads(raw) if raw else None
+        if value is not None and near_ttl is not None:
+            _near.set(key, value, near_ttl)
+        return value
 
-    entry = _memory_store.get(key)
-    if entry and time.time() < entry["expires_at"]:
-        return entry["value"]
-    if entry:
-        del _memory_store[key]
-    return None
+    return _memory.get(key)
 
 
 def cache_set(key: str, value: Any, ttl_seconds: int) -> None:
     """Set a cached value with a TTL, JSON-encoded."""
     client = _get_redis()
     if client is not None:
+        near_ttl = _near_ttl(key)
+        if near_ttl is not None:
+            _near.set(key, value, min(near_ttl, ttl_seconds))
         try:
             client.set(key, json.dumps(value), ex=ttl_seconds)
             return
         except Exception as e:
+            _count_redis("errors")
             logger.warning("Redis set failed for key %s: %s", key, e)
             # fall through to memory store so the cache still works this request
 
-    _memory_store[key] = {"value": value, "expires_at": time.time() + ttl_seconds}
+    _memory.set(key, value, ttl_seconds)
+
+
+def cache_get_many(keys) -> dict[str, Any]:
+    """cache_get for several keys at once: {key: value} for the hits. Keys
+    not answered by the near-cache go to Upstash in one MGET — one round
+    trip however many keys."""
+    keys = list(dict.fromkeys(keys))
+    client = _get_redis()
+    if client is None:
+        return {key: value for key in keys if (value := _memory.get(key)) is not None}
+
+    found, remote = {}, []
+    for key in keys:
+        value = _near.get(key) if _near_ttl(key) is not None else None
+        if value is not None:
+            found[key] = value
+        else:
+            remote.append(key)
+    if not remote:
+        return found
+    try:
+        raws = client.mget(*remote)
+    except Exception as e:
+        _count_redis("errors")
+        logger.warning("Redis mget failed for %d keys: %s", len(remote), e)
+        return found
+    for key, raw in zip(remote, raws):
+        _count_redis("hits" if raw else "misses")
+        if raw:
+            found[key] = json.loads(raw)
+            if (near_ttl := _near_ttl(key)) is not None:
+                _near.set(key, found[key], near_ttl)
+    return found
+
+
+def cache_set_many(items: dict[str, Any], ttl_seconds: int) -> None:
+    """cache_set for several keys with the same TTL. On Upstash this is one
+    MULTI/EXEC request — MSET, then EXPIRE per key (Redis has no MSET EX) —
+    so the batch costs one round trip, and like cache_incr no key is ever
+    visible without its expiry."""
+    if not items:
+        return
+    client = _get_redis()
+    if client is not None:
+        for key, value in items.items():
+            if (near_ttl := _near_ttl(key)) is not None:
+                _near.set(key, value, min(near_ttl, ttl_seconds))
+        try:
+            transaction = client.multi().mset({key: json.dumps(value) for key, value in items.items()})
+            for key in items:
+                transaction = transaction.expire(key, ttl_seconds)
+            transaction.exec()
+            return
+        except Exception as e:
+            _count_redis("errors")
+            logger.warning("Redis mset failed for %d keys: %s", len(items), e)
+
+    for key, value in items.items():
+        _memory.set(key, value, ttl_seconds)
 
 
 def cache_incr(key: str, ttl_seconds: int) -> int:
     """Increment a counter (creating it with the given TTL if new). Returns the new count.
-    Used by the rate limiter for a true cross-instance count once Redis is configured."""
+    Used by the rate limiter for a true cross-instance count once Redis is configured.
+
+    On Upstash this is one MULTI/EXEC request: SET key 0 EX ttl NX creates the
+    counter with its expiry only if it doesn't exist, then INCR (which keeps
+    the TTL) — one round trip instead of INCR + EXPIRE, and no window where a
+    counter exists without an expiry."""
     client = _get_redis()
     if client is not None:
         try:
-            count = client.incr(key)
-            if count == 1:
-                client.expire(key, ttl_seconds)
+            _, count = client.multi().set(key, 0, nx=True, ex=ttl_seconds).incr(key).exec()
             return count
         except Exception as e:
+            _count_redis("errors")
             logger.warning("Redis incr failed for key %s: %s", key, e)
 
-    entry = _memory_store.get(key)
-    now = time.time()
-    if entry and now < entry["expires_at"]:
-        entry["value"] += 1
-        return entry["value"]
-    _memory_store[key] = {"value": 1, "expires_at": now + ttl_seconds}
-    return 1
+    return _memory.incr(key, ttl_seconds)
+
+
+# ─── Stale-while-revalidate ───────────────────────────────────────────────
+
+SWR_REFRESH_LOCK_SECONDS = int(os.getenv("SWR_REFRESH_LOCK_SECONDS", "30"))
+_SWR_FRESH_UNTIL = "swr_fresh_until"
+
+
+def swr_value(entry: Any) -> Any:
+    """The value inside a cache_get_or_fetch() entry, for readers that go
+    through cache_get/cache_get_many directly. Plain entries pass through."""
+    if isinstance(entry, dict) and _SWR_FRESH_UNTIL in entry:
+        return entry.get("value")
+    return entry
+
+
+def _swr_fresh(entry: Any) -> bool:
+    return isinstance(entry, dict) and entry.get(_SWR_FRESH_UNTIL, 0) > time.time()
+
+
+def _swr_entry(value: Any, soft_ttl: int) -> dict:
+    return {_SWR_FRESH_UNTIL: time.time() + soft_ttl, "value": value}
+
+
+def _swr_set(key: str, value: Any, soft_ttl: int, hard_ttl: int) -> None:
+    cache_set(key, _swr_entry(value, soft_ttl), hard_ttl)
+
+
+def swr_set_many(items: dict[str, Any], soft_ttl: int, hard_ttl: int) -> None:
+    """Store several values as cache_get_or_fetch() entries in one
+    cache_set_many — for callers that fetched a batch of misses themselves."""
+    cache_set_many({key: _swr_entry(value, soft_ttl) for key, value in items.items()}, hard_ttl)
+
+
+async def _swr_refresh(key: str, fetch: Callable[[], Awaitable[Any]], soft_ttl: int, hard_ttl: int) -> None:
+    if _swr_fresh(cache_get(key)):
+        return  # another instance refreshed it since our (near-cached) stale read
+    try:
+        value = await fetch()
+    except Exception as e:
+        logger.warning("Background refresh failed for key %s, serving stale: %s", key, e)
+        return
+    if value is not None:
+        _swr_set(key, value, soft_ttl, hard_ttl)
+
+
+def _schedule_refresh(
+    background_tasks: BackgroundTasks, key: str, fetch: Callable[[], Awaitable[Any]], soft_ttl: int, hard_ttl: int,
+) -> None:
+    # First caller in the lock window refreshes; a failed refresh is retried
+    # once the lock expires rather than on every request. While a lock is
+    # held, a plain GET turns the other stale hits away without the MULTI/EXEC.
+    lock_key = f"swr_lock:{key}"
+    if cache_get(lock_key) is not None or cache_incr(lock_key, SWR_REFRESH_LOCK_SECONDS) != 1:
+        return
+    background_tasks.add_task(_swr_refresh, key, fetch, soft_ttl, hard_ttl)
+
+
+async def cache_get_or_fetch(
+    key: str,
+    fetch: Callable[[], Awaitable[Any]],
+    soft_ttl: int,
+    hard_ttl: int,
+    background_tasks: BackgroundTasks,
+) -> tuple[Any, str]:
+    """Cached value for `key`, calling `fetch` to fill it with
+    stale-while-revalidate semantics. Returns (value, status):
+
+    - "fresh": younger than soft_ttl — returned as is.
+    - "stale": past soft_ttl but within hard_ttl — returned at once, and
+      fetch() is added to `background_tasks` (the route's BackgroundTasks,
+      so it runs once the response is sent; one per key across instances).
+    - "miss": absent or past hard_ttl — fetch() is awaited, and its
+      exceptions (e.g. HTTPException) propagate to the caller.
+
+    fetch() returning None isn't cached. Entries written by plain
+    cache_set() before a key moved here count as stale, so they're served
+    and rewritten in the new format on first read.
+    """
+    entry = cache_get(key)
+    if entry is not None:
+        if _swr_fresh(entry):
+            return entry["value"], "fresh"
+        # A stale copy in L1 would outlive the refresh; re-read Redis next time
+        _near.delete(key)
+        _schedule_refresh(background_tasks, key, fetch, soft_ttl, hard_ttl)
+        return swr_value(entry), "stale"
+
+    value = await fetch()
+    if value is not None:
+        _swr_set(key, value, soft_ttl, hard_ttl)
+    return value, "miss"
+
+
+def _with_hit_ratio(stats: dict) -> dict:
+    lookups = stats["hits"] + stats["misses"]
+    return {**stats, "hit_ratio": round(stats["hits"] / lookups, 4) if lookups else None}
+
+
+def cache_stats() -> dict:
+    """Per-tier counters: the in-memory store (the whole cache without
+    Upstash), the L1 near-cache and the Upstash lookups behind it."""
+    with _redis_stats_lock:
+        redis = dict(_redis_stats)
+    return {
+        "backend": "redis" if _get_redis() is not None else "memory",
+        "memory": _with_hit_ratio(_memory.stats()),
+        "near": {**_with_hit_ratio(_near.stats()), "policies": CACHE_NEAR_POLICIES},
+        "redis": _with_hit_ratio(redis),
+    }
 
 
 def is_redis_configured() -> bool:
@@ -1,4 +1,6 @@
+from fastapi import Request
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
@@ -6,6 +8,8 @@ from dotenv import load_dotenv
 from pathlib import Path
 import logging
 
+from app.db_metrics import InstrumentedQueuePool, instrument_engine
+
 logger = logging.getLogger(__name__)
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -48,6 +52,9 @@ _pool_size = int(os.getenv("DB_POOL_SIZE", "5"))
 _max_overflow = int(os.getenv("DB_MAX_OVERFLOW", "10"))
 _pool_timeout = int(os.getenv("DB_POOL_TIMEOUT", "30"))
 _pool_recycle = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # recycle idle connections every 30 min
+# Connections to open in the background at startup, so the first requests on a
+# fresh instance skip the TLS/auth handshake. 0 (default) = connect on demand.
+_pool_warmup = int(os.getenv("DB_POOL_WARMUP", "0"))
 
 # SQLite (sqlite:// / sqlite:///:memory:) doesn't support pool_size/
 # max_overflow/pool_timeout — those are Postgres-pool concepts. SQLite is
@@ -59,6 +66,8 @@ _pool_kwargs = {} if _is_sqlite else {
     "pool_timeout": _pool_timeout,
     "pool_recycle": _pool_recycle,
 }
+# Sync engines only — the async engine needs SQLAlchemy's async-adapted pool
+_sync_pool_kwargs = _pool_kwargs if _is_sqlite else {**_pool_kwargs, "poolclass": InstrumentedQueuePool}
 
 # Create engine - this is lazy, won't actually connect until first use
 engine = create_engine(
@@ -66,9 +75,12 @@ engine = create_engine(
     connect_args=_connect_args,
     pool_pre_ping=True,
     echo=False,  # Set to True for SQL debugging
-    **_pool_kwargs,
+    **_sync_pool_kwargs,
 )
 
+# Per-request query count/time, slow-query log and pool telemetry (app/db_metrics.py)
+instrument_engine(engine, "primary")
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 # ──────────────────────────────────────────────────────────────────────────
@@ -76,6 +88,8 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 # scale), but the routing code is ready for when REPLICA_DATABASE_URL is set
 # on a paid Neon tier. Until then, replica_engine == engine and get_db_read
 # behaves identically to get_db, so nothing changes for existing callers.
+# Once set, get_db also routes GET/HEAD traffic here automatically — see
+# app/replica_routing.py for the read-your-writes sticky window.
 # ──────────────────────────────────────────────────────────────────────────
 _replica_url = os.getenv("REPLICA_DATABASE_URL", "").strip()
 if _replica_url:
@@ -85,12 +99,14 @@ if _replica_url:
         _replica_url,
         connect_args=_connect_args,
         pool_pre_ping=True,
+        poolclass=InstrumentedQueuePool,
         pool_size=_pool_size,
         max_overflow=_max_overflow,
         pool_timeout=_pool_timeout,
         pool_recycle=_pool_recycle,
         echo=False,
     )
+    instrument_engine(replica_engine, "replica")
     logger.info("Read replica configured — read-heavy queries can route to REPLICA_DATABASE_URL")
 else:
     replica_engine = engine  # no replica provisioned — reads go to primary, same as today
@@ -99,7 +115,68 @@ ReplicaSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=repli
 
 Base = declarative_base()
 
-def get_db():
+def dialect_insert(db):
+    """INSERT construct with ON CONFLICT support for the session's dialect, or
+    None when the dialect has no native upsert (callers fall back to
+    UPDATE-then-INSERT)."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+        return insert
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+        return insert
+    return None
+
+
+def warm_pool(target=None, connections: int | None = None) -> int:
+    """Open `connections` (default DB_POOL_WARMUP, capped at DB_POOL_SIZE)
+    pool connections at once and return them to the pool idle. Returns how
+    many were opened; failures are logged, never raised."""
+    target = target or engine
+    connections = min(_pool_warmup if connections is None else connections, _pool_size)
+    opened = []
+    try:
+        for _ in range(connections):
+            opened.append(target.connect())
+    except Exception as e:
+        logger.warning("DB pool warmup stopped after %d connection(s): %s", len(opened), e)
+    finally:
+        for conn in opened:
+            conn.close()
+    return len(opened)
+
+
+def start_pool_warmup() -> None:
+    """warm_pool() in a background thread when DB_POOL_WARMUP is set, so cold
+    start isn't held up — a request that arrives first just connects itself."""
+    if _pool_warmup > 0 and not _is_sqlite:
+        import threading
+        threading.Thread(target=warm_pool, name="db-pool-warmup", daemon=True).start()
+
+
+def has_replica() -> bool:
+    return replica_engine is not engine
+
+
+def get_db(request: Request):
+    """
+    Request-scoped session. Read-only requests are routed to the replica by
+    replica_routing_middleware (request.state.use_replica) — unless the user
+    wrote recently, in which case they stay on the primary so they read their
+    own writes. Without a replica this is always the primary.
+    """
+    factory = ReplicaSessionLocal if getattr(request.state, "use_replica", False) else SessionLocal
+    db = factory()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_db_primary():
+    """Always the primary, regardless of method — for the rare GET route that
+    writes (e.g. the OAuth callback creating a user)."""
     db = SessionLocal()
     try:
         yield db
@@ -119,3 +196,63 @@ def get_db_read():
         yield db
     finally:
         db.close()
+
+
+# ──────────────────────────────────────────────────────────────────────────
+# Async engine — opt-in, for `async def` routes that would otherwise block
+# the event loop on sync DB I/O. Built lazily on first get_async_db() so the
+# async drivers (asyncpg for Postgres, aiosqlite for tests) are only needed
+# by deployments that actually use it. Same database and pool settings as
+# the sync engine; ASYNC_DATABASE_URL overrides the derived URL if needed.
+# ──────────────────────────────────────────────────────────────────────────
+_async_engine = None
+_AsyncSessionLocal = None
+
+
+# libpq sslmode values; asyncpg's ssl= accepts the same names with the same meaning
+_SSL_MODES = {"disable", "allow", "prefer", "require", "verify-ca", "verify-full"}
+
+
+def _async_url_and_connect_args(url: str) -> tuple:
+    parsed = make_url(url)
+    connect_args = {}
+    if parsed.get_backend_name() == "sqlite":
+        return parsed.set(drivername="sqlite+aiosqlite"), connect_args
+    # asyncpg doesn't understand libpq's sslmode — it takes ssl= instead
+    sslmode = parsed.query.get("sslmode")
+    if sslmode is not None:
+        if sslmode not in _SSL_MODES:
+            raise ValueError(f"Unsupported sslmode {sslmode!r} in DATABASE_URL for the async engine")
+        connect_args["ssl"] = sslmode
+    elif os.getenv("DATABASE_SSL") == "true":
+        connect_args["ssl"] = "require"
+    return parsed.set(drivername="postgresql+asyncpg").difference_update_query(["sslmode"]), connect_args
+
+
+def get_async_engine():
+    global _async_engine, _AsyncSessionLocal
+    if _async_engine is None:
+        from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+        url = os.getenv("ASYNC_DATABASE_URL", "").strip() or DATABASE_URL
+        async_url, connect_args = _async_url_and_connect_args(url)
+        _async_engine = create_async_engine(
+            async_url,
+            connect_args=connect_args,
+            pool_pre_ping=True,
+            echo=False,
+            **_pool_kwargs,
+        )
+        instrument_engine(_async_engine.sync_engine, "async")
+        _AsyncSessionLocal = async_sessionmaker(
+            _async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False,
+        )
+    return _async_engine
+
+
+async def get_async_db():
+    """AsyncSession dependency for async routes (e.g. ai_chat.chat_message).
+    Pair with auth.get_current_user_async and the *_async credit helpers."""
+    get_async_engine()
+    async with _AsyncSessionLocal() as db:
+        yield db
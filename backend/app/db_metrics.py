@@ -0,0 +1,193 @@
+"""
+Per-request SQL instrumentation.
+
+Every engine in app/database.py is passed through instrument_engine(), which
+times each statement with cursor-execute events. While a request is in
+flight, db_metrics_middleware keeps a per-request counter in a contextvar
+(copied into the threadpool that runs sync routes and dependencies), so the
+events add each statement's count and duration to the request that issued it.
+The totals go out as
+
+    Server-Timing: db;dur=12.4;desc="7 queries"
+
+which browser devtools show in the request's Timing tab — an N+1 loop shows
+up as a query count that grows with the page size.
+
+Any single statement slower than DB_SLOW_QUERY_MS (default 500; 0 turns the
+log off) is logged with the route that issued it, e.g.
+"GET /api/admin/organizations/{org_id}/readiness-summary".
+
+Each engine's connection pool is instrumented too: checkouts, new physical
+connections, invalidations (a failed pool_pre_ping shows up here) and — for
+InstrumentedQueuePool, the pool the Postgres engines use — how long each
+checkout waited for a free connection. pool_stats() snapshots all of it for
+GET /api/admin/metrics/db, so DB_POOL_SIZE/DB_MAX_OVERFLOW can be tuned
+from data: waits in the upper buckets mean the pool is too small.
+"""
+import logging
+import os
+import threading
+import time
+from contextvars import ContextVar
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+
+logger = logging.getLogger(__name__)
+
+DB_SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", "500"))
+
+
+class RequestDBStats:
+    __slots__ = ("scope", "queries", "seconds")
+
+    def __init__(self, scope: dict):
+        self.scope = scope
+        self.queries = 0
+        self.seconds = 0.0
+
+    @property
+    def route(self) -> str:
+        """Method and path with matched path params put back as {name}, so
+        logs group by endpoint rather than by id (route.path alone is
+        relative to the included router)."""
+        params = {str(value): name for name, value in self.scope.get("path_params", {}).items()}
+        segments = [f"{{{params[s]}}}" if s in params else s for s in self.scope.get("path", "").split("/")]
+        return f"{self.scope.get('method', '')} {'/'.join(segments)}"
+
+
+_current: ContextVar[RequestDBStats | None] = ContextVar("db_request_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("db_metrics_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["db_metrics_started"].pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.seconds += elapsed
+    if DB_SLOW_QUERY_MS > 0 and elapsed * 1000 >= DB_SLOW_QUERY_MS:
+        logger.warning(
+            "Slow query (%.0f ms) in %s: %s",
+            elapsed * 1000, stats.route if stats is not None else "(no request)", " ".join(statement.split())[:1000],
+        )
+
+
+def _handle_error(exception_context):
+    # after_cursor_execute doesn't fire for a failed statement — drop its start time
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("db_metrics_started"):
+        conn.info["db_metrics_started"].pop()
+
+
+# ─── Connection pool telemetry ────────────────────────────────────────────
+
+# Upper bounds (ms) of the checkout-wait histogram buckets; the last bucket is open-ended
+WAIT_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000, 5000)
+
+
+class PoolTelemetry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.wait_counts = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self.wait_total_ms = 0.0
+        self.wait_max_ms = 0.0
+
+    def record_wait(self, ms: float) -> None:
+        bucket = next((i for i, bound in enumerate(WAIT_BUCKETS_MS) if ms <= bound), len(WAIT_BUCKETS_MS))
+        with self._lock:
+            self.wait_counts[bucket] += 1
+            self.wait_total_ms += ms
+            self.wait_max_ms = max(self.wait_max_ms, ms)
+
+    def count(self, field: str) -> None:
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that times how long each checkout waits for a connection
+    (including opening a new one when under the size/overflow limit)."""
+    telemetry: PoolTelemetry | None = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            if self.telemetry is not None:
+                self.telemetry.record_wait((time.perf_counter() - started) * 1000)
+
+    def recreate(self):
+        # engine.dispose() swaps in a recreated pool — keep the counters going
+        pool = super().recreate()
+        pool.telemetry = self.telemetry
+        return pool
+
+
+# engine name ("primary", "replica", "async") -> (engine, telemetry)
+_instrumented: dict[str, tuple] = {}
+
+
+def instrument_engine(engine, name: str = "primary") -> None:
+    """Attach the statement-timing and pool events to a (sync) Engine and
+    register it for pool_stats(). Safe to call twice."""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+    telemetry = PoolTelemetry()
+    if isinstance(engine.pool, InstrumentedQueuePool):
+        engine.pool.telemetry = telemetry
+    event.listen(engine, "checkout", lambda *args: telemetry.count("checkouts"))
+    event.listen(engine, "connect", lambda *args: telemetry.count("connects"))
+    event.listen(engine, "invalidate", lambda *args: telemetry.count("invalidations"))
+    _instrumented[name] = (engine, telemetry)
+
+
+def pool_stats() -> list[dict]:
+    """Current state and counters for every instrumented engine's pool."""
+    stats = []
+    for name, (engine, telemetry) in _instrumented.items():
+        pool = engine.pool
+        gauges = {}
+        for gauge in ("size", "checkedout", "checkedin", "overflow"):
+            method = getattr(pool, gauge, None)  # QueuePool methods; other pool classes lack some
+            gauges[gauge] = method() if callable(method) else None
+        buckets = [*(f"<={bound}ms" for bound in WAIT_BUCKETS_MS), f">{WAIT_BUCKETS_MS[-1]}ms"]
+        timed = sum(telemetry.wait_counts)
+        stats.append({
+            "engine": name,
+            "pool_class": type(pool).__name__,
+            "size": gauges["size"],
+            "checked_out": gauges["checkedout"],
+            "checked_in": gauges["checkedin"],
+            "overflow": gauges["overflow"],
+            "checkouts": telemetry.checkouts,
+            "connects": telemetry.connects,
+            "invalidations": telemetry.invalidations,
+            "checkout_wait_ms": dict(zip(buckets, telemetry.wait_counts)) if timed else {},
+            "checkout_wait_avg_ms": round(telemetry.wait_total_ms / timed, 3) if timed else None,
+            "checkout_wait_max_ms": round(telemetry.wait_max_ms, 3) if timed else None,
+        })
+    return stats
+
+
+async def db_metrics_middleware(request: Request, call_next):
+    stats = RequestDBStats(request.scope)
+    token = _current.set(stats)
+    try:
+        response = await call_next(request)
+    finally:
+        _current.reset(token)
+    response.headers.append("Server-Timing", f'db;dur={stats.seconds * 1000:.1f};desc="{stats.queries} queries"')
+    return response
@@ -26,19 +26,19 @@ if _sentry_dsn:
         send_default_pii=False,
     )
 
-from app.database import engine, Base
-from app import models  # noqa: F401 - register all models with Base before create_all
+from app.database import engine, start_pool_warmup
+from app.db_metrics import db_metrics_middleware
+from app.replica_routing import replica_routing_middleware
+from app.schema_version import check_schema_version
 from app.routers import auth, users, career, roadmap, resume, lessons, dashboard, exceptions, credits, ai_features, catalog, video, workforce, admin, jobs, ai_chat
 import logging
 
 logger = logging.getLogger(__name__)
 
-try:
-    Base.metadata.create_all(bind=engine)
-    logger.info("Database tables created successfully")
-except Exception as e:
-    logger.warning(f"⚠️ Could not initialize database: {e}")
-    logger.warning("App will start anyway, but database operations will fail. Check DATABASE_URL env var.")
+# Schema is managed by Alembic (`alembic upgrade head`); startup only checks
+# the recorded revision — one cheap query per cold start, never raises.
+check_schema_version(engine)
+start_pool_warmup()  # no-op unless DB_POOL_WARMUP is set
 
 app = FastAPI(title="TrainPi API", version="1.0.0")
 
@@ -80,6 +80,15 @@ app.add_middleware(
 # Session Middleware (Required for OAuth)
 app.add_middleware(SessionMiddleware, secret_key=os.environ["SECRET_KEY"])
 
+# Read-replica routing for GET/HEAD with a sticky-primary window after writes.
+# No-op until REPLICA_DATABASE_URL is set.
+app.middleware("http")(replica_routing_middleware)
+
+# Per-request DB query count/time as a Server-Timing header, plus the
+# slow-query log (DB_SLOW_QUERY_MS). Added last so it wraps every other
+# middleware and sees every statement the request causes.
+app.middleware("http")(db_metrics_middleware)
+
 # Mount uploads only if directory exists (e.g. not on Vercel serverless)
 if os.path.isdir("uploads"):
     app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
@@ -108,7 +117,7 @@ async def root():
 
 @app.get("/api/health")
 async def health_check():
-    return {"status": "healthy", "cors": "enabled"}
+    return {"status": "healthy", "cors": "enabled", "schema": check_schema_version(engine)}
 
 @app.options("/{full_path:path}")
 async def options_handler(full_path: str):
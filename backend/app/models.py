@@ -1,9 +1,9 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, Float
+from sqlalchemy import BigInteger, Column, Integer, String, Boolean, Date, DateTime, Text, ForeignKey, Float, Index, UniqueConstraint
 try:
     from sqlalchemy.dialects.postgresql import JSON
 except ImportError:
     from sqlalchemy import JSON
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy.sql import func
 from app.database import Base
 from app.encryption import EncryptedText
@@ -24,6 +24,9 @@ class User(Base):
     github_url = Column(String, nullable=True)
     
     is_active = Column(Boolean, default=True)
+    # Set by DELETE /api/auth/me when the purge is deferred; the purge sweep
+    # only touches accounts with this set, never merely inactive ones
+    deletion_requested_at = Column(DateTime(timezone=True), nullable=True)
     credits = Column(Integer, default=100)
     gemini_api_key = Column(String, nullable=True)
     is_platform_admin = Column(Boolean, default=False)  # platform-wide superadmin (Exhibit A admin dashboard)
@@ -84,6 +87,10 @@ class Roadmap(Base):
     
     user = relationship("User", back_populates="roadmaps")
 
+    __table_args__ = (
+        Index("ix_roadmaps_user_created", "user_id", "created_at", "id"),
+    )
+
 class Resume(Base):
     __tablename__ = "resumes"
     
@@ -99,6 +106,10 @@ class Resume(Base):
     
     user = relationship("User", back_populates="resumes")
 
+    __table_args__ = (
+        Index("ix_resumes_user_created", "user_id", "created_at", "id"),
+    )
+
 class Lesson(Base):
     __tablename__ = "lessons"
     
@@ -113,7 +124,14 @@ class Lesson(Base):
     
     user = relationship("User", back_populates="lessons")
 
+    __table_args__ = (
+        Index("ix_lessons_user_created", "user_id", "created_at", "id"),
+    )
+
 class UserProgress(Base):
+    """Current progress on one thing — one row per (user, progress_type, target),
+    upserted on every update (see app/services/progress.py) rather than appended,
+    so the table grows with lessons/roadmaps, not with progress events."""
     __tablename__ = "user_progress"
     
     id = Column(Integer, primary_key=True, index=True)
@@ -121,14 +139,21 @@ class UserProgress(Base):
     lesson_id = Column(Integer, ForeignKey("lessons.id"), nullable=True)
     roadmap_id = Column(Integer, ForeignKey("roadmaps.id"), nullable=True)
     progress_type = Column(String)  # 'lesson', 'roadmap', 'certification'
+    # lesson_id, else roadmap_id, else 0 — a NOT NULL stand-in for the two
+    # nullable FKs, since NULLs never collide in a unique index
+    target_id = Column(Integer, nullable=False, default=0, server_default="0")
     completion_percentage = Column(Float, default=0.0)
-    quiz_scores = Column(JSON)  # List of quiz scores
-    time_spent = Column(Integer, default=0)  # Time in minutes
+    quiz_scores = Column(JSON)  # List of quiz scores, appended to on each scored update
+    time_spent = Column(Integer, default=0)  # Time in minutes, accumulated across updates
     last_accessed = Column(DateTime(timezone=True), server_default=func.now())
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     user = relationship("User", back_populates="progress")
 
+    __table_args__ = (
+        Index("uq_user_progress_user_type_target", "user_id", "progress_type", "target_id", unique=True),
+    )
+
 class ExceptionModel(Base):
     __tablename__ = "exceptions"
     
@@ -143,18 +168,105 @@ class ExceptionModel(Base):
     
     user = relationship("User", back_populates="exceptions")
 
+    __table_args__ = (
+        Index("ix_exceptions_user_created", "user_id", "created_at", "id"),
+    )
+
 class CreditTransaction(Base):
     __tablename__ = "credit_transactions"
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     amount = Column(Integer, nullable=False)  # positive = add, negative = deduct
-    kind = Column(String, nullable=False)  # 'signup_bonus', 'purchase', 'usage', 'refund', 'redeem'
+    kind = Column(String, nullable=False)  # 'signup_bonus', 'purchase', 'usage', 'refund', 'redeem', 'grant'
     description = Column(String, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     user = relationship("User", back_populates="credit_transactions")
 
+    # Serves the org AI-interaction summary (user IN members, kind='usage',
+    # created_at range / keyset order) and per-user history without a table scan.
+    __table_args__ = (
+        Index("ix_credit_transactions_user_kind_created", "user_id", "kind", "created_at"),
+    )
+
+
+class CreditTransactionArchive(Base):
+    """Ledger rows older than the hot window, moved out of credit_transactions by
+    app/services/ledger_archive.py. Same columns and ids, one index — it's only
+    read for audits, so it doesn't carry the hot table's index maintenance."""
+    __tablename__ = "credit_transactions_archive"
+
+    id = Column(Integer, primary_key=True)  # the original credit_transactions.id
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    amount = Column(Integer, nullable=False)
+    kind = Column(String, nullable=False)
+    description = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True))
+
+    __table_args__ = (
+        Index("ix_credit_transactions_archive_user_created", "user_id", "created_at"),
+    )
+
+
+class CreditLedgerMonth(Base):
+    """Carry-forward summary of archived ledger rows — one row per (user, month,
+    kind, description) with the count and net amount, written in the same
+    transaction that archives them. Totals over archived months read these
+    instead of the archive."""
+    __tablename__ = "credit_ledger_months"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    month = Column(Date, nullable=False)  # first day of the month (UTC)
+    kind = Column(String, nullable=False)
+    description = Column(String, nullable=False)  # "Unknown" for NULL ledger descriptions
+    transaction_count = Column(Integer, nullable=False, default=0)
+    amount = Column(Integer, nullable=False, default=0)  # net, same sign convention as the ledger
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "month", "kind", "description", name="uq_credit_ledger_months_user_month_kind_desc"),
+    )
+
+
+class CreditHold(Base):
+    """A short-lived credit reservation taken before an AI call. The held amount
+    is already subtracted from User.credits; on success the hold is settled into
+    a single 'usage' CreditTransaction, on failure it's dropped and the credits
+    go back — no deduct/refund ledger pairs. Holds past expires_at (worker died
+    mid-call) are released by release_expired_holds()."""
+    __tablename__ = "credit_holds"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    amount = Column(Integer, nullable=False)
+    kind = Column(String, nullable=False)
+    description = Column(String, nullable=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class DailyUsageRollup(Base):
+    """Pre-aggregated AI usage per (day, user, feature) — one row per combination,
+    incremented in the same transaction as each 'usage' ledger write (see
+    app/services/usage_rollup.py). Time-range analytics read these instead of
+    re-scanning credit_transactions. Organization scoping is a join through
+    OrganizationMembership at read time, so membership changes apply retroactively
+    without rewriting rollups."""
+    __tablename__ = "daily_usage_rollups"
+
+    id = Column(Integer, primary_key=True, index=True)
+    day = Column(Date, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    feature = Column(String, nullable=False)  # CreditTransaction.description, same grouping as the AI-interaction summary
+    interaction_count = Column(Integer, nullable=False, default=0)
+    credits_used = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint("day", "user_id", "feature", name="uq_daily_usage_rollups_day_user_feature"),
+        Index("ix_daily_usage_rollups_user_day", "user_id", "day"),
+    )
+
 
 class CourseEnrollment(Base):
     """Tracks user enrollment and progress in catalog courses (pre-built YouTube courses)."""
@@ -163,13 +275,20 @@ class CourseEnrollment(Base):
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     course_id = Column(String, nullable=False)          # slug like 'python-fundamentals'
-    completed_units = Column(JSON, default=list)         # list of unit indices completed
+    # Progress as a bitset (bit i = unit i done) with its popcount and the
+    # completed flag kept alongside — all set on write, see app/services/course_catalog.py
+    completed_mask = Column(BigInteger, nullable=False, default=0, server_default="0")
+    completed_count = Column(Integer, nullable=False, default=0, server_default="0")
     completed = Column(Boolean, default=False)
     enrolled_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     user = relationship("User")
 
+    __table_args__ = (
+        Index("ix_course_enrollments_user_course", "user_id", "course_id"),
+    )
+
 
 # ──────────────────────────────────────────────────────────────────────────
 # Workforce Readiness (Exhibit A) — operational workforce readiness platform.
@@ -187,11 +306,13 @@ class WorkforceProfile(Base):
 
     current_job_title = Column(String, nullable=True)
     years_experience = Column(String, nullable=True)
-    primary_skills = Column(JSON, default=list)       # list[str] entered by user
+    primary_skills = Column(JSON, default=list)  # list[str] entered by user
     additional_notes = Column(Text, nullable=True)
 
     resume_filename = Column(String, nullable=True)
-    resume_text = Column(EncryptedText, nullable=True)  # extracted text from uploaded resume — PII, encrypted at rest when ENCRYPTION_KEY is set
+    # Deferred: only loaded (and decrypted) when the attribute is actually read —
+    # listings, readiness loops and profile responses never need it.
+    resume_text = deferred(Column(EncryptedText, nullable=True))  # extracted text from uploaded resume — PII, encrypted at rest when ENCRYPTION_KEY is set
 
     # AI-extracted Participant Capability Profile (Exhibit A step 1 output)
     extracted_work_history = Column(JSON, default=list)
@@ -220,7 +341,8 @@ class OrganizationDocument(Base):
     document_type = Column(String, nullable=True)  # AI-classified type (e.g. "Incident Response SOP")
     size_kb = Column(Integer, default=0)
 
-    parsed_text = Column(EncryptedText, nullable=True)  # raw org document text — confidential, encrypted at rest when ENCRYPTION_KEY is set
+    # Deferred like WorkforceProfile.resume_text — listing documents shouldn't decrypt them.
+    parsed_text = deferred(Column(EncryptedText, nullable=True))  # raw org document text — confidential, encrypted at rest when ENCRYPTION_KEY is set
 
     # AI-extracted Operational Requirements fields (Exhibit A step 2 suggested structure)
     extracted_requirements = Column(JSON, default=list)
@@ -236,6 +358,10 @@ class OrganizationDocument(Base):
 
     user = relationship("User")
 
+    __table_args__ = (
+        Index("ix_organization_documents_user_uploaded", "user_id", "uploaded_at", "id"),
+    )
+
 
 class WorkforceAnalysis(Base):
     """Step 3/4: AI Analysis & Comparison Engine output — Results & Insights."""
@@ -298,6 +424,52 @@ class WorkforceRoadmap(Base):
     analysis = relationship("WorkforceAnalysis")
 
 
+# ──────────────────────────────────────────────────────────────────────────
+# Skill taxonomy — canonical skills, the spellings that map to them, and one
+# fact row per (participant, skill, source). Gemini names the same skill many
+# ways ("Splunk", "splunk SIEM", "SIEM (Splunk)"); the JSON lists above keep
+# the raw strings for display, these tables are what analytics join on.
+# See app/services/skills.py.
+# ──────────────────────────────────────────────────────────────────────────
+
+class Skill(Base):
+    """A canonical skill."""
+    __tablename__ = "skills"
+
+    id = Column(Integer, primary_key=True, index=True)
+    key = Column(String, nullable=False, unique=True)  # normalize_skill_key(name)
+    name = Column(String, nullable=False)  # display form
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class SkillAlias(Base):
+    """A normalized spelling -> its canonical skill. Every skill has at least
+    its own key here; merging two skills is repointing aliases."""
+    __tablename__ = "skill_aliases"
+
+    alias_key = Column(String, primary_key=True)
+    skill_id = Column(Integer, ForeignKey("skills.id"), nullable=False, index=True)
+
+    skill = relationship("Skill")
+
+
+class ParticipantSkill(Base):
+    """Fact: `user_id` has (or, for source 'missing', lacks) `skill_id`.
+    Rewritten per (user, source) on each workforce extraction/analysis."""
+    __tablename__ = "participant_skills"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    skill_id = Column(Integer, ForeignKey("skills.id"), nullable=False)
+    source = Column(String, nullable=False)  # 'self_reported' | 'extracted' | 'missing'
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "source", "skill_id", name="uq_participant_skills_user_source_skill"),
+        Index("ix_participant_skills_skill_source_user", "skill_id", "source", "user_id"),
+    )
+
+
 # ──────────────────────────────────────────────────────────────────────────
 # Admin & Organizational Features (Exhibit A) — groups participants under
 # an organization so an org_admin can monitor aggregate readiness across
@@ -0,0 +1,73 @@
+"""
+Keyset (cursor) pagination shared by list endpoints whose result sets grow
+without bound — AI usage events, a user's lessons/resumes/roadmaps, etc.
+
+Pages are ordered newest-first on (created_at, id). The cursor is an opaque
+URL-safe token encoding the last row's (created_at, id); the next page is
+"rows strictly older than that", which stays an index range scan no matter
+how deep the client pages (unlike OFFSET, which re-reads every skipped row).
+
+List endpoints respond with the Page envelope from app.schemas
+({"items": [...], "next_cursor": ...}); pass next_cursor back as ?cursor=
+to fetch the following page. keyset_page() is the one-call version for the
+common "this user's rows, newest first" case.
+"""
+import base64
+from datetime import datetime
+
+from fastapi import HTTPException
+from sqlalchemy import and_, or_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Parse a cursor from encode_cursor. Raises 400 on anything malformed —
+    cursors are client-supplied, so a bad one is a client error, not a 500."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at_str, row_id_str = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8").rsplit("|", 1)
+        return datetime.fromisoformat(created_at_str), int(row_id_str)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def apply_keyset(query, created_at_col, id_col, cursor: str | None):
+    """Order `query` newest-first on (created_at_col, id_col) and, if a cursor
+    is given, keep only rows strictly after it in that order."""
+    if cursor:
+        cursor_created_at, cursor_id = decode_cursor(cursor)
+        query = query.filter(
+            or_(
+                created_at_col < cursor_created_at,
+                and_(created_at_col == cursor_created_at, id_col < cursor_id),
+            )
+        )
+    return query.order_by(created_at_col.desc(), id_col.desc())
+
+
+def page_rows(rows: list, limit: int, created_at_of, id_of) -> tuple[list, str | None]:
+    """Split a `limit + 1` fetch into (page, next_cursor). The extra row only
+    signals that another page exists; it's never returned."""
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    last = page[-1]
+    return page, encode_cursor(created_at_of(last), id_of(last))
+
+
+def keyset_page(query, created_at_col, id_col, cursor: str | None, limit: int) -> dict:
+    """Fetch one page of ORM rows from `query` as a Page-shaped dict."""
+    rows = apply_keyset(query, created_at_col, id_col, cursor).limit(limit + 1).all()
+    items, next_cursor = page_rows(
+        rows, limit,
+        lambda row: getattr(row, created_at_col.key),
+        lambda row: getattr(row, id_col.key),
+    )
+    return {"items": items, "next_cursor": next_cursor}
@@ -0,0 +1,75 @@
+"""
+Automatic read-replica routing with read-your-writes consistency.
+
+When REPLICA_DATABASE_URL is set, get_db() hands GET/HEAD requests a
+replica session instead of a primary one — so the bulk of read traffic moves
+off the primary without touching individual routes. Writes (any other
+method) always go to the primary.
+
+Replica lag would otherwise mean a user who just generated a roadmap gets a
+GET that can't see it yet. So after any successful write, the user is pinned
+to the primary for REPLICA_STICKY_SECONDS: a "primary until" timestamp is
+stored in the shared cache (Upstash when configured, so the pin holds across
+serverless instances) keyed by the user id from their bearer token. Routes
+that create a user before there's a token to key on (register, OAuth) call
+mark_primary_sticky() themselves.
+
+With no replica configured, the middleware does nothing — no token decode,
+no cache lookup — and every request uses the primary exactly as before.
+"""
+import os
+import time
+
+from fastapi import Request
+from jose import JWTError, jwt
+
+from app.auth import ALGORITHM, SECRET_KEY
+from app.cache import cache_get, cache_set
+from app.database import has_replica
+
+REPLICA_STICKY_SECONDS = int(os.getenv("REPLICA_STICKY_SECONDS", "10"))
+_READ_METHODS = ("GET", "HEAD")
+
+
+def _sticky_key(user_id: int) -> str:
+    return f"db:primary_until:{user_id}"
+
+
+def _bearer_user_id(request: Request) -> int | None:
+    """User id from the Authorization header, without a DB lookup. Routing
+    only — get_current_user still does the real authentication."""
+    header = request.headers.get("authorization", "")
+    scheme, _, token = header.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return int(jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]).get("sub"))
+    except (JWTError, TypeError, ValueError):
+        return None
+
+
+def mark_primary_sticky(user_id: int) -> None:
+    """Pin this user's reads to the primary for the next REPLICA_STICKY_SECONDS."""
+    if has_replica():
+        cache_set(_sticky_key(user_id), time.time() + REPLICA_STICKY_SECONDS, REPLICA_STICKY_SECONDS)
+
+
+def _is_sticky(user_id: int | None) -> bool:
+    if user_id is None:
+        return False
+    until = cache_get(_sticky_key(user_id))
+    return until is not None and float(until) > time.time()
+
+
+async def replica_routing_middleware(request: Request, call_next):
+    if not has_replica():
+        return await call_next(request)
+
+    user_id = _bearer_user_id(request)
+    request.state.use_replica = request.method in _READ_METHODS and not _is_sticky(user_id)
+
+    response = await call_next(request)
+
+    if request.method not in _READ_METHODS and response.status_code < 400 and user_id is not None:
+        mark_primary_sticky(user_id)
+    return response
@@ -10,17 +10,25 @@ Role model:
 - User.is_platform_admin is a separate, platform-wide superadmin flag
   (not tied to any one organization) for TrainPi's own operators.
 """
+import csv
+import io
+import time
 from collections import Counter
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import date, datetime, timedelta, timezone
+from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import Response
+from pydantic import validate_email
+from pydantic_core import PydanticCustomError
+from sqlalchemy import exists, func, insert, select, update
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from app.database import get_db, get_db_read
 from app.models import (
     User,
     Organization,
     OrganizationMembership,
+    ParticipantSkill,
     WorkforceProfile,
     WorkforceAnalysis,
     CreditTransaction,
@@ -30,18 +38,36 @@ from app.schemas import (
     OrganizationResponse,
     OrganizationMemberInvite,
     OrganizationMemberResponse,
+    OrganizationBulkInvite,
+    OrganizationBulkInviteResponse,
+    BulkInviteResult,
+    OrganizationCreditGrant,
+    OrganizationCreditGrantResponse,
     OrganizationReadinessSummary,
     ParticipantReadinessSummary,
     AIInteractionEvent,
     AIInteractionFeatureCount,
     OrganizationAIInteractionSummary,
+    OrganizationUsageReport,
+    DailyUsagePoint,
+    DatabaseMetrics,
+    CacheMetrics,
 )
 from app.auth import get_current_user
+from app.cache import cache_stats
+from app.db_metrics import pool_stats
+from app.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, apply_keyset, page_rows
+from app.routers.credits import deduct_credits
 from app.services.report_service import build_organization_summary_report_html, html_to_pdf_bytes
+from app.services.skills import organization_skill_counts, resolve_skill_ids
+from app.services.usage_rollup import organization_feature_usage, organization_usage
+from app.user_cache import mark_user_changed
 
 router = APIRouter()
 
 VALID_ROLES = {"participant", "org_admin"}
+MAX_BULK_INVITE = 1000  # rows per bulk-invite request
+MAX_CREDIT_GRANT = 10000  # credits per member per grant
 
 
 def _require_org_admin(org_id: int, user: User, db: Session) -> Organization:
@@ -144,6 +170,170 @@ def invite_member(
     )
 
 
+def _bulk_invite_rows(body: OrganizationBulkInvite) -> list[tuple[str, str]]:
+    """(email, role) pairs from the list and the CSV text, in submission order."""
+    rows = [(m.email.strip(), (m.role or "participant").strip()) for m in body.members]
+    if body.csv:
+        reader = csv.DictReader(io.StringIO(body.csv.strip()))
+        fields = {(name or "").strip().lower(): name for name in reader.fieldnames or []}
+        if "email" not in fields:
+            raise HTTPException(status_code=400, detail="CSV needs a header row with an 'email' column")
+        for record in reader:
+            email = (record.get(fields["email"]) or "").strip()
+            role = (record.get(fields["role"]) if "role" in fields else None) or "participant"
+            if email:
+                rows.append((email, role.strip()))
+    return rows
+
+
+@router.post("/organizations/{org_id}/members/bulk", response_model=OrganizationBulkInviteResponse)
+def bulk_invite_members(
+    org_id: int,
+    body: OrganizationBulkInvite,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Add (or re-role) many existing TrainPi users at once. Same rules as
+    invite_member, but set-based: one IN query for the users, one for their
+    existing memberships, one batched INSERT and one batched UPDATE, one
+    commit — a 500-person roster is a handful of statements, not ~1,500.
+    Every submitted row gets a status; bad rows don't fail the batch."""
+    started = time.perf_counter()
+    _require_org_admin(org_id, current_user, db)
+
+    rows = _bulk_invite_rows(body)
+    if not rows:
+        raise HTTPException(status_code=400, detail="No members to invite")
+    if len(rows) > MAX_BULK_INVITE:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_INVITE} members per request; split the list")
+
+    results: list[BulkInviteResult] = []
+    wanted: dict[str, str] = {}  # email -> role, valid rows only
+    for email, role in rows:
+        result = BulkInviteResult(email=email, status="", role=role)
+        try:
+            validate_email(email)
+        except PydanticCustomError:
+            result.status = "invalid_email"
+        else:
+            if role not in VALID_ROLES:
+                result.status = "invalid_role"
+            elif email in wanted:
+                result.status = "duplicate"  # first occurrence wins
+            else:
+                wanted[email] = role
+        results.append(result)
+
+    users = dict(db.query(User.email, User.id).filter(User.email.in_(wanted))) if wanted else {}
+    existing = dict(
+        db.query(OrganizationMembership.user_id, OrganizationMembership)
+        .filter(OrganizationMembership.organization_id == org_id, OrganizationMembership.user_id.in_(users.values()))
+    ) if users else {}
+
+    to_insert, to_update = [], []
+    for result in results:
+        if result.status:
+            continue
+        user_id = users.get(result.email)
+        if user_id is None:
+            result.status = "not_found"
+            continue
+        result.user_id = user_id
+        membership = existing.get(user_id)
+        if membership is None:
+            result.status = "added"
+            to_insert.append({"organization_id": org_id, "user_id": user_id, "role": result.role})
+        elif membership.role != result.role:
+            result.status = "updated"
+            to_update.append({"id": membership.id, "role": result.role})
+        else:
+            result.status = "unchanged"
+
+    if to_insert:
+        db.execute(insert(OrganizationMembership), to_insert)
+    if to_update:
+        db.execute(update(OrganizationMembership), to_update)
+    db.commit()
+
+    return OrganizationBulkInviteResponse(
+        organization_id=org_id,
+        results=results,
+        counts=dict(Counter(r.status for r in results)),
+        elapsed_ms=round((time.perf_counter() - started) * 1000, 1),
+    )
+
+
+@router.post("/organizations/{org_id}/credits/grant", response_model=OrganizationCreditGrantResponse)
+def grant_member_credits(
+    org_id: int,
+    body: OrganizationCreditGrant,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Give `amount` credits to every member of the organization, or to the
+    members matching `role` / `user_ids`. One UPDATE over the membership
+    subquery (RETURNING the ids it touched), one batched ledger INSERT of
+    'grant' rows, one commit — a grant to thousands of participants costs
+    the same few statements as a grant to one.
+
+    Org admins fund the grant from their own balance: amount x members is
+    debited from the sponsor in the same transaction (a conditional UPDATE
+    plus a negative 'grant' ledger row), and a 402 rolls the whole grant
+    back. The sponsor is never among the recipients, so a sponsoring member
+    can't pay themselves back. Only platform admins grant credits that
+    nobody paid for."""
+    started = time.perf_counter()
+    org = _require_org_admin(org_id, current_user, db)
+
+    if not 0 < body.amount <= MAX_CREDIT_GRANT:
+        raise HTTPException(status_code=400, detail=f"amount must be between 1 and {MAX_CREDIT_GRANT}")
+    if body.role is not None and body.role not in VALID_ROLES:
+        raise HTTPException(status_code=400, detail=f"role must be one of {sorted(VALID_ROLES)}")
+    if body.user_ids is not None and not body.user_ids:
+        raise HTTPException(status_code=400, detail="user_ids is empty; omit it to grant to every member")
+
+    members = select(OrganizationMembership.user_id).where(OrganizationMembership.organization_id == org_id)
+    if body.role is not None:
+        members = members.where(OrganizationMembership.role == body.role)
+    if body.user_ids is not None:
+        members = members.where(OrganizationMembership.user_id.in_(body.user_ids))
+    if not current_user.is_platform_admin:
+        members = members.where(OrganizationMembership.user_id != current_user.id)
+
+    granted = sorted(db.execute(
+        update(User)
+        .where(User.id.in_(members))
+        .values(credits=func.coalesce(User.credits, 0) + body.amount)
+        .returning(User.id),
+        execution_options={"synchronize_session": "fetch"},
+    ).scalars())
+    if granted:
+        description = body.description or f"Credits from {org.name}"
+        db.execute(insert(CreditTransaction), [
+            {"user_id": user_id, "amount": body.amount, "kind": "grant", "description": description}
+            for user_id in granted
+        ])
+        for user_id in granted:
+            mark_user_changed(db, user_id)
+        if not current_user.is_platform_admin:
+            total = body.amount * len(granted)
+            try:
+                deduct_credits(db, current_user.id, total, "grant",
+                               f"Granted to {len(granted)} member(s) of {org.name}", commit=False)
+            except HTTPException:
+                db.rollback()
+                raise
+    db.commit()
+
+    return OrganizationCreditGrantResponse(
+        organization_id=org_id,
+        amount=body.amount,
+        granted_user_ids=granted,
+        total_credits=body.amount * len(granted),
+        elapsed_ms=round((time.perf_counter() - started) * 1000, 1),
+    )
+
+
 @router.delete("/organizations/{org_id}/members/{user_id}")
 def remove_member(
     org_id: int,
@@ -187,6 +377,54 @@ def list_members(
     return result
 
 
+def _has_skill_fact(skill_ids: list[int], sources: tuple[str, ...]):
+    """SQL predicate: the membership's user has a ParticipantSkill fact for
+    one of `skill_ids` from one of `sources` — an index range scan on
+    ix_participant_skills_skill_source_user."""
+    return exists(select(1).where(
+        ParticipantSkill.user_id == OrganizationMembership.user_id,
+        ParticipantSkill.skill_id.in_(skill_ids),
+        ParticipantSkill.source.in_(sources),
+    ))
+
+
+@router.get("/organizations/{org_id}/participants", response_model=List[OrganizationMemberResponse])
+def find_participants_by_skill(
+    org_id: int,
+    has_skill: Optional[str] = Query(None, description="Only members whose profile lists this skill"),
+    missing_skill: Optional[str] = Query(None, description="Only members whose latest analysis found this skill missing"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db_read),
+):
+    """'Which members have / lack skill X' for this organization, answered by
+    one query over memberships and the ParticipantSkill facts — the same
+    canonical skills the readiness summary counts, so "siem", "SIEM" and
+    "Security Information and Event Management" all mean one skill. has_skill
+    matches self-reported or AI-extracted profile skills; missing_skill
+    matches skills the member's latest workforce analysis flagged as missing.
+    A skill the taxonomy has never seen matches nobody."""
+    _require_org_admin(org_id, current_user, db)
+    if not has_skill and not missing_skill:
+        raise HTTPException(status_code=400, detail="Provide has_skill and/or missing_skill")
+
+    query = (
+        db.query(User, OrganizationMembership.role, OrganizationMembership.joined_at)
+        .join(OrganizationMembership, OrganizationMembership.user_id == User.id)
+        .filter(OrganizationMembership.organization_id == org_id)
+    )
+    if has_skill:
+        query = query.filter(_has_skill_fact(resolve_skill_ids(db, [has_skill], create=False), ("self_reported", "extracted")))
+    if missing_skill:
+        query = query.filter(_has_skill_fact(resolve_skill_ids(db, [missing_skill], create=False), ("missing",)))
+
+    return [
+        OrganizationMemberResponse(
+            user_id=user.id, email=user.email, full_name=user.full_name, role=role, joined_at=joined_at,
+        )
+        for user, role, joined_at in query.order_by(User.email).all()
+    ]
+
+
 def _build_readiness_summary(org_id: int, current_user: User, db: Session) -> OrganizationReadinessSummary:
     """Aggregate workforce readiness across every participant in this organization —
     Exhibit A's 'organizational readiness monitoring' and 'workflow gap
@@ -243,6 +481,10 @@ def _build_readiness_summary(org_id: int, current_user: User, db: Session) -> Or
         ))
 
     most_common_gaps = [{"gap": gap, "count": count} for gap, count in gap_counts.most_common(10)]
+    # Canonical skills, so "Splunk" / "splunk SIEM" / "SIEM (Splunk)" count as one gap
+    most_common_missing_skills = [
+        {"skill": name, "count": count} for name, count in organization_skill_counts(db, org_id, "missing")
+    ]
     average_score = round(sum(scores) / len(scores), 1) if scores else None
 
     return OrganizationReadinessSummary(
@@ -253,6 +495,7 @@ def _build_readiness_summary(org_id: int, current_user: User, db: Session) -> Or
         average_readiness_score=average_score,
         readiness_distribution=dict(readiness_counts),
         most_common_gaps=most_common_gaps,
+        most_common_missing_skills=most_common_missing_skills,
         participants=participants,
     )
 
@@ -287,10 +530,28 @@ def download_readiness_summary_report(
     )
 
 
+def _rollup_days(start: Optional[datetime], end: Optional[datetime]) -> tuple[Optional[date], Optional[date]]:
+    """[start, end) widened to whole UTC days, as rollup day bounds. Naive
+    datetimes are taken as UTC."""
+    def utc(moment: datetime) -> datetime:
+        return moment.replace(tzinfo=timezone.utc) if moment.tzinfo is None else moment.astimezone(timezone.utc)
+
+    first_day = utc(start).date() if start is not None else None
+    end_day = None
+    if end is not None:
+        end_day = utc(end).date()
+        if utc(end).time() != datetime.min.time():
+            end_day += timedelta(days=1)
+    return first_day, end_day
+
+
 @router.get("/organizations/{org_id}/ai-interactions", response_model=OrganizationAIInteractionSummary)
 def get_ai_interaction_summary(
     org_id: int,
-    limit: int = 50,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    start: Optional[datetime] = Query(None, description="Only count usage from this time's UTC day on"),
+    end: Optional[datetime] = Query(None, description="Only count usage before this time, rounded up to a whole UTC day"),
+    cursor: Optional[str] = Query(None, description="next_cursor from a previous page of recent_events"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db_read),
 ):
@@ -302,71 +563,120 @@ def get_ai_interaction_summary(
     discover, roadmap generation, workforce analysis, resume upload, chat,
     etc.) — no new logging pipeline needed, no prompt/response content is
     stored or exposed here, only which feature ran and when.
+
+    Per-feature counts and credit sums come from DailyUsageRollup, so they
+    cost the same however large (or archived) the ledger is. Rollups are per
+    UTC day, so `start`/`end` are widened to whole UTC days, and
+    recent_events (a LIMITed keyset page over the ledger itself; pass
+    next_cursor back as `cursor` for older events) uses the same days, so
+    the events always fall inside the totals.
     """
     org = _require_org_admin(org_id, current_user, db)
+    first_day, end_day = _rollup_days(start, end)
 
-    member_user_ids = [
-        m.user_id
-        for m in db.query(OrganizationMembership).filter(OrganizationMembership.organization_id == org_id).all()
+    member_user_ids = select(OrganizationMembership.user_id).where(OrganizationMembership.organization_id == org_id)
+    usage_filters = [
+        CreditTransaction.user_id.in_(member_user_ids),
+        CreditTransaction.kind == "usage",
     ]
-    if not member_user_ids:
-        return OrganizationAIInteractionSummary(
-            organization_id=org.id,
-            organization_name=org.name,
-            total_interactions=0,
-            total_credits_used=0,
-            by_feature=[],
-            recent_events=[],
-        )
+    if first_day is not None:
+        usage_filters.append(CreditTransaction.created_at >= datetime.combine(first_day, datetime.min.time(), tzinfo=timezone.utc))
+    if end_day is not None:
+        usage_filters.append(CreditTransaction.created_at < datetime.combine(end_day, datetime.min.time(), tzinfo=timezone.utc))
 
-    users_by_id = {u.id: u for u in db.query(User).filter(User.id.in_(member_user_ids)).all()}
+    by_feature = [
+        AIInteractionFeatureCount(feature=row.feature, count=row.interactions, total_credits_used=row.credits)
+        for row in organization_feature_usage(db, org_id, first_day, end_day)
+    ]
 
-    transactions = (
-        db.query(CreditTransaction)
-        .filter(
-            CreditTransaction.user_id.in_(member_user_ids),
-            CreditTransaction.kind == "usage",
+    recent_query = (
+        db.query(
+            CreditTransaction.id,
+            CreditTransaction.user_id,
+            CreditTransaction.description,
+            CreditTransaction.amount,
+            CreditTransaction.created_at,
+            User.email,
+            User.full_name,
         )
-        .order_by(CreditTransaction.created_at.desc())
-        .all()
+        .join(User, User.id == CreditTransaction.user_id)
+        .filter(*usage_filters)
     )
+    recent_rows = apply_keyset(recent_query, CreditTransaction.created_at, CreditTransaction.id, cursor).limit(limit + 1).all()
+    recent_rows, next_cursor = page_rows(recent_rows, limit, lambda r: r.created_at, lambda r: r.id)
+
+    recent_events = [
+        AIInteractionEvent(
+            id=row.id,
+            user_id=row.user_id,
+            user_email=row.email,
+            user_full_name=row.full_name,
+            feature=row.description or "Unknown",
+            credits_used=abs(row.amount),
+            created_at=row.created_at,
+        )
+        for row in recent_rows
+    ]
 
-    feature_counts: Counter = Counter()
-    feature_credits: Counter = Counter()
-    total_credits_used = 0
+    return OrganizationAIInteractionSummary(
+        organization_id=org.id,
+        organization_name=org.name,
+        total_interactions=sum(f.count for f in by_feature),
+        total_credits_used=sum(f.total_credits_used for f in by_feature),
+        by_feature=by_feature,
+        recent_events=recent_events,
+        next_cursor=next_cursor,
+    )
 
-    for tx in transactions:
-        feature = tx.description or "Unknown"
-        feature_counts[feature] += 1
-        credits_spent = abs(tx.amount)
-        feature_credits[feature] += credits_spent
-        total_credits_used += credits_spent
 
-    by_feature = [
-        AIInteractionFeatureCount(feature=feature, count=count, total_credits_used=feature_credits[feature])
-        for feature, count in feature_counts.most_common()
-    ]
+@router.get("/organizations/{org_id}/usage", response_model=OrganizationUsageReport)
+def get_organization_usage(
+    org_id: int,
+    start: Optional[date] = Query(None, description="First day to include (default: 30 days ago)"),
+    end: Optional[date] = Query(None, description="Day after the last day to include (default: tomorrow)"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db_read),
+):
+    """Daily AI usage for this organization's members over a date range, read
+    from DailyUsageRollup rather than the raw ledger — a year of history for a
+    large org is at most days x members x features rows, not every transaction."""
+    org = _require_org_admin(org_id, current_user, db)
 
-    recent_events = []
-    for tx in transactions[:limit]:
-        user = users_by_id.get(tx.user_id)
-        if not user:
-            continue
-        recent_events.append(AIInteractionEvent(
-            id=tx.id,
-            user_id=user.id,
-            user_email=user.email,
-            user_full_name=user.full_name,
-            feature=tx.description or "Unknown",
-            credits_used=abs(tx.amount),
-            created_at=tx.created_at,
-        ))
+    end = end or (datetime.now(timezone.utc).date() + timedelta(days=1))
+    start = start or (end - timedelta(days=31))
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
 
-    return OrganizationAIInteractionSummary(
+    daily_rows, feature_rows = organization_usage(db, org_id, start, end)
+    by_feature = [
+        AIInteractionFeatureCount(feature=row.feature, count=row.interactions, total_credits_used=row.credits)
+        for row in feature_rows
+    ]
+    return OrganizationUsageReport(
         organization_id=org.id,
         organization_name=org.name,
-        total_interactions=len(transactions),
-        total_credits_used=total_credits_used,
+        start=start,
+        end=end,
+        total_interactions=sum(f.count for f in by_feature),
+        total_credits_used=sum(f.total_credits_used for f in by_feature),
         by_feature=by_feature,
-        recent_events=recent_events,
+        daily=[DailyUsagePoint(day=row.day, interactions=row.interactions, credits_used=row.credits) for row in daily_rows],
     )
+
+
+@router.get("/metrics/db", response_model=DatabaseMetrics)
+def get_database_metrics(current_user: User = Depends(get_current_user)):
+    """Connection pool telemetry for this instance — platform admins only,
+    since it describes shared infrastructure rather than any one organization."""
+    if not current_user.is_platform_admin:
+        raise HTTPException(status_code=403, detail="Platform admin access is required")
+    return DatabaseMetrics(pools=pool_stats())
+
+
+@router.get("/metrics/cache", response_model=CacheMetrics)
+def get_cache_metrics(current_user: User = Depends(get_current_user)):
+    """In-process cache size and hit/eviction counters for this instance —
+    platform admins only, like /metrics/db."""
+    if not current_user.is_platform_admin:
+        raise HTTPException(status_code=403, detail="Platform admin access is required")
+    return CacheMetrics(**cache_stats())
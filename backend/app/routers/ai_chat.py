@@ -1,11 +1,18 @@
 import logging
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.database import get_db
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
 from app.models import User, CareerProfile, Roadmap
-from app.auth import get_current_user_optional
+from app.auth import get_current_user_optional_async
 from app.services.ai_service import get_gemini_response
-from app.routers.credits import refund_credits, user_key_or_deduct, CREDITS_PER_CHAT_MESSAGE
+from app.routers.credits import (
+    release_credits_async,
+    settle_credits_async,
+    user_key_or_reserve_async,
+    CREDITS_PER_CHAT_MESSAGE,
+)
 from pydantic import BaseModel
 
 router = APIRouter()
@@ -27,21 +34,34 @@ class ChatResponse(BaseModel):
 @router.post("/message", response_model=ChatResponse)
 async def chat_message(
     chat_data: ChatMessage,
-    current_user: User | None = Depends(get_current_user_optional),
-    db: Session = Depends(get_db),
+    current_user: User | None = Depends(get_current_user_optional_async),
+    db: AsyncSession = Depends(get_async_db),
 ):
+    """
+    The busiest AI route, so it runs on the async stack: DB work awaits on
+    the async engine (get_async_db) and the blocking Gemini SDK call runs in
+    the threadpool, so a slow completion never stalls the event loop for
+    other requests.
+    """
     if not current_user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Sign in to use the AI Career Mentor and spend credits.",
         )
 
-    use_own_key, gemini_key = user_key_or_deduct(db, current_user, CREDITS_PER_CHAT_MESSAGE, "usage", "AI Career Mentor chat")
+    hold, gemini_key = await user_key_or_reserve_async(db, current_user, CREDITS_PER_CHAT_MESSAGE, "usage", "AI Career Mentor chat")
+    use_own_key = hold is None
+    # The debit expired `credits`; an AsyncSession can't lazy-load it
+    await db.refresh(current_user, ["credits"])
     credits_remaining = current_user.credits or 0
 
     try:
-        profile = db.query(CareerProfile).filter(CareerProfile.user_id == current_user.id).order_by(CareerProfile.created_at.desc()).first()
-        roadmap = db.query(Roadmap).filter(Roadmap.user_id == current_user.id).order_by(Roadmap.created_at.desc()).first()
+        profile = (await db.execute(
+            select(CareerProfile).where(CareerProfile.user_id == current_user.id).order_by(CareerProfile.created_at.desc()).limit(1)
+        )).scalar_one_or_none()
+        roadmap = (await db.execute(
+            select(Roadmap).where(Roadmap.user_id == current_user.id).order_by(Roadmap.created_at.desc()).limit(1)
+        )).scalar_one_or_none()
         context_parts = [f"User: {current_user.full_name or current_user.email or 'Learner'}."]
         if profile:
             context_parts.append(f"Interested in: {profile.career_path}. Skills: {', '.join(profile.skills or [])}.")
@@ -94,20 +114,19 @@ Context about this user: {context}
 - If no agency-specific SOPs have been uploaded, note once: "I'm working from general public cybersecurity guidance. Once your organization's SOPs are uploaded, I can provide policy-aware mentoring."
 - If the user asks something unrelated to career, cybersecurity, or workforce readiness, redirect them briefly and move on."""
         full_prompt = f"{system_prompt}\n\nUser message: {chat_data.message}\n\nYour response:"
-        response_text = get_gemini_response(full_prompt, user_api_key=gemini_key)
+        response_text = await run_in_threadpool(get_gemini_response, full_prompt, user_api_key=gemini_key)
 
         if not use_own_key and QUOTA_MESSAGE_SUBSTRING in (response_text or ""):
-            credits_remaining = refund_credits(
-                db, current_user.id, CREDITS_PER_CHAT_MESSAGE, "Refund: AI quota full"
-            )
+            credits_remaining = await release_credits_async(db, hold)
+        else:
+            await settle_credits_async(db, hold)
         return {
             "response": response_text,
             "credits_used": 0 if use_own_key else CREDITS_PER_CHAT_MESSAGE,
             "credits_remaining": credits_remaining,
         }
     except Exception as e:
-        if not use_own_key:
-            refund_credits(db, current_user.id, CREDITS_PER_CHAT_MESSAGE, "Refund: error")
+        await release_credits_async(db, hold)
         logger.warning("Chat Error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
@@ -14,9 +14,9 @@ from app.auth import get_current_user
 from app.services.ai_service import get_gemini_response, get_gemini_json_response
 from app.services.course_validator import CourseValidator
 from app.routers.credits import (
-    deduct_credits,
-    refund_credits,
-    user_key_or_deduct as _user_key_or_deduct,
+    release_credits,
+    settle_credits,
+    user_key_or_reserve as _user_key_or_reserve,
     CREDITS_PER_LESSON_GENERATE,
     CREDITS_PER_GAMIFIED_CHALLENGE,
     CREDITS_PER_READINESS_FEEDBACK,
@@ -142,7 +142,7 @@ def generate_lesson(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    use_own, key = _user_key_or_deduct(db, current_user, CREDITS_PER_LESSON_GENERATE, "usage", "AI Generate Lesson")
+    hold, key = _user_key_or_reserve(db, current_user, CREDITS_PER_LESSON_GENERATE, "usage", "AI Generate Lesson")
     cyber_keywords = ['cyber', 'soc', 'security', 'phishing', 'mfa', 'iam', 'incident', 'siem', 'malware', 'firewall', 'vulnerability', 'log', 'analyst', 'threat', 'escalat', 'triage']
     is_cyber_topic = any(kw in body.topic.lower() for kw in cyber_keywords)
     operational_instruction = ""
@@ -195,15 +195,14 @@ STRICT REQUIREMENTS:
     try:
         data = get_gemini_json_response(prompt, user_api_key=key)
         if not data or "error" in data:
-            if not use_own:
-                refund_credits(db, current_user.id, CREDITS_PER_LESSON_GENERATE, "Refund: generate lesson failed")
+            release_credits(db, hold)
             raise HTTPException(status_code=502, detail=data.get("error", "AI could not generate lesson"))
+        settle_credits(db, hold)
         return data
     except HTTPException:
         raise
     except Exception as e:
-        if not use_own:
-            refund_credits(db, current_user.id, CREDITS_PER_LESSON_GENERATE, "Refund: error")
+        release_credits(db, hold)
         raise HTTPException(status_code=503, detail=str(e))
 
 
@@ -213,8 +212,8 @@ def generate_quiz(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    """Generate quiz questions for a topic or lesson. Uses Gemini; user key or deducts credits."""
-    use_own, key = _user_key_or_deduct(
+    """Generate quiz questions for a topic or lesson. Uses Gemini; user key or reserves credits."""
+    hold, key = _user_key_or_reserve(
         db, current_user, CREDITS_PER_QUIZ_GENERATE, "usage", "AI Generate Quiz"
     )
     topic = body.topic or body.lesson_title or "General knowledge"
@@ -231,20 +230,18 @@ Return ONLY valid JSON, no markdown."""
     try:
         data = get_gemini_json_response(prompt, user_api_key=key)
         if not data or "error" in data:
-            if not use_own:
-                refund_credits(db, current_user.id, CREDITS_PER_QUIZ_GENERATE, "Refund: generate quiz failed")
+            release_credits(db, hold)
             raise HTTPException(status_code=502, detail=data.get("error", "AI could not generate quiz"))
         questions = data.get("quiz_questions")
         if not isinstance(questions, list):
-            if not use_own:
-                refund_credits(db, current_user.id, CREDITS_PER_QUIZ_GENERATE, "Refund: invalid response")
+            release_credits(db, hold)
             raise HTTPException(status_code=502, detail="Invalid quiz format")
+        settle_credits(db, hold)
         return {"quiz_questions": questions}
     except HTTPException:
         raise
     except Exception as e:
-        if not use_own:
-            refund_credits(db, current_user.id, CREDITS_PER_QUIZ_GENERATE, "Refund: error")
+        release_credits(db, hold)
         raise HTTPException(status_code=503, detail=str(e))
 
 
@@ -284,7 +281,7 @@ def career_goals_guidance(
     Generate step-by-step guidance for a career goal (Like a full course).
     The user will preview this and then decide whether to save it.
     """
-    use_own, key = _user_key_or_deduct(
+    hold, key = _user_key_or_reserve(
         db, current_user, CREDITS_PER_CAREER_DISCOVER, "usage", f"AI Course Generation: {body.goal}"
     )
     
@@ -376,8 +373,7 @@ Well-known tutorial channels to reference: freeCodeCamp (rfscVS0vtbw for Python)
             if "json parsing failed" in str(error_msg).lower():
                 data = _build_fallback_career_guidance(body.goal)
             else:
-                if not use_own:
-                    refund_credits(db, current_user.id, CREDITS_PER_CAREER_DISCOVER, "Refund: generation failed")
+                release_credits(db, hold)
             
                 # Return 503 instead of 502 for service errors, with proper message
                 if "quota" in str(error_msg).lower() or "rate limit" in str(error_msg).lower():
@@ -411,19 +407,18 @@ Well-known tutorial channels to reference: freeCodeCamp (rfscVS0vtbw for Python)
         
         logger.info("Course generated - Quality Score: %d/100", quality_score)
         
+        settle_credits(db, hold)
         return data
     except HTTPException:
         raise
     except TimeoutError as e:
-        if not use_own:
-            refund_credits(db, current_user.id, CREDITS_PER_CAREER_DISCOVER, "Refund: timeout")
+        release_credits(db, hold)
         raise HTTPException(
             status_code=504, 
             detail="Request timed out. Complex career paths take time. Please try again in a moment."
         )
     except Exception as e:
-        if not use_own:
-            refund_credits(db, current_user.id, CREDITS_PER_CAREER_DISCOVER, "Refund: error")
+        release_credits(db, hold)
         error_str = str(e).lower()
         if "quota" in error_str or "rate limit" in error_str:
             raise HTTPException(status_code=503, detail="AI service quota exceeded. Please try again later.")
@@ -439,7 +434,7 @@ def generate_gamified_challenge(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    use_own, key = _user_key_or_deduct(db, current_user, CREDITS_PER_GAMIFIED_CHALLENGE, "usage", "AI Gamified Challenge")
+    hold, key = _user_key_or_reserve(db, current_user, CREDITS_PER_GAMIFIED_CHALLENGE, "usage", "AI Gamified Challenge")
     cyber_keywords = ['cyber', 'soc', 'security', 'phishing', 'mfa', 'iam', 'incident', 'siem', 'malware', 'threat', 'escalat', 'triage', 'log', 'analyst', 'linux', 'ssh', 'edr', 'endpoint', 'cloud', 'azure', 'aws', 'ransomware', 'brute', 'identity', 'impossible travel', 'token', 'vulnerability', 'patch']
     is_cyber_topic = any(kw in body.topic.lower() for kw in cyber_keywords)
     topic_lower = body.topic.lower()
@@ -493,15 +488,14 @@ Return ONLY this JSON:
     try:
         data = get_gemini_json_response(prompt, user_api_key=key)
         if not data or "error" in data:
-            if not use_own:
-                refund_credits(db, current_user.id, CREDITS_PER_GAMIFIED_CHALLENGE, "Refund: gamified failed")
+            release_credits(db, hold)
             raise HTTPException(status_code=502, detail="AI could not generate challenge")
+        settle_credits(db, hold)
         return data
     except HTTPException:
         raise
     except Exception as e:
-        if not use_own:
-            refund_credits(db, current_user.id, CREDITS_PER_GAMIFIED_CHALLENGE, "Refund: error")
+        release_credits(db, hold)
         raise HTTPException(status_code=503, detail=str(e))
 
 
@@ -511,7 +505,7 @@ def job_readiness_feedback(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    use_own, key = _user_key_or_deduct(db, current_user, CREDITS_PER_READINESS_FEEDBACK, "usage", "AI Job Readiness Feedback")
+    hold, key = _user_key_or_reserve(db, current_user, CREDITS_PER_READINESS_FEEDBACK, "usage", "AI Job Readiness Feedback")
     cyber_keywords = ['cyber', 'soc', 'security', 'analyst', 'iam', 'incident', 'it support']
     is_cyber_path = body.career_path and any(kw in body.career_path.lower() for kw in cyber_keywords)
     operational_context = ""
@@ -538,15 +532,14 @@ Keep it 5-7 sentences total. Write in a direct, encouraging-but-honest tone. Pla
     try:
         text = get_gemini_response(prompt, user_api_key=key)
         if not text or "add GOOGLE_API_KEY" in text:
-            if not use_own:
-                refund_credits(db, current_user.id, CREDITS_PER_READINESS_FEEDBACK, "Refund: feedback failed")
+            release_credits(db, hold)
             raise HTTPException(status_code=502, detail="AI unavailable")
+        settle_credits(db, hold)
         return {"feedback": text}
     except HTTPException:
         raise
     except Exception as e:
-        if not use_own:
-            refund_credits(db, current_user.id, CREDITS_PER_READINESS_FEEDBACK, "Refund: error")
+        release_credits(db, hold)
         raise HTTPException(status_code=503, detail=str(e))
 
 
@@ -556,7 +549,7 @@ def practice_hint(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    use_own, key = _user_key_or_deduct(db, current_user, CREDITS_PER_PRACTICE_HINT, "usage", "AI Practice Hint")
+    hold, key = _user_key_or_reserve(db, current_user, CREDITS_PER_PRACTICE_HINT, "usage", "AI Practice Hint")
     cyber_keywords = ['phishing', 'mfa', 'iam', 'incident', 'soc', 'escalat', 'triage', 'malware', 'log', 'ticket', 'analyst', 'siem', 'security', 'cyber', 'threat']
     is_cyber_problem = any(kw in body.problem_title.lower() for kw in cyber_keywords)
     hint_framing = ""
@@ -579,15 +572,14 @@ Plain text, direct and practical tone."""
     try:
         text = get_gemini_response(prompt, user_api_key=key)
         if not text or "add GOOGLE_API_KEY" in text:
-            if not use_own:
-                refund_credits(db, current_user.id, CREDITS_PER_PRACTICE_HINT, "Refund: hint failed")
+            release_credits(db, hold)
             raise HTTPException(status_code=502, detail="AI unavailable")
+        settle_credits(db, hold)
         return {"hint": text}
     except HTTPException:
         raise
     except Exception as e:
-        if not use_own:
-            refund_credits(db, current_user.id, CREDITS_PER_PRACTICE_HINT, "Refund: error")
+        release_credits(db, hold)
         raise HTTPException(status_code=503, detail=str(e))
 
 
@@ -596,7 +588,7 @@ def learning_style_analysis(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    use_own, key = _user_key_or_deduct(db, current_user, CREDITS_PER_LEARNING_STYLE, "usage", "AI Learning Style")
+    hold, key = _user_key_or_reserve(db, current_user, CREDITS_PER_LEARNING_STYLE, "usage", "AI Learning Style")
 
     profile = db.query(CareerProfile).filter(
         CareerProfile.user_id == current_user.id
@@ -627,15 +619,14 @@ Keep the response to 3-4 sentences. Be specific to their actual career path and
     try:
         text = get_gemini_response(prompt, user_api_key=key)
         if not text or "add GOOGLE_API_KEY" in text:
-            if not use_own:
-                refund_credits(db, current_user.id, CREDITS_PER_LEARNING_STYLE, "Refund: analysis failed")
+            release_credits(db, hold)
             raise HTTPException(status_code=502, detail="AI unavailable")
+        settle_credits(db, hold)
         return {"analysis": text}
     except HTTPException:
         raise
     except Exception as e:
-        if not use_own:
-            refund_credits(db, current_user.id, CREDITS_PER_LEARNING_STYLE, "Refund: error")
+        release_credits(db, hold)
         raise HTTPException(status_code=503, detail=str(e))
 
 
@@ -645,18 +636,17 @@ def tutor_recommendation(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    use_own, key = _user_key_or_deduct(db, current_user, CREDITS_PER_TUTOR_RECOMMEND, "usage", "AI Tutor Recommendation")
+    hold, key = _user_key_or_reserve(db, current_user, CREDITS_PER_TUTOR_RECOMMEND, "usage", "AI Tutor Recommendation")
     prompt = f"""The user's learning goal: {body.goal}. In 2-4 sentences, recommend what type of tutor or expertise they should look for and one tip for getting the most from tutoring. Plain text."""
     try:
         text = get_gemini_response(prompt, user_api_key=key)
         if not text or "add GOOGLE_API_KEY" in text:
-            if not use_own:
-                refund_credits(db, current_user.id, CREDITS_PER_TUTOR_RECOMMEND, "Refund: recommendation failed")
+            release_credits(db, hold)
             raise HTTPException(status_code=502, detail="AI unavailable")
+        settle_credits(db, hold)
         return {"recommendation": text}
     except HTTPException:
         raise
     except Exception as e:
-        if not use_own:
-            refund_credits(db, current_user.id, CREDITS_PER_TUTOR_RECOMMEND, "Refund: error")
+        release_credits(db, hold)
         raise HTTPException(status_code=503, detail=str(e))
@@ -1,12 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request, UploadFile, File
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Request, UploadFile, File
+from fastapi.responses import JSONResponse
 from fastapi.security import OAuth2PasswordRequestForm
 from fastapi.responses import RedirectResponse
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_db, get_db_primary
 from app.models import User, PasswordResetToken
 from app.schemas import UserCreate, Token, UserResponse, UserUpdate, ForgotPasswordRequest, ResetPasswordRequest
 from app.auth import verify_password, get_password_hash, create_access_token, get_current_user as get_current_user_auth, oauth
+from app.replica_routing import mark_primary_sticky
 from app.storage import upload_file as storage_upload_file, delete_file as storage_delete_file
+from app.services.account_purge import (
+    AccountPurgeBlocked, is_large_account, purge_user, purge_user_job, release_organizations,
+)
 from datetime import timedelta, datetime, timezone
 import secrets
 import os
@@ -40,6 +45,7 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
         db.add(db_user)
         db.commit()
         db.refresh(db_user)
+        mark_primary_sticky(db_user.id)
         return db_user
     except HTTPException:
         raise
@@ -165,6 +171,31 @@ def update_profile(
     db.refresh(current_user)
     return current_user
 
+@router.delete("/me")
+def delete_account(
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_user_auth),
+    db: Session = Depends(get_db),
+):
+    """Permanently delete the caller's account and all of its data — see
+    app/services/account_purge.py. Large accounts are deactivated now and
+    purged by a background job (202)."""
+    user_id = current_user.id
+    try:
+        if is_large_account(db, user_id):
+            # Settle organization ownership now, so a blocked purge is a 409 here
+            # rather than a failed job with the account already switched off
+            release_organizations(db, user_id)
+            current_user.is_active = False
+            current_user.deletion_requested_at = datetime.now(timezone.utc)
+            db.commit()
+            background_tasks.add_task(purge_user_job, user_id)
+            return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content={"message": "Account deletion scheduled"})
+        counts = purge_user(db, user_id)
+    except AccountPurgeBlocked as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    return {"message": "Account deleted", "rows_deleted": sum(counts.values())}
+
 ALLOWED_IMAGE_EXTENSIONS = {"jpg", "jpeg", "png", "gif", "webp"}
 IMAGE_CONTENT_TYPES = {"jpg": "image/jpeg", "jpeg": "image/jpeg", "png": "image/png", "gif": "image/gif", "webp": "image/webp"}
 MAX_AVATAR_SIZE_BYTES = 5 * 1024 * 1024  # 5 MB
@@ -217,7 +248,7 @@ async def login_google(request: Request):
     return await oauth.google.authorize_redirect(request, redirect_uri)
 
 @router.get("/auth/google")
-async def auth_google(request: Request, db: Session = Depends(get_db)):
+async def auth_google(request: Request, db: Session = Depends(get_db_primary)):
     try:
         token = await oauth.google.authorize_access_token(request)
     except Exception as e:
@@ -255,6 +286,7 @@ async def process_oauth_login(user_info: dict, db: Session):
         db.commit()
         db.refresh(new_user)
         user = new_user
+        mark_primary_sticky(user.id)
         
     # Create JWT
     access_token_expires = timedelta(minutes=60) # Longer validity for OAuth
@@ -5,7 +5,7 @@ from app.database import get_db
 from app.models import User, CareerProfile
 from app.schemas import CareerInterestRequest, CareerMatch, CareerProfileResponse, CareerSelectRequest
 from app.auth import get_current_user
-from app.routers.credits import refund_credits, user_key_or_deduct, CREDITS_PER_CAREER_DISCOVER
+from app.routers.credits import release_credits, settle_credits, user_key_or_reserve, CREDITS_PER_CAREER_DISCOVER
 from typing import List
 from app.services.ai_service import get_gemini_json_response
 
@@ -76,19 +76,20 @@ def discover_careers(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    use_own_key, gemini_key = user_key_or_deduct(db, current_user, CREDITS_PER_CAREER_DISCOVER, "usage", "AI Career Discover")
-
     profile = CareerProfile(
         user_id=current_user.id,
         interests=request.interests,
         skills=request.skills
     )
     db.add(profile)
-    db.commit()
+    # Commits the profile together with the credit hold
+    hold, gemini_key = user_key_or_reserve(db, current_user, CREDITS_PER_CAREER_DISCOVER, "usage", "AI Career Discover")
 
     matches = get_ai_career_matches(request.interests, request.skills, user_api_key=gemini_key)
-    if not use_own_key and not matches:
-        refund_credits(db, current_user.id, CREDITS_PER_CAREER_DISCOVER, "Refund: AI career discover failed")
+    if matches:
+        settle_credits(db, hold)
+    else:
+        release_credits(db, hold)
     return matches
 
 
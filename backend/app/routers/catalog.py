@@ -1,57 +1,63 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from app.database import get_db, engine, Base
+from app.database import get_db, get_db_read
 from app.models import User, CourseEnrollment
 from app.auth import get_current_user
+from app.services.course_catalog import (
+    CATALOG_COURSES,
+    course_completion_rates,
+    mark_unit_complete,
+    units_from_mask,
+)
 
 router = APIRouter()
 
 
-def _ensure_table():
-    """Create course_enrollments table if it doesn't exist yet."""
-    try:
-        Base.metadata.create_all(bind=engine)
-    except Exception:
-        pass
+def _require_course(course_id: str) -> dict:
+    course = CATALOG_COURSES.get(course_id)
+    if course is None:
+        raise HTTPException(status_code=404, detail="Course not found")
+    return course
+
+
+def _enrollment_response(enrollment: CourseEnrollment) -> dict:
+    return {
+        "course_id": enrollment.course_id,
+        "completed_units": units_from_mask(enrollment.completed_mask or 0),
+        "completed": bool(enrollment.completed),
+    }
 
 
 @router.get("/enrollments")
 def get_enrollments(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    _ensure_table()
     rows = db.query(CourseEnrollment).filter(CourseEnrollment.user_id == current_user.id).all()
-    return [
-        {
-            "course_id": r.course_id,
-            "completed_units": r.completed_units or [],
-            "completed": r.completed,
-            "enrolled_at": r.enrolled_at,
-        }
-        for r in rows
-    ]
+    return [{**_enrollment_response(r), "enrolled_at": r.enrolled_at} for r in rows]
+
+
+@router.get("/completion-rates")
+def get_completion_rates(current_user: User = Depends(get_current_user), db: Session = Depends(get_db_read)):
+    """Per-course enrollments, completions, completion rate and average
+    progress across all learners — one GROUP BY, see course_completion_rates().
+    Platform admins only, since it covers every learner on the platform
+    rather than any one organization."""
+    if not current_user.is_platform_admin:
+        raise HTTPException(status_code=403, detail="Platform admin access is required")
+    return course_completion_rates(db)
 
 
 @router.post("/enroll/{course_id}")
 def enroll(course_id: str, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    _ensure_table()
+    _require_course(course_id)
     try:
         existing = db.query(CourseEnrollment).filter(
             CourseEnrollment.user_id == current_user.id,
             CourseEnrollment.course_id == course_id,
         ).first()
         if existing:
-            return {
-                "course_id": course_id,
-                "completed_units": existing.completed_units or [],
-                "completed": existing.completed,
-            }
-        enrollment = CourseEnrollment(
-            user_id=current_user.id,
-            course_id=course_id,
-            completed_units=[],
-        )
+            return _enrollment_response(existing)
+        enrollment = CourseEnrollment(user_id=current_user.id, course_id=course_id)
         db.add(enrollment)
         db.commit()
-        db.refresh(enrollment)
         return {"course_id": course_id, "completed_units": [], "completed": False}
     except Exception as e:
         db.rollback()
@@ -65,31 +71,22 @@ def complete_unit(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    _ensure_table()
+    course = _require_course(course_id)
+    if not 0 <= unit_index < course["units"]:
+        raise HTTPException(status_code=400, detail=f"unit_index must be between 0 and {course['units'] - 1}")
     try:
         enrollment = db.query(CourseEnrollment).filter(
             CourseEnrollment.user_id == current_user.id,
             CourseEnrollment.course_id == course_id,
         ).first()
         if not enrollment:
-            enrollment = CourseEnrollment(
-                user_id=current_user.id,
-                course_id=course_id,
-                completed_units=[],
-            )
+            enrollment = CourseEnrollment(user_id=current_user.id, course_id=course_id)
             db.add(enrollment)
 
-        done = list(enrollment.completed_units or [])
-        if unit_index not in done:
-            done.append(unit_index)
-        enrollment.completed_units = done
+        mark_unit_complete(enrollment, unit_index)
+        response = _enrollment_response(enrollment)
         db.commit()
-        db.refresh(enrollment)
-        return {
-            "course_id": course_id,
-            "completed_units": enrollment.completed_units,
-            "completed": enrollment.completed,
-        }
+        return response
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to save progress: {str(e)}")
@@ -1,9 +1,11 @@
 """
 Credits: balance, Stripe Checkout (real purchase), webhook, and transaction history.
-AI usage deducts credits from the user's balance (see ai_chat, career, roadmap).
+AI usage reserves credits before the call and settles them on success (see user_key_or_reserve).
 Stripe is optional: install with `pip install stripe` and set STRIPE_SECRET_KEY for checkout.
 """
 import os
+import logging
+from datetime import datetime, timedelta, timezone
 try:
     import stripe
     stripe.api_key = os.getenv("STRIPE_SECRET_KEY")
@@ -15,13 +17,18 @@ except ImportError:
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from pydantic import BaseModel
 from fastapi.responses import JSONResponse
+from sqlalchemy import delete, func, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.database import get_db
-from app.models import User, CreditTransaction
+from app.models import User, CreditTransaction, CreditHold
 from app.schemas import CreditsBalance, CreditPurchaseRequest, CreditTransactionResponse, CheckoutSessionResponse, GeminiKeyRequest
 from app.auth import get_current_user
+from app.user_cache import mark_user_changed
+from app.services.usage_rollup import record_usage
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 STRIPE_WEBHOOK_SECRET = os.getenv("STRIPE_WEBHOOK_SECRET")
 FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:3000").rstrip("/")
 
@@ -43,6 +50,31 @@ CREDITS_PER_WORKFORCE_DOC_UPLOAD = 3        # per org document -> Operational Re
 CREDITS_PER_WORKFORCE_ANALYSIS = 10         # Step 3: full comparison engine
 CREDITS_PER_WORKFORCE_ROADMAP = 8           # Step 5: roadmap generation
 
+# How long a credit hold may stay open before release_expired_holds() gives the
+# credits back. Comfortably longer than the slowest Gemini call, so only a
+# request whose worker died ever hits it.
+CREDIT_HOLD_TTL_SECONDS = int(os.getenv("CREDIT_HOLD_TTL_SECONDS", "600"))
+
+
+def _debit_stmt(user_id: int, amount: int):
+    return (
+        update(User)
+        .where(User.id == user_id, func.coalesce(User.credits, 0) >= amount)
+        .values(credits=func.coalesce(User.credits, 0) - amount)
+        .returning(User.credits)
+    )
+
+
+def _raise_rejected_debit(row) -> None:
+    """`row` is the user's (credits,) after a debit UPDATE matched nothing."""
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+    raise HTTPException(
+        status_code=status.HTTP_402_PAYMENT_REQUIRED,
+        detail="INSUFFICIENT_CREDITS",
+        headers={"X-Credits-Remaining": str(row.credits or 0)},
+    )
+
 
 def deduct_credits(
     db: Session,
@@ -50,27 +82,37 @@ def deduct_credits(
     amount: int,
     kind: str,
     description: str | None = None,
+    commit: bool = True,
 ) -> int:
     """
     Deduct credits from user. Raises HTTP 402 if insufficient.
-    Returns new balance after deduction.
+    Returns new balance after deduction. With commit=False the charge joins
+    the caller's transaction.
+
+    The balance check and the decrement are a single conditional UPDATE
+    (`... WHERE credits >= :amount RETURNING credits`), so two concurrent
+    requests can never both pass the check and overspend, and the ledger row
+    is written in the same transaction — one round trip for the charge
+    instead of SELECT + UPDATE + refresh.
     """
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
-    current = user.credits or 0
-    if current < amount:
-        raise HTTPException(
-            status_code=status.HTTP_402_PAYMENT_REQUIRED,
-            detail="INSUFFICIENT_CREDITS",
-            headers={"X-Credits-Remaining": str(current)},
-        )
-    user.credits = current - amount
-    tx = CreditTransaction(user_id=user_id, amount=-amount, kind=kind, description=description)
-    db.add(tx)
-    db.commit()
-    db.refresh(user)
-    return user.credits
+    new_balance = db.execute(
+        _debit_stmt(user_id, amount),
+        execution_options={"synchronize_session": "fetch"},
+    ).scalar_one_or_none()
+
+    if new_balance is None:
+        # Rejected: either the user doesn't exist or the balance is too low.
+        # Only this (rare) path pays for a follow-up read.
+        row = db.query(User.credits).filter(User.id == user_id).first()
+        _raise_rejected_debit(row)
+
+    mark_user_changed(db, user_id)
+    db.add(CreditTransaction(user_id=user_id, amount=-amount, kind=kind, description=description))
+    if kind == "usage":
+        record_usage(db, user_id, description, amount)
+    if commit:
+        db.commit()
+    return new_balance
 
 
 def refund_credits(
@@ -79,41 +121,211 @@ def refund_credits(
     amount: int,
     description: str | None = "Refund (e.g. quota error)",
 ) -> int:
-    """Add credits back (e.g. when Gemini quota failed after deducting). Returns new balance."""
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
+    """Add credits back (e.g. when Gemini quota failed after deducting). Returns new balance.
+    Same single-statement UPDATE ... RETURNING shape as deduct_credits."""
+    new_balance = db.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(credits=func.coalesce(User.credits, 0) + amount)
+        .returning(User.credits),
+        execution_options={"synchronize_session": "fetch"},
+    ).scalar_one_or_none()
+    if new_balance is None:
         return 0
-    user.credits = (user.credits or 0) + amount
-    tx = CreditTransaction(user_id=user_id, amount=amount, kind="refund", description=description)
-    db.add(tx)
+    mark_user_changed(db, user_id)
+    db.add(CreditTransaction(user_id=user_id, amount=amount, kind="refund", description=description))
+    db.commit()
+    return new_balance
+
+
+def _release_hold_row(db: Session, hold_id: int):
+    """Delete one hold and return it, or None if it was already settled/released.
+    DELETE ... RETURNING makes this the single arbiter between the request that
+    owns the hold and the expiry sweep, so a hold's credits are returned at most once."""
+    row = db.execute(
+        delete(CreditHold).where(CreditHold.id == hold_id).returning(
+            CreditHold.user_id, CreditHold.amount, CreditHold.kind, CreditHold.description
+        )
+    ).first()
+    return row
+
+
+def reserve_credits(
+    db: Session,
+    user_id: int,
+    amount: int,
+    kind: str,
+    description: str | None = None,
+) -> CreditHold:
+    """
+    Take a short-lived hold on `amount` credits before an AI call. The balance
+    is decremented with the same conditional UPDATE as deduct_credits (so
+    concurrent requests can't overspend and a 402 is raised the same way), but
+    no ledger row is written yet — settle_credits() writes exactly one 'usage'
+    row on success, release_credits() drops the hold on failure.
+    """
+    release_expired_holds(db, user_id=user_id, commit=False)
+
+    new_balance = db.execute(
+        _debit_stmt(user_id, amount),
+        execution_options={"synchronize_session": "fetch"},
+    ).scalar_one_or_none()
+    if new_balance is None:
+        row = db.query(User.credits).filter(User.id == user_id).first()
+        _raise_rejected_debit(row)
+    mark_user_changed(db, user_id)
+
+    hold = CreditHold(
+        user_id=user_id,
+        amount=amount,
+        kind=kind,
+        description=description,
+        expires_at=datetime.now(timezone.utc) + timedelta(seconds=CREDIT_HOLD_TTL_SECONDS),
+    )
+    db.add(hold)
+    db.flush()
+    # Detach before commit so the caller can read hold.id/amount later without
+    # commit's expire-all forcing a refresh SELECT (the row may be gone by then).
+    db.expunge(hold)
+    db.commit()
+    return hold
+
+
+def settle_credits(db: Session, hold: CreditHold | None) -> None:
+    """Turn a hold into its single 'usage' ledger row and commit it together
+    with the route's pending writes — the request's final commit. With no
+    hold (the caller used their own Gemini key) it just commits."""
+    if hold is None:
+        db.commit()
+        return
+    row = _release_hold_row(db, hold.id)
+    if row is None:
+        # The hold outlived CREDIT_HOLD_TTL_SECONDS and the sweep already gave
+        # the credits back — charge again rather than hand out a free call,
+        # but never fail a request that already succeeded over it.
+        try:
+            deduct_credits(db, hold.user_id, hold.amount, hold.kind, hold.description)
+        except HTTPException:
+            logger.warning("Could not re-charge expired credit hold %s for user %s", hold.id, hold.user_id)
+            db.commit()
+        return
+    db.add(CreditTransaction(user_id=row.user_id, amount=-row.amount, kind=row.kind, description=row.description))
+    if row.kind == "usage":
+        record_usage(db, row.user_id, row.description, row.amount)
     db.commit()
-    db.refresh(user)
-    return user.credits
 
 
-def user_key_or_deduct(
+def release_credits(db: Session, hold: CreditHold | None) -> int | None:
+    """Drop a hold after a failed AI call and give the credits back — no ledger
+    rows at all, unlike the old deduct-then-refund pair. Anything the route
+    wrote since reserving is rolled back first, so a half-finished request
+    never commits. Returns the new balance, or None when there was nothing
+    to release."""
+    db.rollback()
+    if hold is None:
+        return None
+    row = _release_hold_row(db, hold.id)
+    if row is None:
+        db.commit()
+        return None
+    new_balance = db.execute(
+        update(User)
+        .where(User.id == row.user_id)
+        .values(credits=func.coalesce(User.credits, 0) + row.amount)
+        .returning(User.credits),
+        execution_options={"synchronize_session": "fetch"},
+    ).scalar_one_or_none()
+    mark_user_changed(db, row.user_id)
+    db.commit()
+    return new_balance
+
+
+def release_expired_holds(db: Session, user_id: int | None = None, commit: bool = True) -> int:
+    """
+    Return credits for holds whose request never settled or released them
+    (worker killed mid-call, timeout, deploy). Runs for one user at the start
+    of every reserve_credits() (joining its transaction, commit=False) so a
+    user's own next AI call heals their balance. A user who never makes
+    another AI call is healed by the unscoped sweep, which should run as a
+    scheduled job: `python -m app.routers.credits`. Returns the number of
+    holds released.
+    """
+    query = db.query(CreditHold.id).filter(CreditHold.expires_at < datetime.now(timezone.utc))
+    if user_id is not None:
+        query = query.filter(CreditHold.user_id == user_id)
+    expired_ids = [hold_id for (hold_id,) in query.all()]
+
+    released = 0
+    for hold_id in expired_ids:
+        row = _release_hold_row(db, hold_id)
+        if row is None:
+            continue
+        db.execute(
+            update(User)
+            .where(User.id == row.user_id)
+            .values(credits=func.coalesce(User.credits, 0) + row.amount),
+            execution_options={"synchronize_session": "fetch"},
+        )
+        mark_user_changed(db, row.user_id)
+        released += 1
+    if expired_ids and commit:
+        db.commit()
+    return released
+
+
+def user_key_or_reserve(
     db: Session,
     user: User,
     amount: int,
     kind: str,
     description: str | None = None,
-) -> tuple[bool, str | None]:
+) -> tuple[CreditHold | None, str | None]:
     """
     Every AI-calling endpoint needs the same check: use the user's own Gemini
-    key if they've set one (free, no credits touched), otherwise deduct
-    credits from the shared app key's usage. deduct_credits already raises
-    HTTPException(402, detail="INSUFFICIENT_CREDITS") on its own when the
-    balance is too low, so callers don't need to catch/re-raise it — doing
-    so around every call site was pure duplication that also dropped the
-    X-Credits-Remaining header deduct_credits sets on that response.
-
-    Returns (use_own_key, gemini_key_or_none).
+    key if they've set one (free, no credits touched), otherwise reserve
+    credits for the shared app key's usage. reserve_credits already raises
+    HTTPException(402, detail="INSUFFICIENT_CREDITS") with the
+    X-Credits-Remaining header when the balance is too low, so callers don't
+    need to catch/re-raise it.
+
+    Returns (hold_or_none, gemini_key_or_none). Callers settle_credits(db, hold)
+    once the AI call succeeded and release_credits(db, hold) when it failed.
+
+    Together the three form the request's unit of work, with one commit on
+    each side of the AI call (never a transaction held open across it):
+    whatever the route has written before calling this is committed with the
+    hold, and whatever it writes afterwards is committed by settle_credits
+    together with the usage ledger row (or discarded by release_credits).
+    Routes shouldn't commit in between.
     """
     gemini_key = user.gemini_api_key and user.gemini_api_key.strip()
-    use_own_key = bool(gemini_key)
-    if not use_own_key:
-        deduct_credits(db, user.id, amount, kind, description)
-    return use_own_key, (gemini_key or None)
+    if gemini_key:
+        db.commit()
+        return None, gemini_key
+    return reserve_credits(db, user.id, amount, kind, description), None
+
+
+# ─── Async routes (AsyncSession from get_async_db) ─────────────────────────
+# The same functions run on the AsyncSession's underlying Session via
+# run_sync, so the hold/settle/release semantics can't drift from the sync
+# path — only the DB waits are awaited instead of blocking the event loop.
+
+async def user_key_or_reserve_async(
+    db: AsyncSession,
+    user: User,
+    amount: int,
+    kind: str,
+    description: str | None = None,
+) -> tuple[CreditHold | None, str | None]:
+    return await db.run_sync(lambda session: user_key_or_reserve(session, user, amount, kind, description))
+
+
+async def settle_credits_async(db: AsyncSession, hold: CreditHold | None) -> None:
+    await db.run_sync(settle_credits, hold)
+
+
+async def release_credits_async(db: AsyncSession, hold: CreditHold | None) -> int | None:
+    return await db.run_sync(release_credits, hold)
 
 # Credit packages: package_id -> credits, label, price in cents (USD)
 CREDIT_PACKAGES = {
@@ -284,3 +496,13 @@ def get_history(
         .all()
     )
     return rows
+
+
+if __name__ == "__main__":
+    from app.database import SessionLocal
+
+    session = SessionLocal()
+    try:
+        print(f"Released {release_expired_holds(session)} expired credit holds")
+    finally:
+        session.close()
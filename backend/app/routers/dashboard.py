@@ -1,9 +1,10 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 from app.database import get_db
-from app.models import User, CareerProfile, Roadmap, Resume, Lesson, UserProgress
+from app.models import User, CareerProfile, Roadmap, Resume, Lesson
 from app.schemas import DashboardStats, ProgressUpdate
 from app.auth import get_current_user, get_current_user_optional
+from app.services.progress import progress_counts, record_progress
 
 router = APIRouter()
 
@@ -61,12 +62,7 @@ def get_dashboard_stats(
     # Get courses/lessons
     courses_enrolled = db.query(Lesson).filter(Lesson.user_id == current_user.id).count()
 
-    progress_records = db.query(UserProgress).filter(
-        UserProgress.user_id == current_user.id,
-        UserProgress.progress_type == "lesson",
-    ).all()
-    courses_completed = sum(1 for p in progress_records if p.completion_percentage >= 100)
-    lessons_in_progress = sum(1 for p in progress_records if p.completion_percentage < 100)
+    courses_completed, lessons_in_progress = progress_counts(db, current_user.id, "lesson")
     
     # Get resume info
     resume = db.query(Resume).filter(
@@ -182,22 +178,18 @@ def update_progress(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    # Create or update progress record
-    progress = UserProgress(
-        user_id=current_user.id,
+    # Upsert: one row per (user, type, lesson/roadmap), not one per save
+    progress_id = record_progress(
+        db,
+        current_user.id,
+        progress_data.progress_type,
+        progress_data.completion_percentage,
+        progress_data.time_spent_minutes,
         lesson_id=progress_data.lesson_id,
         roadmap_id=progress_data.roadmap_id,
-        progress_type=progress_data.progress_type,
-        completion_percentage=progress_data.completion_percentage,
-        time_spent=progress_data.time_spent_minutes
+        quiz_score=progress_data.quiz_score,
     )
-    
-    if progress_data.quiz_score:
-        progress.quiz_scores = [progress_data.quiz_score]
-    
-    db.add(progress)
     db.commit()
-    db.refresh(progress)
-    
-    return {"message": "Progress updated", "progress_id": progress.id}
+
+    return {"message": "Progress updated", "progress_id": progress_id}
 
@@ -1,10 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models import User, ExceptionModel
 from app.auth import get_current_user
+from app.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, keyset_page
+from app.schemas import Page
 from datetime import datetime, timezone
 from pydantic import BaseModel
+from typing import Optional
 
 router = APIRouter()
 
@@ -14,17 +17,29 @@ class ExceptionCreate(BaseModel):
     remarks: str = ""
     duration_seconds: int = 0  # Duration in seconds
 
+class ExceptionResponse(BaseModel):
+    id: int
+    user_id: int
+    type: str
+    status: Optional[str] = None
+    remarks: Optional[str] = None
+    duration: Optional[int] = None  # Duration in seconds
+    created_at: Optional[datetime] = None
+    cleared_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
 # Real exceptions from DB
-@router.get("/exceptions")
+@router.get("/exceptions", response_model=Page[ExceptionResponse])
 def get_exceptions(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    exceptions = db.query(ExceptionModel).filter(
-        ExceptionModel.user_id == current_user.id
-    ).order_by(ExceptionModel.created_at.desc()).all()
-    
-    return exceptions
+    query = db.query(ExceptionModel).filter(ExceptionModel.user_id == current_user.id)
+    return keyset_page(query, ExceptionModel.created_at, ExceptionModel.id, cursor, limit)
 
 @router.post("/exceptions")
 def create_exception(
@@ -8,17 +8,18 @@ Adzuna's free tier is rate-limited too.
 """
 import os
 import httpx
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
 from app.database import get_db
 from app.models import User, WorkforceProfile, CareerProfile
 from app.auth import get_current_user
-from app.cache import cache_get, cache_set
+from app.cache import cache_get_or_fetch
 
 router = APIRouter()
 
-CACHE_TTL = 60 * 60 * 4  # 4 hours — job postings change faster than course/video content
+CACHE_SOFT_TTL = 60 * 60 * 4  # 4 hours — job postings change faster than course/video content
+CACHE_TTL = 60 * 60 * 24  # served stale while refreshing until then
 CACHE_PREFIX = "jobs_search:"
 
 
@@ -56,6 +57,7 @@ def _score_posting(posting: dict, skills: list[str]) -> tuple[int, list[str]]:
 
 @router.get("/search")
 async def search_jobs(
+    background_tasks: BackgroundTasks,
     query: str | None = Query(None, description="Override the auto-built skills query"),
     location: str = Query("", description="e.g. 'Reston, VA' — blank searches all locations"),
     country: str = Query("us", description="Adzuna country code: us, gb, ca, au, etc."),
@@ -66,6 +68,8 @@ async def search_jobs(
     """
     Search job postings matched to the current user's profile skills.
     If `query` is not provided, builds one from the user's extracted/entered skills.
+    Cached results are fresh for 4 hours, then served stale (still `cached`)
+    while a refresh runs after the response — see cache_get_or_fetch.
     """
     app_id = os.getenv("ADZUNA_APP_ID", "").strip()
     app_key = os.getenv("ADZUNA_APP_KEY", "").strip()
@@ -76,10 +80,26 @@ async def search_jobs(
     search_query = query or " ".join(skills[:6]) or "entry level"
 
     cache_key = f"{country}:{search_query.lower()}:{location.lower()}:{results_per_page}"
-    cached = cache_get(CACHE_PREFIX + cache_key)
-    if cached is not None:
-        return {"query": search_query, "results": cached, "cached": True}
-
+    results, status = await cache_get_or_fetch(
+        CACHE_PREFIX + cache_key,
+        lambda: _fetch_jobs(app_id, app_key, country, search_query, location, results_per_page, skills),
+        CACHE_SOFT_TTL,
+        CACHE_TTL,
+        background_tasks,
+    )
+    return {"query": search_query, "results": results, "cached": status != "miss"}
+
+
+async def _fetch_jobs(
+    app_id: str,
+    app_key: str,
+    country: str,
+    search_query: str,
+    location: str,
+    results_per_page: int,
+    skills: list[str],
+) -> list[dict]:
+    """One Adzuna search, scored against `skills`. Raises HTTPException."""
     try:
         async with httpx.AsyncClient(timeout=10) as client:
             resp = await client.get(
@@ -124,5 +144,4 @@ async def search_jobs(
     if skills:
         scored_results.sort(key=lambda r: r["match_count"], reverse=True)
 
-    cache_set(CACHE_PREFIX + cache_key, scored_results, CACHE_TTL)
-    return {"query": search_query, "results": scored_results, "cached": False}
+    return scored_results
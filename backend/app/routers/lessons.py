@@ -1,12 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models import User, Lesson
-from app.schemas import LessonCreate, LessonCreateFromAI, LessonResponse, LessonQuizUpdate
+from app.schemas import LessonCreate, LessonCreateFromAI, LessonResponse, LessonQuizUpdate, Page
 from app.auth import get_current_user
 from app.services.ai_service import get_gemini_json_response
-from app.routers.credits import refund_credits, user_key_or_deduct, CREDITS_PER_LESSON_GENERATE
-from typing import List
+from app.routers.credits import release_credits, settle_credits, user_key_or_reserve, CREDITS_PER_LESSON_GENERATE
+from app.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, keyset_page
+from typing import List, Optional
 
 router = APIRouter()
 
@@ -106,12 +107,12 @@ def create_lesson_from_ai(
 MAX_DOCUMENT_SIZE = 20 * 1024 * 1024  # 20 MB
 
 @router.post("/upload-document")
-async def upload_document(
+def upload_document(
     file: UploadFile = File(...),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    raw = await file.read()
+    raw = file.file.read()
     if len(raw) > MAX_DOCUMENT_SIZE:
         raise HTTPException(status_code=413, detail="File too large. Maximum size is 20 MB.")
 
@@ -147,7 +148,7 @@ async def upload_document(
         text_content = f"Document uploaded: {filename}. Content extraction not available for this file type — please add text content manually."
 
     # Try AI-powered lesson generation
-    use_own_key, gemini_key = user_key_or_deduct(
+    hold, gemini_key = user_key_or_reserve(
         db, current_user, CREDITS_PER_LESSON_GENERATE, "usage", f"AI Lesson from Document: {title[:50]}"
     )
 
@@ -203,17 +204,15 @@ Requirements:
                 quiz_questions=quiz_json,
             )
             db.add(lesson)
-            db.commit()
+            settle_credits(db, hold)
             db.refresh(lesson)
             return lesson
         else:
-            if not use_own_key:
-                refund_credits(db, current_user.id, CREDITS_PER_LESSON_GENERATE, "Refund: AI lesson from document failed")
+            release_credits(db, hold)
     except HTTPException:
         raise
     except Exception:
-        if not use_own_key:
-            refund_credits(db, current_user.id, CREDITS_PER_LESSON_GENERATE, "Refund: AI lesson from document error")
+        release_credits(db, hold)
 
     # Fallback: simple text splitting (no additional credit charge)
     lesson_data = LessonCreate(
@@ -245,16 +244,15 @@ def update_lesson(
     return lesson
 
 
-@router.get("/my-lessons", response_model=List[LessonResponse])
+@router.get("/my-lessons", response_model=Page[LessonResponse])
 def get_my_lessons(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    lessons = db.query(Lesson).filter(
-        Lesson.user_id == current_user.id
-    ).order_by(Lesson.created_at.desc()).all()
-    
-    return lessons
+    query = db.query(Lesson).filter(Lesson.user_id == current_user.id)
+    return keyset_page(query, Lesson.created_at, Lesson.id, cursor, limit)
 
 @router.get("/{lesson_id}", response_model=LessonResponse)
 def get_lesson(
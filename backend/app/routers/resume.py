@@ -1,12 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models import User, Resume
-from app.schemas import ResumeCreate, ResumeResponse, ResumeContent
+from app.schemas import ResumeCreate, ResumeResponse, ResumeContent, Page
 from app.auth import get_current_user
 from app.services.ai_service import get_gemini_json_response
-from app.routers.credits import refund_credits, user_key_or_deduct, CREDITS_PER_CAREER_DISCOVER, CREDITS_PER_READINESS_FEEDBACK
-from typing import List
+from app.routers.credits import release_credits, settle_credits, user_key_or_reserve, CREDITS_PER_CAREER_DISCOVER, CREDITS_PER_READINESS_FEEDBACK
+from app.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, keyset_page
+from typing import Optional
 import io
 try:
     import PyPDF2
@@ -92,16 +93,15 @@ def create_resume(
     
     return resume
 
-@router.get("/my-resumes", response_model=List[ResumeResponse])
+@router.get("/my-resumes", response_model=Page[ResumeResponse])
 def get_my_resumes(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    resumes = db.query(Resume).filter(
-        Resume.user_id == current_user.id
-    ).order_by(Resume.created_at.desc()).all()
-    
-    return resumes
+    query = db.query(Resume).filter(Resume.user_id == current_user.id)
+    return keyset_page(query, Resume.created_at, Resume.id, cursor, limit)
 
 @router.get("/{resume_id}", response_model=ResumeResponse)
 def get_resume(
@@ -134,7 +134,7 @@ def enhance_resume(
     if not resume:
         raise HTTPException(status_code=404, detail="Resume not found")
 
-    use_own_key, gemini_key = user_key_or_deduct(db, current_user, CREDITS_PER_READINESS_FEEDBACK, "usage", "Resume Enhancement")
+    hold, gemini_key = user_key_or_reserve(db, current_user, CREDITS_PER_READINESS_FEEDBACK, "usage", "Resume Enhancement")
 
     import json as _json
     resume_text = _json.dumps(resume.content, indent=2) if resume.content else "Resume content unavailable"
@@ -171,12 +171,11 @@ Rules:
     try:
         result = get_gemini_json_response(prompt, user_api_key=gemini_key)
         if result and "suggestions" in result:
+            settle_credits(db, hold)
             return result
-        if not use_own_key:
-            refund_credits(db, current_user.id, CREDITS_PER_READINESS_FEEDBACK, "Refund: resume enhancement failed")
+        release_credits(db, hold)
     except Exception:
-        if not use_own_key:
-            refund_credits(db, current_user.id, CREDITS_PER_READINESS_FEEDBACK, "Refund: resume enhancement error")
+        release_credits(db, hold)
 
     return {
         "message": "Resume enhancement suggestions generated",
@@ -227,7 +226,7 @@ def extract_text_from_file(filename: str, content: bytes, max_chars: int = 10000
 
 
 @router.post("/upload")
-async def upload_resume(
+def upload_resume(
     file: UploadFile = File(...),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -236,12 +235,12 @@ async def upload_resume(
     Upload resume (PDF/DOCX), extract text, use Gemini to analyze and extract skills,
     then recommend career paths. Uses user's Gemini key or deducts credits.
     """
-    content = await file.read()
+    content = file.file.read()
     if len(content) > MAX_RESUME_SIZE:
         raise HTTPException(status_code=413, detail="File too large. Maximum resume size is 10 MB.")
     resume_text = extract_text_from_file(file.filename or "", content)
     
-    use_own_key, gemini_key = user_key_or_deduct(db, current_user, CREDITS_PER_CAREER_DISCOVER, "usage", "Resume Upload & Analysis")
+    hold, gemini_key = user_key_or_reserve(db, current_user, CREDITS_PER_CAREER_DISCOVER, "usage", "Resume Upload & Analysis")
 
     try:
         prompt = f"""You are an Operational Readiness Analyst for TrainPi. Analyze this resume and produce an operational gap assessment — not just a skills list.
@@ -272,10 +271,10 @@ Rules:
         result = get_gemini_json_response(prompt, user_api_key=gemini_key)
 
         if not result or "error" in result:
-            if not use_own_key:
-                refund_credits(db, current_user.id, CREDITS_PER_CAREER_DISCOVER, "Refund: resume analysis failed")
+            release_credits(db, hold)
             raise HTTPException(status_code=502, detail=result.get("error", "AI could not analyze resume"))
 
+        settle_credits(db, hold)
         return {
             "success": True,
             "analysis": {
@@ -292,7 +291,6 @@ Rules:
     except HTTPException:
         raise
     except Exception as e:
-        if not use_own_key:
-            refund_credits(db, current_user.id, CREDITS_PER_CAREER_DISCOVER, "Refund: error")
+        release_credits(db, hold)
         raise HTTPException(status_code=503, detail=str(e))
 
@@ -3,10 +3,11 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models import User, Roadmap, CareerProfile
-from app.schemas import RoadmapCreate, RoadmapResponse
+from app.schemas import RoadmapCreate, RoadmapResponse, Page
 from app.auth import get_current_user
-from app.routers.credits import refund_credits, user_key_or_deduct, CREDITS_PER_ROADMAP_CREATE
-from typing import Any, List
+from app.routers.credits import release_credits, settle_credits, user_key_or_reserve, CREDITS_PER_ROADMAP_CREATE
+from app.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, keyset_page
+from typing import Any, Optional
 import re
 
 from app.services.ai_service import get_gemini_json_response
@@ -82,12 +83,12 @@ def _normalize_step(step_data: Any, index: int) -> dict[str, Any]:
 
 
 @router.post('/create', response_model=RoadmapResponse)
-async def create_roadmap(
+def create_roadmap(
     roadmap_data: RoadmapCreate,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    use_own_key, gemini_key = user_key_or_deduct(db, current_user, CREDITS_PER_ROADMAP_CREATE, 'usage', 'AI Roadmap Create')
+    hold, gemini_key = user_key_or_reserve(db, current_user, CREDITS_PER_ROADMAP_CREATE, 'usage', 'AI Roadmap Create')
 
     profile = db.query(CareerProfile).filter(
         CareerProfile.user_id == current_user.id
@@ -150,8 +151,8 @@ Each step must explain what the skill means in a real work environment, not just
         steps_data = [_normalize_step(step, index) for index, step in enumerate(raw_steps)]
     except Exception as e:
         logger.warning('AI Generation Error: %s', e)
-        if not use_own_key:
-            refund_credits(db, current_user.id, CREDITS_PER_ROADMAP_CREATE, 'Refund: AI roadmap failed')
+        release_credits(db, hold)
+        hold = None
         steps_data = []
 
     if not steps_data:
@@ -172,7 +173,7 @@ Each step must explain what the skill means in a real work environment, not just
         completion_percentage=0.0
     )
     db.add(roadmap)
-    db.commit()
+    settle_credits(db, hold)
     db.refresh(roadmap)
     return roadmap
 
@@ -209,15 +210,15 @@ def get_roadmap(
     return roadmap
 
 
-@router.get('/all', response_model=List[RoadmapResponse])
+@router.get('/all', response_model=Page[RoadmapResponse])
 def get_all_roadmaps(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    roadmaps = db.query(Roadmap).filter(
-        Roadmap.user_id == current_user.id
-    ).order_by(Roadmap.created_at.desc()).all()
-    return roadmaps
+    query = db.query(Roadmap).filter(Roadmap.user_id == current_user.id)
+    return keyset_page(query, Roadmap.created_at, Roadmap.id, cursor, limit)
 
 
 @router.post('/update-progress/{roadmap_id}')
@@ -1,34 +1,69 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
+import asyncio
 import httpx
 import os
 import time
+from typing import List
 
-from app.cache import cache_get, cache_set
+from app.cache import cache_get_many, cache_get_or_fetch, swr_set_many, swr_value
 from app.rate_limit import rate_limit
 
 router = APIRouter()
 
-CACHE_TTL = 60 * 60 * 24  # 24 hours
+CACHE_SOFT_TTL = 60 * 60 * 24  # 24 hours fresh, then served stale while refreshing
+CACHE_TTL = 60 * 60 * 24 * 7  # a week before a lookup has to wait on YouTube again
 CACHE_PREFIX = "video_search:"
+MAX_CACHED_LOOKUP = 50  # queries per /search/cached request
+MAX_CACHED_FETCH = 10  # of those, misses looked up on YouTube per request
+
+
+@router.get("/search/cached", dependencies=[Depends(rate_limit("video_search_cached", max_requests=30, window_seconds=60))])
+async def cached_videos(q: List[str] = Query(...)):
+    """
+    /search results for several queries at once — a course page with a video
+    per unit renders every unit from one request. Cached queries come from
+    one cache round trip (cache_get_many); up to MAX_CACHED_FETCH misses are
+    looked up on YouTube concurrently and written back together in one more
+    (swr_set_many), so the next visitor gets them from the cache. Queries
+    left over, or whose lookup failed, are null — call /search for those.
+    """
+    queries = [query for query in dict.fromkeys(q) if query.strip()]
+    if len(queries) > MAX_CACHED_LOOKUP:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_CACHED_LOOKUP} queries per request")
+    keys = {query: CACHE_PREFIX + query.strip().lower() for query in queries}
+    found = cache_get_many(keys.values())
+    results = {query: swr_value(found.get(keys[query])) for query in queries}
+
+    misses = [query for query in queries if keys[query] not in found][:MAX_CACHED_FETCH]
+    fetched = await asyncio.gather(*(_fetch_video(query) for query in misses), return_exceptions=True)
+    fresh = {query: video for query, video in zip(misses, fetched) if not isinstance(video, BaseException)}
+    swr_set_many({keys[query]: video for query, video in fresh.items()}, CACHE_SOFT_TTL, CACHE_TTL)
+    results.update(fresh)
+    return results
 
 
 @router.get("/search", dependencies=[Depends(rate_limit("video_search", max_requests=30, window_seconds=60))])
-async def search_video(q: str):
+async def search_video(q: str, background_tasks: BackgroundTasks):
     """
     Return a single embeddable YouTube video ID for the given search query.
 
     Quality gating: requests 5 candidates (medium/long duration only, so
     Shorts and junk clips are excluded), then picks the highest-view-count
     result among them instead of blindly taking YouTube's #1 relevance match.
+    Results are fresh for a day and then served stale while a refresh runs
+    after the response (cache_get_or_fetch), so only cold queries wait on YouTube.
     """
     if not q or not q.strip():
         raise HTTPException(status_code=400, detail="Query required")
 
-    key = q.strip().lower()
-    cached = cache_get(CACHE_PREFIX + key)
-    if cached:
-        return cached
+    result, _ = await cache_get_or_fetch(
+        CACHE_PREFIX + q.strip().lower(), lambda: _fetch_video(q), CACHE_SOFT_TTL, CACHE_TTL, background_tasks,
+    )
+    return result
+
 
+async def _fetch_video(q: str) -> dict:
+    """The best of YouTube's top 5 matches for `q`. Raises HTTPException."""
     api_key = os.getenv("YOUTUBE_API_KEY", "").strip()
     if not api_key:
         raise HTTPException(status_code=503, detail="YOUTUBE_API_KEY not configured")
@@ -88,12 +123,10 @@ async def search_video(q: str):
         best_id = max(view_counts, key=lambda vid: view_counts.get(vid, 0))
 
     snippet = snippets_by_id[best_id]
-    result = {
+    return {
         "video_id": best_id,
         "title": snippet["title"],
         "channel": snippet["channelTitle"],
         "thumbnail": snippet["thumbnails"].get("high", {}).get("url", ""),
         "cached_at": time.time(),
     }
-    cache_set(CACHE_PREFIX + key, result, CACHE_TTL)
-    return result
@@ -11,12 +11,12 @@ Five-step flow:
 Kept separate from career.py/resume.py/roadmap.py, which power the individual
 career-guidance flow (different models, different tables).
 """
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query
 from fastapi.responses import Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
-from app.database import get_db
+from app.database import get_db, get_db_primary
 from app.models import (
     User,
     WorkforceProfile,
@@ -30,8 +30,10 @@ from app.schemas import (
     OrganizationDocumentResponse,
     WorkforceAnalysisResponse,
     WorkforceRoadmapResponse,
+    Page,
 )
 from app.auth import get_current_user
+from app.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, keyset_page
 from app.rate_limit import rate_limit
 from app.services.report_service import (
     build_analysis_report_html,
@@ -39,8 +41,9 @@ from app.services.report_service import (
     html_to_pdf_bytes,
 )
 from app.routers.credits import (
-    refund_credits,
-    user_key_or_deduct,
+    release_credits,
+    settle_credits,
+    user_key_or_reserve,
     CREDITS_PER_WORKFORCE_PROFILE_ANALYZE,
     CREDITS_PER_WORKFORCE_DOC_UPLOAD,
     CREDITS_PER_WORKFORCE_ANALYSIS,
@@ -48,6 +51,7 @@ from app.routers.credits import (
 )
 from app.routers.resume import extract_text_from_file, MAX_RESUME_SIZE
 from app.services.ai_service import get_gemini_json_response, get_gemini_json_response_with_image
+from app.services.skills import record_participant_skills
 
 router = APIRouter()
 
@@ -71,10 +75,11 @@ def _get_or_create_profile(db: Session, user_id: int) -> WorkforceProfile:
         .first()
     )
     if not profile:
+        # Flush, not commit: the new row rides the caller's commit (for AI
+        # routes, the one user_key_or_reserve makes along with the hold).
         profile = WorkforceProfile(user_id=user_id)
         db.add(profile)
-        db.commit()
-        db.refresh(profile)
+        db.flush()
     return profile
 
 
@@ -85,9 +90,10 @@ def _get_or_create_profile(db: Session, user_id: int) -> WorkforceProfile:
 @router.get("/profile", response_model=WorkforceProfileResponse)
 def get_workforce_profile(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db_primary),  # may create the profile, so never the replica
 ):
     profile = _get_or_create_profile(db, current_user.id)
+    db.commit()
     return profile
 
 
@@ -102,6 +108,7 @@ def update_workforce_profile(
     profile.years_experience = body.years_experience
     profile.primary_skills = body.primary_skills
     profile.additional_notes = body.additional_notes
+    record_participant_skills(db, current_user.id, "self_reported", body.primary_skills)
     db.commit()
     db.refresh(profile)
     return profile
@@ -141,14 +148,14 @@ Rules:
     response_model=WorkforceProfileResponse,
     dependencies=[Depends(rate_limit("workforce_upload_resume", max_requests=5, window_seconds=60))],
 )
-async def upload_workforce_resume(
+def upload_workforce_resume(
     file: UploadFile = File(...),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     """Upload resume for the Participant Profile, extract text, and run AI extraction
     into a structured Participant Capability Profile (Exhibit A step 1 output)."""
-    content = await file.read()
+    content = file.file.read()
     if len(content) > MAX_RESUME_SIZE:
         raise HTTPException(status_code=413, detail="File too large. Maximum resume size is 10 MB.")
     resume_text = extract_text_from_file(file.filename or "", content)
@@ -156,9 +163,9 @@ async def upload_workforce_resume(
     profile = _get_or_create_profile(db, current_user.id)
     profile.resume_filename = file.filename
     profile.resume_text = resume_text
-    db.commit()
 
-    use_own_key, gemini_key = user_key_or_deduct(
+    # Commits the profile update above together with the credit hold
+    hold, gemini_key = user_key_or_reserve(
         db, current_user, CREDITS_PER_WORKFORCE_PROFILE_ANALYZE, "usage", "Workforce Profile Extraction"
     )
 
@@ -166,8 +173,7 @@ async def upload_workforce_resume(
     result = get_gemini_json_response(prompt, user_api_key=gemini_key)
 
     if not result or "error" in result:
-        if not use_own_key:
-            refund_credits(db, current_user.id, CREDITS_PER_WORKFORCE_PROFILE_ANALYZE, "Refund: workforce profile extraction failed")
+        release_credits(db, hold)
     else:
         profile.extracted_work_history = result.get("work_history", []) or []
         profile.extracted_skills = result.get("skills", []) or []
@@ -176,7 +182,8 @@ async def upload_workforce_resume(
         profile.extracted_years_experience = result.get("years_experience")
         profile.extracted_strengths = result.get("strengths", []) or []
         profile.extracted_missing_skills = result.get("missing_or_unclear_skills", []) or []
-        db.commit()
+        record_participant_skills(db, current_user.id, "extracted", profile.extracted_skills)
+        settle_credits(db, hold)
 
     db.refresh(profile)
     return profile
@@ -246,7 +253,7 @@ Rules:
     response_model=OrganizationDocumentResponse,
     dependencies=[Depends(rate_limit("workforce_context_upload", max_requests=15, window_seconds=60))],
 )
-async def upload_organization_document(
+def upload_organization_document(
     file: UploadFile = File(...),
     category: str = Form(...),
     current_user: User = Depends(get_current_user),
@@ -262,14 +269,14 @@ async def upload_organization_document(
     filename_lower = (file.filename or "").lower()
     is_image = filename_lower.endswith((".png", ".jpg", ".jpeg"))
 
-    content = await file.read()
+    content = file.file.read()
     if len(content) > MAX_DOC_SIZE:
         raise HTTPException(status_code=413, detail="File too large. Maximum document size is 25 MB.")
     size_kb = max(1, round(len(content) / 1024))
 
     doc_text = None if is_image else extract_text_from_file(file.filename or "", content, max_chars=15000)
 
-    use_own_key, gemini_key = user_key_or_deduct(
+    hold, gemini_key = user_key_or_reserve(
         db, current_user, CREDITS_PER_WORKFORCE_DOC_UPLOAD, "usage", f"Workforce Document Upload: {file.filename}"
     )
 
@@ -287,8 +294,8 @@ async def upload_organization_document(
         result = get_gemini_json_response(prompt, user_api_key=gemini_key)
 
     if not result or "error" in result:
-        if not use_own_key:
-            refund_credits(db, current_user.id, CREDITS_PER_WORKFORCE_DOC_UPLOAD, "Refund: document extraction failed")
+        release_credits(db, hold)
+        hold = None
         result = {}
 
     doc = OrganizationDocument(
@@ -308,22 +315,20 @@ async def upload_organization_document(
         extracted_mission_objectives=result.get("mission_objectives", []) or [],
     )
     db.add(doc)
-    db.commit()
+    settle_credits(db, hold)
     db.refresh(doc)
     return doc
 
 
-@router.get("/context", response_model=List[OrganizationDocumentResponse])
+@router.get("/context", response_model=Page[OrganizationDocumentResponse])
 def list_organization_documents(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    return (
-        db.query(OrganizationDocument)
-        .filter(OrganizationDocument.user_id == current_user.id)
-        .order_by(OrganizationDocument.uploaded_at.desc())
-        .all()
-    )
+    query = db.query(OrganizationDocument).filter(OrganizationDocument.user_id == current_user.id)
+    return keyset_page(query, OrganizationDocument.uploaded_at, OrganizationDocument.id, cursor, limit)
 
 
 @router.delete("/context/{doc_id}")
@@ -427,7 +432,7 @@ def run_workforce_analysis(
         .all()
     )
 
-    use_own_key, gemini_key = user_key_or_deduct(
+    hold, gemini_key = user_key_or_reserve(
         db, current_user, CREDITS_PER_WORKFORCE_ANALYSIS, "usage", "Workforce Analysis & Comparison"
     )
 
@@ -435,8 +440,7 @@ def run_workforce_analysis(
     result = get_gemini_json_response(prompt, user_api_key=gemini_key)
 
     if not result or "error" in result:
-        if not use_own_key:
-            refund_credits(db, current_user.id, CREDITS_PER_WORKFORCE_ANALYSIS, "Refund: workforce analysis failed")
+        release_credits(db, hold)
         raise HTTPException(status_code=502, detail=(result or {}).get("error", "AI could not complete the analysis. Please try again."))
 
     gap_summary = result.get("gap_summary") or {}
@@ -466,7 +470,8 @@ def run_workforce_analysis(
         document_ids=[d.id for d in docs],
     )
     db.add(analysis)
-    db.commit()
+    record_participant_skills(db, current_user.id, "missing", analysis.missing_skills)
+    settle_credits(db, hold)
     db.refresh(analysis)
     return analysis
 
@@ -543,7 +548,7 @@ def generate_workforce_roadmap(
     if not analysis:
         raise HTTPException(status_code=404, detail="Run the analysis (Step 3) before generating a roadmap.")
 
-    use_own_key, gemini_key = user_key_or_deduct(
+    hold, gemini_key = user_key_or_reserve(
         db, current_user, CREDITS_PER_WORKFORCE_ROADMAP, "usage", "Workforce Roadmap Generation"
     )
 
@@ -551,8 +556,7 @@ def generate_workforce_roadmap(
     result = get_gemini_json_response(prompt, user_api_key=gemini_key)
 
     if not result or "error" in result:
-        if not use_own_key:
-            refund_credits(db, current_user.id, CREDITS_PER_WORKFORCE_ROADMAP, "Refund: roadmap generation failed")
+        release_credits(db, hold)
         raise HTTPException(status_code=502, detail=(result or {}).get("error", "AI could not generate the roadmap. Please try again."))
 
     roadmap = WorkforceRoadmap(
@@ -567,7 +571,7 @@ def generate_workforce_roadmap(
         days_to_complete=result.get("days_to_complete"),
     )
     db.add(roadmap)
-    db.commit()
+    settle_credits(db, hold)
     db.refresh(roadmap)
     return roadmap
 
@@ -0,0 +1,81 @@
+"""
+Startup schema check — replaces Base.metadata.create_all on import.
+
+create_all inspects every table (one has_table round trip each) on every
+serverless cold start, and catalog used to run it again per request. Schema
+changes are now Alembic migrations (backend/alembic/versions/), applied as
+deploy steps, and startup only reads the single
+alembic_version row and compares it to SCHEMA_VERSION, once per process.
+
+A mismatch is logged loudly but doesn't stop the app from starting (same
+policy as the old create_all failure path): most endpoints keep working
+against a slightly older schema, and /api/health reports the state. Only the
+final revision is cached for the life of the process; a mismatch, a pending
+contract or a failed read is re-checked at most every SCHEMA_RECHECK_SECONDS
+(default 30), so running the migration after a deploy clears it without a
+cold start.
+
+Deploy with backend/scripts/deploy.sh — Vercel's Python build has no
+migration hook. Migrations are split expand/contract: SCHEMA_VERSION is the
+revision this build needs, applied before `vercel deploy --prod` while the
+previous build is still serving, so everything up to it must be safe for
+that build too. SCHEMA_CONTRACT, when set, is the release's follow-up
+migration (dropped columns, unique indexes the previous build's writes
+would violate); deploy.sh runs it once the new build is live. This build
+accepts either revision, and code that depends on the contract checks
+contract_pending().
+
+SCHEMA_VERSION (and SCHEMA_CONTRACT) must be bumped together with every new
+migration — tests/test_schema_version.py fails if they drift from the
+Alembic head.
+"""
+import logging
+import os
+import time
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = "0008_deletion_requested"
+SCHEMA_CONTRACT: str | None = "0009_contract_progress_units"
+
+SCHEMA_RECHECK_SECONDS = float(os.getenv("SCHEMA_RECHECK_SECONDS", "30"))
+
+# Filled in by check_schema_version(): {"expected", "current", "ok", "contract_pending"}
+schema_status: dict = {}
+_checked_at = 0.0
+
+
+def check_schema_version(engine) -> dict:
+    """Read the database's Alembic revision and compare it to SCHEMA_VERSION
+    (or SCHEMA_CONTRACT). The final revision is cached for good, anything
+    else for SCHEMA_RECHECK_SECONDS; never raises."""
+    global _checked_at
+    final = SCHEMA_CONTRACT or SCHEMA_VERSION
+    if schema_status and (schema_status["current"] == final
+                          or time.monotonic() - _checked_at < SCHEMA_RECHECK_SECONDS):
+        return schema_status
+    _checked_at = time.monotonic()
+    try:
+        with engine.connect() as conn:
+            current = conn.execute(text("SELECT version_num FROM alembic_version")).scalar()
+    except Exception as e:
+        current = None
+        logger.warning("Could not read schema version (%s) — run `alembic upgrade head` "
+                       "(or `alembic stamp 0001_baseline` first on a database created before migrations)", e)
+    schema_status.update(
+        expected=SCHEMA_VERSION, current=current, ok=current in (SCHEMA_VERSION, final),
+        contract_pending=current == SCHEMA_VERSION != final,
+    )
+    if current is not None and not schema_status["ok"]:
+        logger.error("Database schema is at %s but this build expects %s — run `alembic upgrade %s`",
+                     current, SCHEMA_VERSION, SCHEMA_VERSION)
+    return schema_status
+
+
+def contract_pending(engine) -> bool:
+    """True while the database is at SCHEMA_VERSION and SCHEMA_CONTRACT
+    hasn't run yet — the window in which the previous build may still be
+    writing. Goes through check_schema_version's cache."""
+    return check_schema_version(engine)["contract_pending"]
@@ -1,6 +1,15 @@
 from pydantic import BaseModel, EmailStr, model_validator
-from typing import Optional, List, Dict, Any
-from datetime import datetime
+from typing import Optional, List, Dict, Any, Generic, TypeVar
+from datetime import date, datetime
+
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    """Keyset-paginated list envelope (see app/pagination.py). next_cursor is
+    None on the last page."""
+    items: List[T]
+    next_cursor: Optional[str] = None
 
 # Auth Schemas
 class UserCreate(BaseModel):
@@ -374,6 +383,49 @@ class OrganizationMemberInvite(BaseModel):
     role: str = "participant"  # 'participant' | 'org_admin'
 
 
+class BulkMemberInviteEntry(BaseModel):
+    email: str  # validated per entry, so one bad address doesn't reject the batch
+    role: str = "participant"
+
+
+class OrganizationBulkInvite(BaseModel):
+    """Members as a list, as CSV text (header row with an `email` column and
+    an optional `role` column), or both."""
+    members: List[BulkMemberInviteEntry] = []
+    csv: Optional[str] = None
+
+
+class BulkInviteResult(BaseModel):
+    email: str
+    # 'added' | 'updated' | 'unchanged' | 'not_found' | 'invalid_email' | 'invalid_role' | 'duplicate'
+    status: str
+    user_id: Optional[int] = None
+    role: Optional[str] = None
+
+
+class OrganizationBulkInviteResponse(BaseModel):
+    organization_id: int
+    results: List[BulkInviteResult]  # one per submitted row, in order
+    counts: Dict[str, int]  # status -> rows
+    elapsed_ms: float
+
+
+class OrganizationCreditGrant(BaseModel):
+    amount: int  # credits per member, 1..MAX_CREDIT_GRANT
+    description: Optional[str] = None
+    # Filters — omitted means every member of the organization
+    role: Optional[str] = None  # 'participant' | 'org_admin'
+    user_ids: Optional[List[int]] = None
+
+
+class OrganizationCreditGrantResponse(BaseModel):
+    organization_id: int
+    amount: int
+    granted_user_ids: List[int]
+    total_credits: int
+    elapsed_ms: float
+
+
 class OrganizationMemberResponse(BaseModel):
     user_id: int
     email: str
@@ -408,6 +460,7 @@ class OrganizationReadinessSummary(BaseModel):
     average_readiness_score: Optional[float] = None
     readiness_distribution: dict  # {"Beginner Readiness": 3, "Moderate Readiness": 5, ...}
     most_common_gaps: List[dict]  # [{"gap": "SIEM & Log Analysis", "count": 4}, ...]
+    most_common_missing_skills: List[dict] = []  # [{"skill": "Splunk", "count": 3}, ...] — canonical skills
     participants: List[ParticipantReadinessSummary]
 
 
@@ -439,4 +492,76 @@ class OrganizationAIInteractionSummary(BaseModel):
     total_credits_used: int
     by_feature: List[AIInteractionFeatureCount]
     recent_events: List[AIInteractionEvent]  # most recent N, newest first
+    next_cursor: Optional[str] = None  # pass back as ?cursor= for the next (older) page of recent_events
+
+
+class DailyUsagePoint(BaseModel):
+    day: date
+    interactions: int
+    credits_used: int
+
 
+class OrganizationUsageReport(BaseModel):
+    """Time-range AI usage for an organization, served from daily rollups —
+    cost is independent of how large the credit ledger has grown."""
+    organization_id: int
+    organization_name: str
+    start: date
+    end: date  # exclusive
+    total_interactions: int
+    total_credits_used: int
+    by_feature: List[AIInteractionFeatureCount]
+    daily: List[DailyUsagePoint]  # only days with usage, oldest first
+
+
+class DatabasePoolStats(BaseModel):
+    """One engine's connection pool, from app/db_metrics.pool_stats().
+    Gauges are None for pools that don't have them (e.g. SQLite's)."""
+    engine: str  # "primary" | "replica" | "async"
+    pool_class: str
+    size: Optional[int] = None
+    checked_out: Optional[int] = None
+    checked_in: Optional[int] = None
+    overflow: Optional[int] = None  # negative while the pool is below pool_size
+    checkouts: int
+    connects: int  # new physical connections (handshakes)
+    invalidations: int  # includes connections dropped by a failed pool_pre_ping
+    checkout_wait_ms: Dict[str, int] = {}  # histogram, e.g. {"<=1ms": 120, "<=5ms": 3, ...}
+    checkout_wait_avg_ms: Optional[float] = None
+    checkout_wait_max_ms: Optional[float] = None
+
+
+class DatabaseMetrics(BaseModel):
+    """Process-local since startup — each serverless instance reports its own pools."""
+    pools: List[DatabasePoolStats]
+
+
+class MemoryCacheStats(BaseModel):
+    """One of app/cache.py's in-process LRUs."""
+    entries: int
+    max_entries: int
+    approx_bytes: int
+    hits: int
+    misses: int
+    hit_ratio: Optional[float] = None  # None before the first lookup
+    evictions: int  # live entries pushed out by the size bound
+    expirations: int  # expired entries dropped on read, eviction or sweep
+    sweeps: int
+
+
+class NearCacheStats(MemoryCacheStats):
+    policies: Dict[str, float]  # key prefix -> L1 TTL seconds
+
+
+class RedisCacheStats(BaseModel):
+    hits: int
+    misses: int
+    hit_ratio: Optional[float] = None
+    errors: int
+
+
+class CacheMetrics(BaseModel):
+    backend: str  # "redis" | "memory"
+    memory: MemoryCacheStats  # the whole cache without Upstash; fallback when an Upstash write fails
+    near: NearCacheStats  # L1 in front of Upstash
+    redis: RedisCacheStats  # Upstash GETs that got past L1
@@ -0,0 +1,207 @@
+"""
+Account deletion — removes a user and everything that hangs off them.
+
+Going through the ORM relationships on User would load every child row
+(the full ledger, every lesson and roadmap JSON blob) just to delete it.
+purge_user() instead issues one bulk `DELETE ... WHERE user_id = :id` per
+table, children before parents (PURGE_ORDER), then the user row — all in one
+transaction, so a failure part-way leaves the account intact rather than
+half-deleted. The avatar file is removed only after the commit.
+
+Organizations the user created can't keep a dangling created_by: they are
+handed to another org_admin when there is one, deleted when the user was
+their only member, and otherwise block the purge (AccountPurgeBlocked) until
+an admin is appointed.
+
+DELETE /api/auth/me purges small accounts inline and hands large ones
+(more than ACCOUNT_PURGE_INLINE_MAX_ROWS ledger rows, default 5000) to
+purge_user_job() as a background task after deactivating them and stamping
+deletion_requested_at. A deactivated user can no longer authenticate
+(user_cache.get_user returns None), and any user still in the table with
+deletion_requested_at set is a purge that failed or never ran — serverless
+platforms can drop background tasks. purge_pending_deletions() retries all
+of them; accounts that are merely inactive (suspended by an operator) are
+left alone. Run it as a scheduled job, `python -m app.services.account_purge`,
+which exits non-zero if any purge still fails. One account can also be
+purged by hand: `python -m app.services.account_purge <user_id>`.
+"""
+import logging
+import os
+import sys
+import time
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+
+from app import storage
+from app.models import (
+    CareerProfile,
+    CourseEnrollment,
+    CreditHold,
+    CreditLedgerMonth,
+    CreditTransaction,
+    CreditTransactionArchive,
+    DailyUsageRollup,
+    ExceptionModel,
+    Lesson,
+    Organization,
+    OrganizationDocument,
+    OrganizationMembership,
+    ParticipantSkill,
+    PasswordResetToken,
+    Resume,
+    Roadmap,
+    User,
+    UserProgress,
+    WorkforceAnalysis,
+    WorkforceProfile,
+    WorkforceRoadmap,
+)
+from app.user_cache import mark_user_changed
+
+logger = logging.getLogger(__name__)
+
+ACCOUNT_PURGE_INLINE_MAX_ROWS = int(os.getenv("ACCOUNT_PURGE_INLINE_MAX_ROWS", "5000"))
+
+# Every table with a user_id, children before the tables they reference
+PURGE_ORDER = [
+    UserProgress,  # -> lessons, roadmaps
+    WorkforceRoadmap,  # -> workforce_analyses
+    WorkforceAnalysis,  # -> workforce_profiles
+    WorkforceProfile,
+    OrganizationDocument,
+    ParticipantSkill,
+    Lesson,
+    Roadmap,
+    Resume,
+    CareerProfile,
+    ExceptionModel,
+    CourseEnrollment,
+    CreditHold,
+    CreditTransaction,
+    CreditTransactionArchive,
+    CreditLedgerMonth,
+    DailyUsageRollup,
+    PasswordResetToken,
+    OrganizationMembership,
+]
+
+
+class AccountPurgeBlocked(Exception):
+    """The user is the only admin of an organization that has other members."""
+
+
+def is_large_account(db: Session, user_id: int) -> bool:
+    """True when the user has more than ACCOUNT_PURGE_INLINE_MAX_ROWS ledger
+    rows — the table that grows without bound. A single indexed probe at that
+    offset, not a count."""
+    return db.query(CreditTransaction.id).filter(
+        CreditTransaction.user_id == user_id,
+    ).offset(ACCOUNT_PURGE_INLINE_MAX_ROWS).first() is not None
+
+
+def release_organizations(db: Session, user_id: int) -> int:
+    """Hand each organization the user created to its longest-standing other
+    org_admin, or delete it if nobody else is in it. Returns the number of
+    organizations deleted. Raises AccountPurgeBlocked. No commit."""
+    deleted = 0
+    for org_id in db.scalars(select(Organization.id).where(Organization.created_by_user_id == user_id)).all():
+        others = db.execute(
+            select(OrganizationMembership.user_id, OrganizationMembership.role)
+            .where(OrganizationMembership.organization_id == org_id, OrganizationMembership.user_id != user_id)
+            .order_by(OrganizationMembership.joined_at, OrganizationMembership.id)
+        ).all()
+        successor = next((other for other, role in others if role == "org_admin"), None)
+        if successor is not None:
+            db.execute(update(Organization).where(Organization.id == org_id).values(created_by_user_id=successor))
+        elif not others:
+            db.execute(delete(OrganizationMembership).where(OrganizationMembership.organization_id == org_id))
+            db.execute(delete(Organization).where(Organization.id == org_id))
+            deleted += 1
+        else:
+            raise AccountPurgeBlocked(
+                f"Organization {org_id} has other members but no other org_admin — appoint one first"
+            )
+    return deleted
+
+
+def purge_user(db: Session, user_id: int) -> dict[str, int]:
+    """Delete the user and all of their rows in one transaction. Commits.
+    Returns {table: rows deleted}; empty if the user doesn't exist. Raises
+    AccountPurgeBlocked (after rolling back) when an organization would be
+    left without an admin."""
+    user = db.execute(select(User.id, User.profile_image).where(User.id == user_id)).first()
+    if user is None:
+        return {}
+
+    counts: dict[str, int] = {}
+    try:
+        counts["organizations"] = release_organizations(db, user_id)
+        for model in PURGE_ORDER:
+            counts[model.__tablename__] = db.execute(delete(model).where(model.user_id == user_id)).rowcount
+        counts["users"] = db.execute(delete(User).where(User.id == user_id)).rowcount
+        mark_user_changed(db, user_id)
+        # Drop a loaded User (e.g. the request's current_user) so commit's
+        # expire-all doesn't leave an instance pointing at a deleted row
+        loaded = db.identity_map.get(db.identity_key(User, user_id))
+        if loaded is not None:
+            db.expunge(loaded)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    if user.profile_image:
+        storage.delete_file(user.profile_image)
+    return counts
+
+
+def purge_user_job(user_id: int) -> dict[str, int]:
+    """purge_user() in its own session — for BackgroundTasks and the CLI."""
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    started = time.perf_counter()
+    try:
+        counts = purge_user(db, user_id)
+    except Exception:
+        logger.exception("Account purge failed for user %s", user_id)
+        raise
+    finally:
+        db.close()
+    logger.info("Purged user %s: %d rows in %.0f ms", user_id, sum(counts.values()),
+                (time.perf_counter() - started) * 1000)
+    return counts
+
+
+def purge_pending_deletions(db: Session) -> tuple[list[int], list[int]]:
+    """Purge every account with a pending deletion request, each in its own
+    transaction.
+    Returns (purged_user_ids, failed_user_ids); failures are logged and
+    don't stop the sweep."""
+    purged, failed = [], []
+    for user_id in db.scalars(select(User.id).where(User.deletion_requested_at.isnot(None)).order_by(User.id)).all():
+        try:
+            purge_user(db, user_id)
+        except Exception:
+            logger.exception("Account purge failed for user %s", user_id)
+            failed.append(user_id)
+        else:
+            purged.append(user_id)
+    return purged, failed
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        purged = purge_user_job(int(sys.argv[1]))
+        print(f"Deleted {sum(purged.values())} rows: {purged}" if purged else "No such user")
+    else:
+        from app.database import SessionLocal
+
+        session = SessionLocal()
+        try:
+            purged_ids, failed_ids = purge_pending_deletions(session)
+        finally:
+            session.close()
+        print(f"Purged {len(purged_ids)} accounts pending deletion" + (f"; failed: {failed_ids}" if failed_ids else ""))
+        sys.exit(1 if failed_ids else 0)
@@ -0,0 +1,77 @@
+"""
+Catalog course registry and compact enrollment progress.
+
+The catalog itself (titles, YouTube searches, descriptions) lives in the
+frontend's lib/courseCatalog.ts; the backend only needs each course's unit
+count, kept here in CATALOG_COURSES. With it, progress is stored as a bitset
+— CourseEnrollment.completed_mask, bit i set once unit i is done — plus the
+derived completed_count and completed flag, all computed when a unit is
+completed rather than on every read. Completion rates for the whole catalog
+are then one GROUP BY over course_enrollments.
+
+Adding a course to the frontend catalog means adding it here too; unknown
+course ids are rejected (404) so a typo can't create enrollments no
+aggregate will ever count.
+"""
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+
+from app.models import CourseEnrollment
+
+# course id -> title and unit count, mirroring frontend/lib/courseCatalog.ts.
+# At most 63 units a course: completed_mask is a signed 64-bit integer.
+CATALOG_COURSES = {
+    "python-fundamentals": {"title": "Python Fundamentals", "units": 10},
+    "javascript-essentials": {"title": "JavaScript Essentials", "units": 10},
+    "react-development": {"title": "React Development", "units": 10},
+    "data-science-python": {"title": "Data Science with Python", "units": 10},
+    "web-development-fullstack": {"title": "Full-Stack Web Development", "units": 10},
+    "sql-databases": {"title": "SQL & Databases", "units": 10},
+    "git-devops": {"title": "Git, Linux & DevOps Basics", "units": 10},
+    "machine-learning": {"title": "Machine Learning A-Z", "units": 10},
+}
+
+
+def full_mask(course_id: str) -> int:
+    return (1 << CATALOG_COURSES[course_id]["units"]) - 1
+
+
+def units_from_mask(mask: int) -> list[int]:
+    """Completed unit indices, ascending."""
+    return [i for i in range(mask.bit_length()) if mask >> i & 1]
+
+
+def mark_unit_complete(enrollment: CourseEnrollment, unit_index: int) -> None:
+    """Set the unit's bit and recompute completed_count/completed. No commit."""
+    mask = (enrollment.completed_mask or 0) | 1 << unit_index
+    complete = full_mask(enrollment.course_id)
+    enrollment.completed_mask = mask
+    enrollment.completed_count = mask.bit_count()
+    enrollment.completed = mask & complete == complete
+
+
+def course_completion_rates(db: Session) -> list[dict]:
+    """Enrollments, completions and average progress for every catalog
+    course — one aggregate query; courses nobody has enrolled in get zeros."""
+    stats = {
+        course_id: (enrolled, completed, avg_units)
+        for course_id, enrolled, completed, avg_units in db.query(
+            CourseEnrollment.course_id,
+            func.count(CourseEnrollment.id),
+            func.sum(case((CourseEnrollment.completed.is_(True), 1), else_=0)),
+            func.avg(CourseEnrollment.completed_count),
+        ).group_by(CourseEnrollment.course_id)
+    }
+    rates = []
+    for course_id, course in CATALOG_COURSES.items():
+        enrolled, completed, avg_units = stats.get(course_id, (0, 0, None))
+        rates.append({
+            "course_id": course_id,
+            "title": course["title"],
+            "unit_count": course["units"],
+            "enrolled": enrolled,
+            "completed": completed or 0,
+            "completion_rate": round((completed or 0) / enrolled, 4) if enrolled else 0.0,
+            "average_progress": round(float(avg_units) / course["units"], 4) if avg_units is not None else 0.0,
+        })
+    return rates
@@ -0,0 +1,135 @@
+"""
+Credit ledger archival — keeps credit_transactions down to a hot window.
+
+credit_transactions is append-only and every history, AI-interaction and
+summary query hits it, so left alone its indexes and vacuum cost grow with
+all-time usage. archive_credit_ledger() moves whole months older than
+CREDIT_LEDGER_HOT_MONTHS (default 12) into credit_transactions_archive and,
+in the same transaction, adds them to credit_ledger_months — a per-user,
+per-month, per-(kind, description) carry-forward of counts and net amounts.
+Usage analytics (the org AI-interaction summary, /usage) read
+DailyUsageRollup, which archival leaves alone; the carry-forward keeps
+every other kind's monthly totals without touching the archive, which
+only audits and rollup rebuilds read.
+
+One month per transaction, oldest first, so a run over a large backlog
+holds no long locks and can be interrupted and re-run safely: a month is
+either still entirely in the hot table or entirely archived and summarized.
+
+Run it as a scheduled job: `python -m app.services.ledger_archive`.
+"""
+import os
+from datetime import date, datetime, timezone
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.database import dialect_insert
+from app.models import CreditLedgerMonth, CreditTransaction, CreditTransactionArchive
+
+CREDIT_LEDGER_HOT_MONTHS = int(os.getenv("CREDIT_LEDGER_HOT_MONTHS", "12"))
+
+_ARCHIVED_COLUMNS = ["id", "user_id", "amount", "kind", "description", "created_at"]
+
+
+def month_floor(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(month: date, n: int) -> date:
+    index = month.year * 12 + month.month - 1 + n
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _as_utc(month: date) -> datetime:
+    return datetime.combine(month, datetime.min.time(), tzinfo=timezone.utc)
+
+
+def _carry_forward(db: Session, month: date, rows) -> None:
+    """Add one month's (user_id, kind, description, count, amount) groups to
+    credit_ledger_months."""
+    if not rows:
+        return
+    values = [
+        {"user_id": r.user_id, "month": month, "kind": r.kind, "description": r.description,
+         "transaction_count": r.count, "amount": r.amount}
+        for r in rows
+    ]
+    insert_ = dialect_insert(db)
+    if insert_ is not None:
+        stmt = insert_(CreditLedgerMonth).values(values)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=["user_id", "month", "kind", "description"],
+            set_={
+                "transaction_count": CreditLedgerMonth.transaction_count + stmt.excluded.transaction_count,
+                "amount": CreditLedgerMonth.amount + stmt.excluded.amount,
+            },
+        ))
+        return
+    for v in values:
+        updated = (
+            db.query(CreditLedgerMonth)
+            .filter(CreditLedgerMonth.user_id == v["user_id"], CreditLedgerMonth.month == month,
+                    CreditLedgerMonth.kind == v["kind"], CreditLedgerMonth.description == v["description"])
+            .update({
+                CreditLedgerMonth.transaction_count: CreditLedgerMonth.transaction_count + v["transaction_count"],
+                CreditLedgerMonth.amount: CreditLedgerMonth.amount + v["amount"],
+            }, synchronize_session=False)
+        )
+        if not updated:
+            db.add(CreditLedgerMonth(**v))
+    db.flush()
+
+
+def archive_credit_ledger(db: Session, before: date | None = None) -> int:
+    """Archive every ledger row created before `before` (rounded down to a
+    month start; default: CREDIT_LEDGER_HOT_MONTHS months before the current
+    month). Commits once per month. Returns the number of rows archived."""
+    before = month_floor(before or add_months(datetime.now(timezone.utc).date(), -CREDIT_LEDGER_HOT_MONTHS))
+    oldest = db.query(func.min(CreditTransaction.created_at)).filter(
+        CreditTransaction.created_at < _as_utc(before),
+    ).scalar()
+    if oldest is None:
+        return 0
+
+    archived = 0
+    month = month_floor(oldest.date())
+    while month < before:
+        in_month = (
+            CreditTransaction.created_at >= _as_utc(month),
+            CreditTransaction.created_at < _as_utc(add_months(month, 1)),
+        )
+        description = func.coalesce(CreditTransaction.description, "Unknown")
+        groups = (
+            db.query(
+                CreditTransaction.user_id,
+                CreditTransaction.kind,
+                description.label("description"),
+                func.count(CreditTransaction.id).label("count"),
+                func.sum(CreditTransaction.amount).label("amount"),
+            )
+            .filter(*in_month)
+            .group_by(CreditTransaction.user_id, CreditTransaction.kind, description)
+            .all()
+        )
+        if groups:
+            _carry_forward(db, month, groups)
+            db.execute(insert(CreditTransactionArchive).from_select(
+                _ARCHIVED_COLUMNS,
+                select(*(getattr(CreditTransaction, c) for c in _ARCHIVED_COLUMNS)).where(*in_month),
+            ))
+            db.execute(delete(CreditTransaction).where(*in_month))
+            db.commit()
+            archived += sum(g.count for g in groups)
+        month = add_months(month, 1)
+    return archived
+
+
+if __name__ == "__main__":
+    from app.database import SessionLocal
+
+    session = SessionLocal()
+    try:
+        print(f"Archived {archive_credit_ledger(session)} credit ledger rows")
+    finally:
+        session.close()
@@ -0,0 +1,115 @@
+"""
+Learner progress — one UserProgress row per (user, progress_type, target).
+
+POST /api/dashboard/progress used to insert a new row on every save, so a
+learner saving once a minute piled up thousands of rows and the dashboard
+loaded all of them to count completions in Python. record_progress() now
+upserts: completion_percentage takes the latest value, time_spent is
+accumulated and a quiz score is appended to quiz_scores — all in one
+INSERT ... ON CONFLICT DO UPDATE statement, so concurrent saves can't lose an
+increment. progress_counts() does the dashboard's counting in SQL.
+
+The upsert needs the unique (user_id, progress_type, target_id) index, which
+only exists once the release's contract migration has run; until then
+(contract_pending()) saves take the locked read-then-write path, and the
+contract migration merges whatever duplicates the previous build added.
+"""
+from sqlalchemy import JSON, case, cast, func, literal
+from sqlalchemy.orm import Session
+
+from app.database import dialect_insert
+from app.models import UserProgress
+from app.schema_version import contract_pending
+
+
+def _target_id(lesson_id: int | None, roadmap_id: int | None) -> int:
+    return lesson_id or roadmap_id or 0
+
+
+def _appended_scores(db: Session, score: float):
+    """SQL expression for quiz_scores with `score` appended — JSON arrays have
+    no portable append, so this is per dialect."""
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import JSONB
+        existing = func.coalesce(cast(UserProgress.quiz_scores, JSONB), cast(literal("[]"), JSONB))
+        return cast(existing.op("||")(func.jsonb_build_array(score)), JSON)
+    return func.json_insert(func.coalesce(UserProgress.quiz_scores, "[]"), "$[#]", score)
+
+
+def record_progress(
+    db: Session,
+    user_id: int,
+    progress_type: str,
+    completion_percentage: float,
+    time_spent: int,
+    lesson_id: int | None = None,
+    roadmap_id: int | None = None,
+    quiz_score: float | None = None,
+) -> int:
+    """Create or update the user's progress row for this target and return
+    its id. Joins the caller's transaction — no commit."""
+    target_id = _target_id(lesson_id, roadmap_id)
+
+    insert = dialect_insert(db)
+    if insert is not None and not contract_pending(db.get_bind()):
+        stmt = insert(UserProgress).values(
+            user_id=user_id,
+            progress_type=progress_type,
+            target_id=target_id,
+            lesson_id=lesson_id,
+            roadmap_id=roadmap_id,
+            completion_percentage=completion_percentage,
+            time_spent=time_spent,
+        )
+        if quiz_score is not None:
+            # Left out otherwise — a None would be stored as JSON 'null', not SQL NULL
+            stmt = stmt.values(quiz_scores=[quiz_score])
+        set_ = {
+            "completion_percentage": stmt.excluded.completion_percentage,
+            "time_spent": func.coalesce(UserProgress.time_spent, 0) + stmt.excluded.time_spent,
+            "last_accessed": func.now(),
+        }
+        if quiz_score is not None:
+            set_["quiz_scores"] = _appended_scores(db, quiz_score)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id", "progress_type", "target_id"],
+            set_=set_,
+        ).returning(UserProgress.id)
+        return db.execute(stmt).scalar_one()
+
+    progress = (
+        db.query(UserProgress)
+        .filter(
+            UserProgress.user_id == user_id,
+            UserProgress.progress_type == progress_type,
+            UserProgress.target_id == target_id,
+        )
+        .with_for_update()
+        .first()
+    )
+    if progress is None:
+        progress = UserProgress(
+            user_id=user_id, progress_type=progress_type, target_id=target_id,
+            lesson_id=lesson_id, roadmap_id=roadmap_id, time_spent=0,
+        )
+        db.add(progress)
+    progress.completion_percentage = completion_percentage
+    progress.time_spent = (progress.time_spent or 0) + time_spent
+    progress.last_accessed = func.now()
+    if quiz_score is not None:
+        progress.quiz_scores = [*(progress.quiz_scores or []), quiz_score]
+    db.flush()
+    return progress.id
+
+
+def progress_counts(db: Session, user_id: int, progress_type: str = "lesson") -> tuple[int, int]:
+    """(completed, in_progress) for the user's progress rows of this type,
+    counted in the database."""
+    completed, in_progress = db.query(
+        func.count(case((UserProgress.completion_percentage >= 100, 1))),
+        func.count(case((UserProgress.completion_percentage < 100, 1))),
+    ).filter(
+        UserProgress.user_id == user_id,
+        UserProgress.progress_type == progress_type,
+    ).one()
+    return completed, in_progress
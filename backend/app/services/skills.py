@@ -0,0 +1,188 @@
+"""
+Skill taxonomy — maps the free-text skill strings Gemini (and participants)
+produce onto canonical Skill rows, and keeps the ParticipantSkill fact table
+in step with each workforce extraction.
+
+normalize_skill_key() folds case, punctuation and word order, so "SIEM
+(Splunk)" and "splunk SIEM" share a key. SkillAlias maps keys to skills; a
+key seen for the first time is resolved through BUILTIN_SKILL_ALIASES
+(common spellings of the same skill) or else becomes a new canonical skill.
+Merging two skills later is an UPDATE on skill_aliases — nothing in the JSON
+columns has to change.
+
+record_participant_skills() is called in the same transaction as the profile
+or analysis write it mirrors (no commit). rebuild_participant_skills() is the
+catch-up job that backfills facts from the JSON columns, for participants
+whose profiles predate these tables and after BUILTIN_SKILL_ALIASES changes.
+scripts/deploy.sh runs it after every deploy:
+
+    python -m app.services.skills
+"""
+import re
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.database import dialect_insert
+from app.models import (
+    OrganizationMembership,
+    ParticipantSkill,
+    Skill,
+    SkillAlias,
+    WorkforceAnalysis,
+    WorkforceProfile,
+)
+
+# canonical name -> other spellings of the same skill
+BUILTIN_SKILL_ALIASES: dict[str, list[str]] = {
+    "Splunk": ["splunk siem", "siem (splunk)", "splunk enterprise"],
+    "SIEM": ["security information and event management", "siem tools"],
+    "Microsoft Sentinel": ["azure sentinel"],
+    "Incident Response": ["incident handling", "ir"],
+    "Identity and Access Management": ["iam"],
+    "Active Directory": ["microsoft active directory", "ad"],
+    "Phishing Analysis": ["phishing investigation", "email phishing analysis"],
+    "Python": ["python programming", "python3"],
+}
+
+_SEPARATORS = re.compile(r"[^a-z0-9+#.]+")
+
+
+def normalize_skill_key(raw: str) -> str:
+    """Lowercased, punctuation-free, word-order-independent key for a skill
+    string. "" for strings with nothing left."""
+    tokens = {token.strip(".") for token in _SEPARATORS.split(raw.lower())}
+    return " ".join(sorted(token for token in tokens if token))
+
+
+_BUILTIN_BY_KEY = {
+    normalize_skill_key(spelling): canonical
+    for canonical, spellings in BUILTIN_SKILL_ALIASES.items()
+    for spelling in [canonical, *spellings]
+}
+
+
+def _insert_missing(db: Session, model, rows: list[dict], key: str) -> None:
+    """INSERT rows whose `key` column isn't taken yet, skipping the rest."""
+    if not rows:
+        return
+    insert = dialect_insert(db)
+    if insert is not None:
+        db.execute(insert(model).values(rows).on_conflict_do_nothing(index_elements=[key]))
+        return
+    column = getattr(model, key)
+    taken = {value for (value,) in db.query(column).filter(column.in_([r[key] for r in rows]))}
+    db.add_all(model(**r) for r in rows if r[key] not in taken)
+    db.flush()
+
+
+def resolve_skill_ids(db: Session, names, create: bool = True) -> list[int]:
+    """Canonical skill ids for raw skill strings, deduplicated, in first-seen
+    order. Unknown spellings are added to the taxonomy (no commit) — or, with
+    create=False, for lookups (e.g. on a read replica), matched through
+    BUILTIN_SKILL_ALIASES if possible and otherwise left out."""
+    raw_by_key: dict[str, str] = {}
+    for name in names or []:
+        if isinstance(name, str) and (key := normalize_skill_key(name)):
+            raw_by_key.setdefault(key, name.strip())
+    if not raw_by_key:
+        return []
+
+    skill_by_key = dict(
+        db.query(SkillAlias.alias_key, SkillAlias.skill_id).filter(SkillAlias.alias_key.in_(raw_by_key))
+    )
+    unknown = [key for key in raw_by_key if key not in skill_by_key]
+    if unknown and not create:
+        canonical_key = {key: normalize_skill_key(_BUILTIN_BY_KEY[key]) for key in unknown if key in _BUILTIN_BY_KEY}
+        skill_by_canonical = dict(
+            db.query(SkillAlias.alias_key, SkillAlias.skill_id).filter(SkillAlias.alias_key.in_(set(canonical_key.values())))
+        )
+        skill_by_key.update(
+            (key, skill_by_canonical[canonical]) for key, canonical in canonical_key.items() if canonical in skill_by_canonical
+        )
+        return list(dict.fromkeys(skill_by_key[key] for key in raw_by_key if key in skill_by_key))
+    if unknown:
+        canonical_name = {key: _BUILTIN_BY_KEY.get(key, raw_by_key[key]) for key in unknown}
+        canonical_key = {key: normalize_skill_key(name) for key, name in canonical_name.items()}
+        _insert_missing(db, Skill, [
+            {"key": canonical_key[key], "name": canonical_name[key]}
+            for key in {canonical_key[k]: k for k in unknown}.values()
+        ], "key")
+        skill_id_by_canonical = dict(
+            db.query(Skill.key, Skill.id).filter(Skill.key.in_(set(canonical_key.values())))
+        )
+        alias_rows = {
+            alias: skill_id_by_canonical[canonical_key[key]]
+            for key in unknown
+            for alias in (key, canonical_key[key])
+        }
+        _insert_missing(db, SkillAlias, [
+            {"alias_key": alias, "skill_id": skill_id} for alias, skill_id in alias_rows.items()
+        ], "alias_key")
+        # Re-read: a concurrent writer may have claimed an alias first
+        skill_by_key.update(
+            db.query(SkillAlias.alias_key, SkillAlias.skill_id).filter(SkillAlias.alias_key.in_(unknown))
+        )
+
+    return list(dict.fromkeys(skill_by_key[key] for key in raw_by_key))
+
+
+def record_participant_skills(db: Session, user_id: int, source: str, names) -> None:
+    """Replace the user's `source` facts ('self_reported', 'extracted' or
+    'missing') with the canonical skills behind `names`. No commit."""
+    skill_ids = resolve_skill_ids(db, names)
+    db.query(ParticipantSkill).filter(
+        ParticipantSkill.user_id == user_id, ParticipantSkill.source == source,
+    ).delete(synchronize_session=False)
+    if skill_ids:
+        db.bulk_insert_mappings(ParticipantSkill, [
+            {"user_id": user_id, "skill_id": skill_id, "source": source} for skill_id in skill_ids
+        ])
+
+
+def rebuild_participant_skills(db: Session) -> int:
+    """Rewrite every participant's facts from their latest profile and
+    analysis JSON. Commits. Returns the number of participants processed."""
+    users: set[int] = set()
+    for profile in db.query(WorkforceProfile).order_by(WorkforceProfile.user_id, WorkforceProfile.created_at.desc()):
+        if profile.user_id in users:
+            continue
+        users.add(profile.user_id)
+        record_participant_skills(db, profile.user_id, "self_reported", profile.primary_skills)
+        record_participant_skills(db, profile.user_id, "extracted", profile.extracted_skills)
+
+    analysed: set[int] = set()
+    for analysis in db.query(WorkforceAnalysis).order_by(WorkforceAnalysis.user_id, WorkforceAnalysis.created_at.desc()):
+        if analysis.user_id in analysed:
+            continue
+        analysed.add(analysis.user_id)
+        record_participant_skills(db, analysis.user_id, "missing", analysis.missing_skills)
+
+    db.commit()
+    return len(users | analysed)
+
+
+def organization_skill_counts(db: Session, org_id: int, source: str, limit: int = 10) -> list:
+    """(skill name, participant count) for the org's current members with a
+    `source` fact, most common first — an integer join over the fact table."""
+    participants = func.count(func.distinct(ParticipantSkill.user_id))
+    return (
+        db.query(Skill.name, participants.label("count"))
+        .join(ParticipantSkill, ParticipantSkill.skill_id == Skill.id)
+        .join(OrganizationMembership, OrganizationMembership.user_id == ParticipantSkill.user_id)
+        .filter(OrganizationMembership.organization_id == org_id, ParticipantSkill.source == source)
+        .group_by(Skill.id, Skill.name)
+        .order_by(participants.desc(), Skill.name)
+        .limit(limit)
+        .all()
+    )
+
+
+if __name__ == "__main__":
+    from app.database import SessionLocal
+
+    session = SessionLocal()
+    try:
+        print(f"Rebuilt skill facts for {rebuild_participant_skills(session)} participants")
+    finally:
+        session.close()
@@ -0,0 +1,175 @@
+"""
+Daily AI-usage rollups — the read model behind time-range usage analytics.
+
+Every 'usage' CreditTransaction also bumps one DailyUsageRollup row for
+(day, user, feature) in the same transaction (record_usage), so an org's
+usage over any date range is a scan over at most days x members x features
+rows, independent of how large credit_transactions grows.
+
+Migration 0002 fills the table from the ledger when it creates it.
+rebuild_usage_rollups() recomputes a day range straight from the ledger,
+archived months included (credit_transactions_archive) — the repair job for
+when rollups are suspected to have drifted (e.g. ledger rows written by a
+manual SQL fix that bypassed record_usage):
+`python -m app.services.usage_rollup <since YYYY-MM-DD> [until YYYY-MM-DD]`.
+"""
+import sys
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import Date, cast, func, select
+from sqlalchemy.orm import Session
+
+from app.database import dialect_insert
+from app.models import CreditTransaction, CreditTransactionArchive, DailyUsageRollup, OrganizationMembership
+
+
+def record_usage(db: Session, user_id: int, feature: str | None, credits: int, day: date | None = None) -> None:
+    """Add one interaction (and `credits`) to the user's rollup for `day`
+    (today, UTC, by default). Joins the caller's transaction — no commit."""
+    day = day or datetime.now(timezone.utc).date()
+    feature = feature or "Unknown"
+
+    insert = dialect_insert(db)
+    if insert is not None:
+        stmt = insert(DailyUsageRollup).values(
+            day=day, user_id=user_id, feature=feature, interaction_count=1, credits_used=credits,
+        )
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=["day", "user_id", "feature"],
+            set_={
+                "interaction_count": DailyUsageRollup.interaction_count + 1,
+                "credits_used": DailyUsageRollup.credits_used + stmt.excluded.credits_used,
+            },
+        ))
+        return
+
+    updated = (
+        db.query(DailyUsageRollup)
+        .filter(DailyUsageRollup.day == day, DailyUsageRollup.user_id == user_id, DailyUsageRollup.feature == feature)
+        .update({
+            DailyUsageRollup.interaction_count: DailyUsageRollup.interaction_count + 1,
+            DailyUsageRollup.credits_used: DailyUsageRollup.credits_used + credits,
+        }, synchronize_session=False)
+    )
+    if not updated:
+        db.add(DailyUsageRollup(day=day, user_id=user_id, feature=feature, interaction_count=1, credits_used=credits))
+
+
+def _ledger_day(db: Session, ledger):
+    # SQLite has no DATE type — CAST(... AS DATE) would yield just the year.
+    if db.get_bind().dialect.name == "sqlite":
+        return func.date(ledger.created_at)
+    return cast(ledger.created_at, Date)
+
+
+def _usage_groups(db: Session, ledger, since_ts: datetime, until_ts: datetime) -> list:
+    """(day, user_id, feature, interactions, credits) for 'usage' rows of
+    `ledger` (credit_transactions or its archive) in [since_ts, until_ts)."""
+    day = _ledger_day(db, ledger)
+    feature = func.coalesce(ledger.description, "Unknown")
+    return (
+        db.query(
+            day.label("day"),
+            ledger.user_id,
+            feature.label("feature"),
+            func.count(ledger.id).label("interactions"),
+            func.coalesce(func.sum(func.abs(ledger.amount)), 0).label("credits"),
+        )
+        .filter(
+            ledger.kind == "usage",
+            ledger.created_at >= since_ts,
+            ledger.created_at < until_ts,
+        )
+        .group_by(day, ledger.user_id, feature)
+        .all()
+    )
+
+
+def rebuild_usage_rollups(db: Session, since: date, until: date | None = None) -> int:
+    """Recompute rollups for days in [since, until) from the ledger — both
+    credit_transactions and credit_transactions_archive, so rebuilding a range
+    that archival has already moved out of the hot table keeps its history —
+    replacing whatever rollup rows exist for that range. Commits. Returns the
+    number of rollup rows written."""
+    until = until or (datetime.now(timezone.utc).date() + timedelta(days=1))
+    since_ts = datetime.combine(since, datetime.min.time(), tzinfo=timezone.utc)
+    until_ts = datetime.combine(until, datetime.min.time(), tzinfo=timezone.utc)
+
+    # Archival moves whole months in one transaction, so a day's rows are all
+    # in one table; summing still keeps a half-archived day correct.
+    totals: dict[tuple, list[int]] = {}
+    for ledger in (CreditTransactionArchive, CreditTransaction):
+        for r in _usage_groups(db, ledger, since_ts, until_ts):
+            day = r.day if isinstance(r.day, date) else date.fromisoformat(r.day)
+            counts = totals.setdefault((day, r.user_id, r.feature), [0, 0])
+            counts[0] += r.interactions
+            counts[1] += r.credits
+
+    db.query(DailyUsageRollup).filter(
+        DailyUsageRollup.day >= since, DailyUsageRollup.day < until,
+    ).delete(synchronize_session=False)
+    db.bulk_insert_mappings(DailyUsageRollup, [
+        {"day": day, "user_id": user_id, "feature": feature, "interaction_count": interactions, "credits_used": credits}
+        for (day, user_id, feature), (interactions, credits) in totals.items()
+    ])
+    db.commit()
+    return len(totals)
+
+
+def _organization_filters(org_id: int, start: date | None, end: date | None) -> list:
+    member_user_ids = select(OrganizationMembership.user_id).where(OrganizationMembership.organization_id == org_id)
+    filters = [DailyUsageRollup.user_id.in_(member_user_ids)]
+    if start is not None:
+        filters.append(DailyUsageRollup.day >= start)
+    if end is not None:
+        filters.append(DailyUsageRollup.day < end)
+    return filters
+
+
+def organization_feature_usage(db: Session, org_id: int, start: date | None = None, end: date | None = None) -> list:
+    """(feature, interactions, credits) for an organization's current members
+    over [start, end) — either bound may be None — from rollups only, ordered
+    by interactions desc."""
+    interactions = func.sum(DailyUsageRollup.interaction_count)
+    return (
+        db.query(
+            DailyUsageRollup.feature,
+            interactions.label("interactions"),
+            func.sum(DailyUsageRollup.credits_used).label("credits"),
+        )
+        .filter(*_organization_filters(org_id, start, end))
+        .group_by(DailyUsageRollup.feature)
+        .order_by(interactions.desc(), DailyUsageRollup.feature)
+        .all()
+    )
+
+
+def organization_usage(db: Session, org_id: int, start: date, end: date) -> tuple[list, list]:
+    """Usage for an organization's current members over [start, end), from
+    rollups only. Returns (daily_rows, feature_rows): daily_rows are
+    (day, interactions, credits) ordered by day; feature_rows are
+    (feature, interactions, credits) ordered by interactions desc."""
+    daily_rows = (
+        db.query(
+            DailyUsageRollup.day,
+            func.sum(DailyUsageRollup.interaction_count).label("interactions"),
+            func.sum(DailyUsageRollup.credits_used).label("credits"),
+        )
+        .filter(*_organization_filters(org_id, start, end))
+        .group_by(DailyUsageRollup.day)
+        .order_by(DailyUsageRollup.day)
+        .all()
+    )
+    return daily_rows, organization_feature_usage(db, org_id, start, end)
+
+
+if __name__ == "__main__":
+    from app.database import SessionLocal
+
+    since_day = date.fromisoformat(sys.argv[1])
+    until_day = date.fromisoformat(sys.argv[2]) if len(sys.argv) > 2 else None
+    session = SessionLocal()
+    try:
+        print(f"Wrote {rebuild_usage_rollups(session, since_day, until_day)} usage rollup rows")
+    finally:
+        session.close()
@@ -0,0 +1,131 @@
+"""
+Short-TTL cache of authenticated users for get_current_user.
+
+Without it, every authenticated request pays a `SELECT ... FROM users` round
+trip before the endpoint does anything — even rate-limited, DB-free routes
+like video search. With it, a warm request costs only JWT verification: the
+user's column values are kept in-process for AUTH_USER_CACHE_TTL_SECONDS
+(default 5) and re-attached to the request's session with
+merge(load=False), so routes still get a normal persistent User (lazy
+relationships, attribute writes that flush on commit) without a SELECT.
+
+Kept in-process rather than in Redis on purpose: the row includes the
+password hash and the user's own Gemini key, which shouldn't be copied into
+a third-party cache, and an Upstash REST call would cost about what the
+SELECT does.
+
+Invalidation is by per-user version stamp. Any commit that changes a user
+row bumps that user's version — ORM changes (profile edits, key changes,
+purchases via `user.credits = ...`) are picked up automatically by a session
+listener; bulk UPDATE statements (the credit debit/refund helpers) call
+mark_user_changed(). A cache fill records the version it started from and
+is discarded if the version moved while it was reading, so a fill racing a
+write can't resurrect the old row. Other instances converge within the TTL.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.models import User
+
+AUTH_USER_CACHE_TTL_SECONDS = float(os.getenv("AUTH_USER_CACHE_TTL_SECONDS", "5"))
+AUTH_USER_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_USER_CACHE_MAX_ENTRIES", "2048"))
+
+_USER_COLUMNS = [attr.key for attr in User.__mapper__.column_attrs]
+
+_lock = threading.Lock()
+# user_id -> (expires_at, version, {column: value}); oldest first for LRU eviction
+_entries: OrderedDict[int, tuple[float, int, dict]] = OrderedDict()
+# user_id -> version; only users changed since process start have an entry
+_versions: dict[int, int] = {}
+
+
+def _enabled() -> bool:
+    return AUTH_USER_CACHE_TTL_SECONDS > 0
+
+
+def get_user(db: Session, user_id: int) -> User | None:
+    """The User for `user_id`, attached to `db` — from the cache when fresh,
+    otherwise loaded (and cached). None if the user doesn't exist or has been
+    deactivated (an account awaiting its deletion purge), so every
+    get_current_user* dependency turns both into a 401."""
+    if not _enabled():
+        user = db.query(User).filter(User.id == user_id).first()
+        return user if user is not None and user.is_active else None
+
+    now = time.monotonic()
+    with _lock:
+        version = _versions.get(user_id, 0)
+        entry = _entries.get(user_id)
+        if entry is not None and entry[0] > now and entry[1] == version:
+            _entries.move_to_end(user_id)
+            values = entry[2]
+        else:
+            values = None
+
+    if values is not None:
+        if not values["is_active"]:
+            return None
+        user = User(**values)
+        make_transient_to_detached(user)
+        return db.merge(user, load=False)
+
+    user = db.query(User).filter(User.id == user_id).first()
+    if user is not None:
+        values = {key: getattr(user, key) for key in _USER_COLUMNS}
+        with _lock:
+            if _versions.get(user_id, 0) == version:
+                _entries[user_id] = (now + AUTH_USER_CACHE_TTL_SECONDS, version, values)
+                _entries.move_to_end(user_id)
+                while len(_entries) > AUTH_USER_CACHE_MAX_ENTRIES:
+                    _entries.popitem(last=False)
+    return user if user is not None and user.is_active else None
+
+
+def mark_user_changed(db: Session, user_id: int) -> None:
+    """Invalidate `user_id` now and again when `db` commits. Call this after
+    any bulk UPDATE/DELETE on users — the ORM listener below only sees
+    changes made through loaded User instances."""
+    _bump(user_id)
+    db.info.setdefault("_changed_user_ids", set()).add(user_id)
+
+
+def clear() -> None:
+    with _lock:
+        _entries.clear()
+        _versions.clear()
+
+
+def _bump(user_id: int) -> None:
+    with _lock:
+        _versions[user_id] = _versions.get(user_id, 0) + 1
+        _entries.pop(user_id, None)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_users(session, flush_context):
+    changed = {
+        obj.id for obj in (*session.dirty, *session.deleted)
+        if isinstance(obj, User) and obj.id is not None
+    }
+    if changed:
+        for user_id in changed:
+            _bump(user_id)
+        session.info.setdefault("_changed_user_ids", set()).update(changed)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_users(session):
+    # Bump again at commit: a fill that read the old row between the flush
+    # and the commit recorded the post-flush version and must not survive.
+    for user_id in session.info.pop("_changed_user_ids", ()):
+        _bump(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_users(session):
+    session.info.pop("_changed_user_ids", None)
@@ -0,0 +1,103 @@
+"""
+Event-loop stall benchmark for the async credit path (user_key_or_reserve
++ settle_credits, as /api/chat/message runs them).
+
+N concurrent "requests" each reserve and settle one credit, once with the
+sync helpers called straight from a coroutine (what a sync-session
+`async def` route does) and once with the *_async helpers on an
+AsyncSession. A ticker task measures how long the event loop goes without
+running it — the latency every other in-flight request would see.
+
+    python scripts/bench_async_credits.py [--requests 300] [--url sqlite:///bench.db]
+
+Defaults to a file-backed SQLite DB in a temp dir (needs aiosqlite); pass
+a Postgres URL (needs asyncpg) for numbers where DB waits actually overlap.
+The benchmark creates its own tables and user, so never point it at a
+database that matters.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+async def _ticker(stop: asyncio.Event, stalls: list) -> None:
+    last = time.perf_counter()
+    while not stop.is_set():
+        await asyncio.sleep(0.001)
+        now = time.perf_counter()
+        stalls.append(now - last - 0.001)
+        last = now
+
+
+async def _measure(run) -> tuple[float, float]:
+    stop, stalls = asyncio.Event(), []
+    ticker = asyncio.create_task(_ticker(stop, stalls))
+    await asyncio.sleep(0)
+    started = time.perf_counter()
+    await run()
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await ticker
+    return elapsed, max(stalls, default=0.0)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--url", default=None)
+    args = parser.parse_args()
+    url = args.url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    # app.database builds its engines from DATABASE_URL at import time
+    os.environ["DATABASE_URL"] = url
+    os.environ.setdefault("SECRET_KEY", "benchmark-only")
+
+    from sqlalchemy import create_engine
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from app.database import Base, _async_url_and_connect_args
+    from app.models import User
+    from app.routers.credits import settle_credits, settle_credits_async, user_key_or_reserve, user_key_or_reserve_async
+
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    SyncSession = sessionmaker(bind=engine)
+    with SyncSession() as setup:
+        user = User(email=f"bench-{time.time()}@example.com", hashed_password="x", credits=10 * args.requests)
+        setup.add(user)
+        setup.commit()
+        user_id = user.id
+
+    async_url, connect_args = _async_url_and_connect_args(url)
+    async_engine = create_async_engine(async_url, connect_args=connect_args)
+    AsyncSession = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    async def sync_request():
+        with SyncSession() as db:
+            hold, _ = user_key_or_reserve(db, db.get(User, user_id), 1, "usage", "Benchmark")
+            settle_credits(db, hold)
+
+    async def async_request():
+        async with AsyncSession() as db:
+            hold, _ = await user_key_or_reserve_async(db, await db.get(User, user_id), 1, "usage", "Benchmark")
+            await settle_credits_async(db, hold)
+
+    async def run_all():
+        for label, request in (("sync on the loop", sync_request), ("async path", async_request)):
+            async def batch():
+                await asyncio.gather(*(request() for _ in range(args.requests)))
+            elapsed, worst_stall = await _measure(batch)
+            print(f"{label:>16}: {args.requests} reserve+settle in {elapsed:.2f}s, worst loop stall {worst_stall * 1000:.0f} ms")
+        await async_engine.dispose()
+
+    asyncio.run(run_all())
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Upstash round-trip benchmark for app/cache.py's multi-key and counter paths.
+
+Runs the real upstash_redis client against a local stand-in for the Upstash
+REST API (POST /, /pipeline and /multi-exec over a dict), with an optional
+per-request delay to model the network, and reports per-call latency and
+how many REST requests each pattern makes:
+
+  - N cache_get calls vs one cache_get_many (a course page's unit videos)
+  - N cache_set calls vs one cache_set_many (writing back the misses)
+  - cache_incr on a new and an existing rate-limit window
+
+    python scripts/bench_cache_round_trips.py [--keys 20] [--latency-ms 15]
+
+Near-cache policies are disabled so every read reaches the stand-in. Never
+talks to a real Upstash instance.
+"""
+import argparse
+import base64
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class _UpstashStandIn:
+    """Just the commands app/cache.py issues: GET, MGET, SET [NX] [EX], MSET,
+    EXPIRE, INCR."""
+
+    def __init__(self):
+        self.store, self.expiry, self.requests = {}, {}, 0
+        self.lock = threading.Lock()
+
+    def _live(self, key):
+        if key in self.expiry and self.expiry[key] <= time.time():
+            self.store.pop(key, None)
+            self.expiry.pop(key, None)
+        return key in self.store
+
+    def run(self, command):
+        op, args = command[0].upper(), [str(arg) for arg in command[1:]]
+        if op == "GET":
+            return self.store[args[0]] if self._live(args[0]) else None
+        if op == "MGET":
+            return [self.store[key] if self._live(key) else None for key in args]
+        if op == "SET":
+            key, value, options = args[0], args[1], [arg.upper() for arg in args[2:]]
+            if "NX" in options and self._live(key):
+                return None
+            self.store[key] = value
+            self.expiry.pop(key, None)
+            if "EX" in options:
+                self.expiry[key] = time.time() + int(options[options.index("EX") + 1])
+            return "OK"
+        if op == "MSET":
+            for key, value in zip(args[::2], args[1::2]):
+                self.store[key] = value
+                self.expiry.pop(key, None)
+            return "OK"
+        if op == "EXPIRE":
+            if not self._live(args[0]):
+                return 0
+            self.expiry[args[0]] = time.time() + int(args[1])
+            return 1
+        if op == "INCR":
+            self._live(args[0])
+            self.store[args[0]] = str(int(self.store.get(args[0], "0")) + 1)
+            return int(self.store[args[0]])
+        raise ValueError(f"Unsupported command {op}")
+
+
+def _handler(standin: _UpstashStandIn, latency: float):
+    def encode(value, b64):
+        if isinstance(value, list):
+            return [encode(item, b64) for item in value]
+        if isinstance(value, str) and b64 and value != "OK":
+            return base64.b64encode(value.encode()).decode()
+        return value
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            b64 = self.headers.get("Upstash-Encoding") == "base64"
+            time.sleep(latency)
+            with standin.lock:
+                standin.requests += 1
+                if self.path.rstrip("/") in ("/pipeline", "/multi-exec"):
+                    out = [{"result": encode(standin.run(command), b64)} for command in body]
+                else:
+                    out = {"result": encode(standin.run(body), b64)}
+            data = json.dumps(out).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--keys", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=15.0, help="simulated Upstash round trip")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    from upstash_redis import Redis
+
+    from app import cache
+
+    standin = _UpstashStandIn()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _handler(standin, args.latency_ms / 1000))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    cache._redis_client = Redis(url=f"http://127.0.0.1:{server.server_port}", token="benchmark", allow_telemetry=False)
+    cache._redis_checked = True
+    cache.CACHE_NEAR_POLICIES = {}
+
+    keys = [f"video_search:unit {i}" for i in range(args.keys)]
+    for key in keys:
+        cache.cache_set(key, {"video_id": key}, 600)
+
+    def measure(label, call, repeat=args.repeat):
+        before = standin.requests
+        started = time.perf_counter()
+        for _ in range(repeat):
+            call()
+        per_call = (time.perf_counter() - started) / repeat * 1000
+        print(f"{label:>34}: {per_call:7.1f} ms, {(standin.requests - before) / repeat:.0f} request(s)")
+
+    windows = iter(range(10 ** 9))
+    measure(f"{args.keys} x cache_get", lambda: [cache.cache_get(key) for key in keys])
+    measure(f"cache_get_many({args.keys} keys)", lambda: cache.cache_get_many(keys))
+    measure(f"{args.keys} x cache_set", lambda: [cache.cache_set(key, {"video_id": key}, 600) for key in keys])
+    measure(f"cache_set_many({args.keys} keys)", lambda: cache.cache_set_many({key: {"video_id": key} for key in keys}, 600))
+    measure("cache_incr, new window", lambda: cache.cache_incr(f"ratelimit:bench:{next(windows)}", 60))
+    measure("cache_incr, same window", lambda: cache.cache_incr("ratelimit:bench:same", 60))
+    assert len(cache.cache_get_many(keys)) == args.keys
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
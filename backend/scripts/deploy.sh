@@ -0,0 +1,31 @@
+#!/usr/bin/env sh
+# Production deploy: expand the schema, ship the build, then contract.
+#
+# Vercel's Python build has no hook for migrations, and a build deployed
+# ahead of its migration fails every route touching the new tables
+# (credit_holds and later) while only /api/health notices. So:
+#
+#   1. `alembic upgrade $SCHEMA_VERSION` — the revision the new build needs.
+#      The previous build is still serving, so these migrations only add
+#      (columns with defaults, tables, non-unique indexes) and backfill.
+#   2. `vercel deploy --prod` — returns once the new build is live.
+#   3. `alembic upgrade head` — the release's contract migration
+#      (SCHEMA_CONTRACT): drops what the new build no longer reads and adds
+#      constraints the previous build's writes would have violated.
+#   4. Catch-up jobs: participant skill facts are rebuilt from the profile
+#      and analysis JSON (python -m app.services.skills), which also picks
+#      up profiles the previous build wrote without facts.
+#
+# If step 2 fails the database is left at SCHEMA_VERSION, which the previous
+# build still runs against; re-run the script once the build is fixed.
+#
+#   DATABASE_URL=postgresql://... ./scripts/deploy.sh [extra vercel args]
+set -eu
+cd "$(dirname "$0")/.."
+
+: "${DATABASE_URL:?set DATABASE_URL to the production database (vercel env pull can fetch it)}"
+
+alembic upgrade "$(python -c 'from app.schema_version import SCHEMA_VERSION; print(SCHEMA_VERSION)')"
+vercel deploy --prod "$@"
+alembic upgrade head
+python -m app.services.skills
@@ -4,13 +4,14 @@ never touch the real Neon database) and a TestClient with auth wired to a
 fixture user via dependency_overrides.
 """
 import os
+from contextlib import contextmanager
 
 os.environ.setdefault("SECRET_KEY", "test-secret-key-for-pytest-only")
 os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
 
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
@@ -79,3 +80,21 @@ def auth_as(client):
         app.dependency_overrides[get_current_user] = lambda: user
         return client
     return _auth_as
+
+
+@pytest.fixture()
+def count_statements(db_session):
+    """`with count_statements() as statements:` collects the SQL text of
+    every statement the test DB executes inside the block — for asserting
+    how many round trips a route or helper costs."""
+    @contextmanager
+    def _count_statements():
+        statements = []
+        engine = db_session.get_bind()
+        record = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+    return _count_statements
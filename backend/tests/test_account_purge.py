@@ -0,0 +1,164 @@
+"""
+Account deletion (app/services/account_purge.py) — every user-owned table
+is emptied for the deleted user in foreign-key order, other users' rows are
+untouched, and organization ownership is handed over or blocks the purge.
+"""
+from datetime import date, datetime, timedelta, timezone
+from unittest.mock import patch
+
+from fastapi import HTTPException
+import pytest
+from sqlalchemy import func, text
+
+from app import user_cache
+from app.auth import create_access_token, get_current_user
+
+from app.models import (
+    CareerProfile,
+    CourseEnrollment,
+    CreditHold,
+    CreditLedgerMonth,
+    CreditTransaction,
+    CreditTransactionArchive,
+    DailyUsageRollup,
+    ExceptionModel,
+    Lesson,
+    Organization,
+    OrganizationDocument,
+    OrganizationMembership,
+    ParticipantSkill,
+    PasswordResetToken,
+    Resume,
+    Roadmap,
+    Skill,
+    User,
+    UserProgress,
+    WorkforceAnalysis,
+    WorkforceProfile,
+    WorkforceRoadmap,
+)
+from app.services import account_purge
+from app.services.account_purge import PURGE_ORDER
+
+
+def _give_history(db, user, ledger_rows=3):
+    now = datetime.now(timezone.utc)
+    lesson = Lesson(user_id=user.id, title="SOC 101")
+    roadmap = Roadmap(user_id=user.id, career_path="SOC Analyst")
+    profile = WorkforceProfile(user_id=user.id)
+    skill = Skill(key=f"triage {user.id}", name=f"Triage {user.id}")
+    db.add_all([lesson, roadmap, profile, skill])
+    db.flush()
+    analysis = WorkforceAnalysis(user_id=user.id, profile_id=profile.id)
+    db.add(analysis)
+    db.flush()
+    db.add_all([
+        UserProgress(user_id=user.id, lesson_id=lesson.id, progress_type="lesson", target_id=lesson.id),
+        UserProgress(user_id=user.id, roadmap_id=roadmap.id, progress_type="roadmap", target_id=roadmap.id),
+        WorkforceRoadmap(user_id=user.id, analysis_id=analysis.id),
+        OrganizationDocument(user_id=user.id, name="sop.txt", category="sop"),
+        ParticipantSkill(user_id=user.id, skill_id=skill.id, source="extracted"),
+        Resume(user_id=user.id, title="CV"),
+        CareerProfile(user_id=user.id, career_path="SOC"),
+        ExceptionModel(user_id=user.id, type="break"),
+        CourseEnrollment(user_id=user.id, course_id="python-fundamentals"),
+        CreditHold(user_id=user.id, amount=5, kind="usage", expires_at=now + timedelta(minutes=5)),
+        CreditTransactionArchive(id=100_000 + user.id, user_id=user.id, amount=-5, kind="usage"),
+        CreditLedgerMonth(user_id=user.id, month=date(2024, 1, 1), kind="usage", description="Chat"),
+        DailyUsageRollup(day=now.date(), user_id=user.id, feature="Chat"),
+        PasswordResetToken(user_id=user.id, token=f"token-{user.id}", expires_at=now),
+        *(CreditTransaction(user_id=user.id, amount=-1, kind="usage") for _ in range(ledger_rows)),
+    ])
+    db.commit()
+
+
+def _rows_for(db, user_id):
+    return {model.__tablename__: db.query(func.count()).select_from(model).filter(model.user_id == user_id).scalar()
+            for model in PURGE_ORDER}
+
+
+def test_delete_account_removes_every_user_row_in_fk_order(client, auth_as, make_user, db_session):
+    user = make_user(email="purge1@example.com")
+    bystander = make_user(email="purge2@example.com")
+    user.profile_image = "/uploads/avatars/purge1.png"
+    db_session.commit()
+    _give_history(db_session, user)
+    _give_history(db_session, bystander)
+    bystander_rows = _rows_for(db_session, bystander.id)
+    db_session.execute(text("PRAGMA foreign_keys=ON"))  # catch a child deleted after its parent
+
+    try:
+        with patch("app.services.account_purge.storage.delete_file") as delete_file:
+            resp = auth_as(user).delete("/api/auth/me")
+    finally:
+        db_session.execute(text("PRAGMA foreign_keys=OFF"))
+
+    assert resp.status_code == 200
+    delete_file.assert_called_once_with("/uploads/avatars/purge1.png")
+    assert resp.json()["rows_deleted"] == sum(bystander_rows.values()) + 1  # same history, plus the user row
+    assert set(_rows_for(db_session, user.id).values()) == {0}
+    assert db_session.query(User).filter(User.id == user.id).first() is None
+    assert _rows_for(db_session, bystander.id) == bystander_rows
+
+
+def test_delete_account_hands_over_or_deletes_created_organizations(client, auth_as, make_user, db_session):
+    owner = make_user(email="purge3@example.com")
+    co_admin = make_user(email="purge4@example.com")
+    shared = auth_as(owner).post("/api/admin/organizations", json={"name": "Shared"}).json()
+    auth_as(owner).post("/api/admin/organizations", json={"name": "Solo"}).json()
+    auth_as(owner).post(f"/api/admin/organizations/{shared['id']}/members", json={"email": co_admin.email})
+
+    # Only admin of an org that still has members: refused, nothing deleted
+    assert auth_as(owner).delete("/api/auth/me").status_code == 409
+    assert db_session.query(User).filter(User.id == owner.id).first() is not None
+
+    auth_as(owner).post(f"/api/admin/organizations/{shared['id']}/members",
+                        json={"email": co_admin.email, "role": "org_admin"})
+    assert auth_as(owner).delete("/api/auth/me").status_code == 200
+
+    orgs = {org.id: org.created_by_user_id for org in db_session.query(Organization)}
+    assert orgs == {shared["id"]: co_admin.id}
+    assert db_session.query(OrganizationMembership).filter(OrganizationMembership.user_id == owner.id).count() == 0
+
+
+def test_large_account_is_deactivated_and_purged_in_the_background(client, auth_as, make_user, db_session, monkeypatch):
+    user = make_user(email="purge5@example.com")
+    _give_history(db_session, user, ledger_rows=5)
+    monkeypatch.setattr(account_purge, "ACCOUNT_PURGE_INLINE_MAX_ROWS", 3)
+
+    with patch("app.routers.auth.purge_user_job") as job:
+        resp = auth_as(user).delete("/api/auth/me")
+
+    assert resp.status_code == 202
+    job.assert_called_once_with(user.id)
+    db_session.refresh(user)
+    assert user.is_active is False and user.deletion_requested_at is not None
+
+    assert account_purge.purge_user(db_session, user.id)["credit_transactions"] == 5
+    assert set(_rows_for(db_session, user.id).values()) == {0}
+
+
+def test_deleted_account_is_locked_out_and_swept_after_a_failed_job(client, auth_as, make_user, db_session, monkeypatch):
+    user = make_user(email="purge6@example.com")
+    bystander = make_user(email="purge6-bystander@example.com")
+    # An operator-suspended account is inactive too, but was never asked to be deleted
+    bystander.is_active = False
+    db_session.commit()
+    _give_history(db_session, user, ledger_rows=5)
+    monkeypatch.setattr(account_purge, "ACCOUNT_PURGE_INLINE_MAX_ROWS", 3)
+    token = create_access_token({"sub": str(user.id)})
+    user_cache.clear()
+    assert get_current_user(token=token, db=db_session).id == user.id  # warm the cache
+
+    # The background job never ran (or raised) — the account is left deactivated
+    with patch("app.routers.auth.purge_user_job"):
+        assert auth_as(user).delete("/api/auth/me").status_code == 202
+
+    with pytest.raises(HTTPException) as exc_info:
+        get_current_user(token=token, db=db_session)
+    assert exc_info.value.status_code == 401
+
+    assert account_purge.purge_pending_deletions(db_session) == ([user.id], [])
+    assert set(_rows_for(db_session, user.id).values()) == {0}
+    assert db_session.get(User, bystander.id) is not None
+    assert account_purge.purge_pending_deletions(db_session) == ([], [])
@@ -4,6 +4,16 @@ sensitive endpoint in admin.py calls _require_org_admin, but flagged that
 no test code existed anywhere to make that reproducible. These tests lock
 that behavior in.
 """
+from datetime import datetime, timedelta, timezone
+
+from alembic import command
+from sqlalchemy import create_engine, text
+
+from app.models import CreditTransaction, DailyUsageRollup, WorkforceAnalysis, WorkforceProfile
+from app.routers.credits import reserve_credits, settle_credits
+from app.services.skills import rebuild_participant_skills
+from app.services.usage_rollup import rebuild_usage_rollups
+from tests.test_schema_version import _alembic_config
 
 
 def _create_org(client, name="Acme Corp"):
@@ -113,3 +123,323 @@ def test_remove_member_requires_admin(client, auth_as, make_user):
     # Owner (admin) can remove the participant
     resp = auth_as(owner).delete(f"/api/admin/organizations/{org['id']}/members/{participant.id}")
     assert resp.status_code == 200
+
+
+def test_ai_interactions_aggregates_per_feature_and_pages_recent_events(client, auth_as, make_user, db_session):
+    owner = make_user(email="owner9@example.com")
+    member = make_user(email="member9@example.com")
+    outsider = make_user(email="outsider9@example.com")
+    org = _create_org(auth_as(owner))
+    auth_as(owner).post(
+        f"/api/admin/organizations/{org['id']}/members",
+        json={"email": "member9@example.com", "role": "participant"},
+    )
+
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    rows = [
+        (owner.id, -10, "Workforce Analysis & Comparison", base),
+        (member.id, -10, "Workforce Analysis & Comparison", base + timedelta(days=1)),
+        (member.id, -1, "AI Career Mentor chat", base + timedelta(days=2)),
+        (member.id, 5, None, base + timedelta(days=3)),  # refund row, not usage
+        (outsider.id, -10, "Workforce Analysis & Comparison", base + timedelta(days=4)),
+    ]
+    for user_id, amount, description, created_at in rows:
+        db_session.add(CreditTransaction(
+            user_id=user_id, amount=amount, description=description, created_at=created_at,
+            kind="usage" if amount < 0 else "refund",
+        ))
+    db_session.commit()
+    rebuild_usage_rollups(db_session, since=base.date())  # rows written directly, not via settle
+
+    client = auth_as(owner)
+    data = client.get(f"/api/admin/organizations/{org['id']}/ai-interactions?limit=2").json()
+    assert data["total_interactions"] == 3
+    assert data["total_credits_used"] == 21
+    assert data["by_feature"][0] == {
+        "feature": "Workforce Analysis & Comparison", "count": 2, "total_credits_used": 20,
+    }
+    assert [e["feature"] for e in data["recent_events"]] == [
+        "AI Career Mentor chat", "Workforce Analysis & Comparison",
+    ]
+    assert data["next_cursor"]
+
+    page_2 = client.get(
+        f"/api/admin/organizations/{org['id']}/ai-interactions",
+        params={"limit": 2, "cursor": data["next_cursor"]},
+    ).json()
+    assert [e["user_email"] for e in page_2["recent_events"]] == ["owner9@example.com"]
+    assert page_2["next_cursor"] is None
+
+    bounded = client.get(
+        f"/api/admin/organizations/{org['id']}/ai-interactions",
+        params={"start": (base + timedelta(days=2)).isoformat()},
+    ).json()
+    assert bounded["total_interactions"] == 1
+    assert bounded["by_feature"] == [{"feature": "AI Career Mentor chat", "count": 1, "total_credits_used": 1}]
+
+
+def test_ai_interactions_rejects_malformed_cursor(client, auth_as, make_user):
+    owner = make_user(email="owner10@example.com")
+    org = _create_org(auth_as(owner))
+
+    resp = auth_as(owner).get(f"/api/admin/organizations/{org['id']}/ai-interactions?cursor=not-a-cursor")
+    assert resp.status_code == 400
+
+
+def test_usage_report_reads_rollups_written_on_settle(client, auth_as, make_user, db_session):
+    owner = make_user(email="owner11@example.com", credits=100)
+    org = _create_org(auth_as(owner))
+
+    for _ in range(2):
+        settle_credits(db_session, reserve_credits(db_session, owner.id, 10, "usage", "Workforce Analysis & Comparison"))
+    settle_credits(db_session, reserve_credits(db_session, owner.id, 1, "usage", "AI Career Mentor chat"))
+
+    rollup = db_session.query(DailyUsageRollup).filter(
+        DailyUsageRollup.feature == "Workforce Analysis & Comparison",
+    ).one()
+    assert (rollup.interaction_count, rollup.credits_used) == (2, 20)
+
+    data = auth_as(owner).get(f"/api/admin/organizations/{org['id']}/usage").json()
+    assert data["total_interactions"] == 3
+    assert data["total_credits_used"] == 21
+    assert data["by_feature"][0] == {
+        "feature": "Workforce Analysis & Comparison", "count": 2, "total_credits_used": 20,
+    }
+    assert len(data["daily"]) == 1
+
+
+def test_rebuild_usage_rollups_backfills_from_ledger(client, auth_as, make_user, db_session):
+    owner = make_user(email="owner12@example.com")
+    org = _create_org(auth_as(owner))
+    base = datetime(2026, 2, 1, 9, tzinfo=timezone.utc)
+    for offset, amount in [(0, -10), (0, -1), (1, -10), (1, 10)]:
+        db_session.add(CreditTransaction(
+            user_id=owner.id, amount=amount, description="Workforce Analysis & Comparison",
+            kind="usage" if amount < 0 else "refund", created_at=base + timedelta(days=offset),
+        ))
+    db_session.commit()
+
+    assert rebuild_usage_rollups(db_session, since=base.date()) == 2
+    # Idempotent: a second run replaces rather than double-counts
+    assert rebuild_usage_rollups(db_session, since=base.date()) == 2
+
+    data = auth_as(owner).get(
+        f"/api/admin/organizations/{org['id']}/usage",
+        params={"start": "2026-02-01", "end": "2026-02-03"},
+    ).json()
+    assert [(d["day"], d["interactions"], d["credits_used"]) for d in data["daily"]] == [
+        ("2026-02-01", 2, 11), ("2026-02-02", 1, 10),
+    ]
+
+    resp = auth_as(owner).get(
+        f"/api/admin/organizations/{org['id']}/usage",
+        params={"start": "2026-02-03", "end": "2026-02-01"},
+    )
+    assert resp.status_code == 400
+
+
+def test_rollup_migration_fills_from_existing_ledger(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'rollups.db'}")
+    config = _alembic_config()
+    with engine.begin() as conn:
+        config.attributes["connection"] = conn
+        command.upgrade(config, "0001_baseline")
+        conn.execute(text("INSERT INTO users (id, email, hashed_password, credits) VALUES (1, 'old@example.com', 'x', 0)"))
+        conn.execute(text(
+            "INSERT INTO credit_transactions (user_id, amount, kind, description, created_at) VALUES "
+            "(1, -10, 'usage', 'Workforce Analysis & Comparison', '2026-02-01 09:00:00'), "
+            "(1, -10, 'usage', 'Workforce Analysis & Comparison', '2026-02-01 17:00:00'), "
+            "(1, -1, 'usage', NULL, '2026-02-02 09:00:00'), "
+            "(1, 100, 'purchase', NULL, '2026-02-02 10:00:00')"
+        ))
+        command.upgrade(config, "head")
+
+    with engine.connect() as conn:
+        rows = conn.execute(text(
+            "SELECT day, feature, interaction_count, credits_used FROM daily_usage_rollups ORDER BY day"
+        )).all()
+    engine.dispose()
+
+    assert [tuple(row) for row in rows] == [
+        ("2026-02-01", "Workforce Analysis & Comparison", 2, 20),
+        ("2026-02-02", "Unknown", 1, 1),
+    ]
+
+
+def test_ai_interactions_recent_events_use_the_same_whole_days_as_totals(client, auth_as, make_user, db_session):
+    owner = make_user(email="owner12b@example.com")
+    org = _create_org(auth_as(owner))
+    for hour in (8, 15):
+        db_session.add(CreditTransaction(
+            user_id=owner.id, amount=-1, kind="usage", description="AI Career Mentor chat",
+            created_at=datetime(2026, 2, 1, hour, tzinfo=timezone.utc),
+        ))
+    db_session.commit()
+    rebuild_usage_rollups(db_session, since=datetime(2026, 2, 1).date())
+
+    data = auth_as(owner).get(
+        f"/api/admin/organizations/{org['id']}/ai-interactions",
+        params={"start": "2026-02-01T12:00:00+00:00", "end": "2026-02-01T13:00:00+00:00"},
+    ).json()
+    assert data["total_interactions"] == len(data["recent_events"]) == 2
+
+
+def test_participants_filter_by_has_and_missing_skill(client, auth_as, make_user, db_session):
+    owner = make_user(email="owner13@example.com")
+    siem = make_user(email="siem@example.com")
+    splunk = make_user(email="splunk@example.com")
+    make_user(email="noprofile@example.com")
+    org = _create_org(auth_as(owner))
+    for email in ("siem@example.com", "splunk@example.com", "noprofile@example.com"):
+        auth_as(owner).post(f"/api/admin/organizations/{org['id']}/members", json={"email": email, "role": "participant"})
+
+    db_session.add_all([
+        WorkforceProfile(user_id=siem.id, primary_skills=["SIEM"], extracted_skills=["log analysis"]),
+        WorkforceProfile(user_id=splunk.id, primary_skills=[], extracted_skills=["Splunk", "Log Analysis"]),
+        WorkforceAnalysis(user_id=splunk.id, missing_skills=["Security Information and Event Management"]),
+    ])
+    db_session.commit()
+    rebuild_participant_skills(db_session)  # rows written directly, not via the workforce routes
+
+    def emails(**params):
+        resp = auth_as(owner).get(f"/api/admin/organizations/{org['id']}/participants", params=params)
+        assert resp.status_code == 200
+        return [m["email"] for m in resp.json()]
+
+    # Matched on canonical skills: case, wording and aliases don't matter
+    assert emails(has_skill="siem") == emails(has_skill="SIEM Tools") == ["siem@example.com"]
+    assert emails(has_skill="splunk siem") == ["splunk@example.com"]
+    assert emails(has_skill="log analysis") == ["siem@example.com", "splunk@example.com"]
+    # missing_skill is what the member's analysis flagged, not "absent from the profile"
+    assert emails(missing_skill="SIEM") == ["splunk@example.com"]
+    assert emails(has_skill="log analysis", missing_skill="siem") == ["splunk@example.com"]
+    assert emails(has_skill="COBOL") == emails(missing_skill="COBOL") == []
+    assert auth_as(owner).get(f"/api/admin/organizations/{org['id']}/participants").status_code == 400
+
+
+def test_bulk_invite_reports_per_email_status_in_a_few_statements(client, auth_as, make_user, count_statements):
+    owner = make_user(email="owner14@example.com")
+    org = _create_org(auth_as(owner))
+    for i in range(20):
+        make_user(email=f"bulk{i}@example.com")
+    auth_as(owner).post(f"/api/admin/organizations/{org['id']}/members", json={"email": "bulk0@example.com"})
+    auth_as(owner).post(f"/api/admin/organizations/{org['id']}/members", json={"email": "bulk1@example.com"})
+
+    members = [{"email": f"bulk{i}@example.com"} for i in range(1, 15)]
+    members += [{"email": "bulk0@example.com", "role": "org_admin"}, {"email": "ghost@example.com"},
+                {"email": "not-an-email"}, {"email": "bulk15@example.com", "role": "superuser"}]
+    csv_text = "Email,Role\nbulk16@example.com,org_admin\nbulk2@example.com,participant\n"
+
+    with count_statements() as statements:
+        resp = auth_as(owner).post(
+            f"/api/admin/organizations/{org['id']}/members/bulk", json={"members": members, "csv": csv_text},
+        )
+
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["counts"] == {
+        "unchanged": 1, "added": 14, "updated": 1, "not_found": 1, "invalid_email": 1, "invalid_role": 1, "duplicate": 1,
+    }
+    statuses = {r["email"]: r["status"] for r in data["results"][-4:]}
+    assert statuses == {"not-an-email": "invalid_email", "bulk15@example.com": "invalid_role",
+                        "bulk16@example.com": "added", "bulk2@example.com": "duplicate"}
+    # Independent of roster size: org check, two lookups, one INSERT, one UPDATE
+    assert len(statements) <= 8
+
+    roles = {m["email"]: m["role"] for m in auth_as(owner).get(f"/api/admin/organizations/{org['id']}/members").json()}
+    assert len(roles) == 17
+    assert roles["bulk0@example.com"] == roles["bulk16@example.com"] == "org_admin"
+
+
+def test_bulk_invite_enforces_batch_limit(client, auth_as, make_user):
+    owner = make_user(email="owner15@example.com")
+    org = _create_org(auth_as(owner))
+    url = f"/api/admin/organizations/{org['id']}/members/bulk"
+
+    too_many = [{"email": f"x{i}@example.com"} for i in range(1001)]
+    assert auth_as(owner).post(url, json={"members": too_many}).status_code == 400
+    assert auth_as(owner).post(url, json={"csv": "name\nfoo"}).status_code == 400
+
+
+def test_credit_grant_tops_up_filtered_members_and_writes_ledger(client, auth_as, make_user, db_session):
+    owner = make_user(email="owner16@example.com", credits=200)
+    org = _create_org(auth_as(owner))
+    members = [make_user(email=f"grant{i}@example.com", credits=i) for i in range(5)]
+    outsider = make_user(email="grant-outsider@example.com", credits=0)
+    auth_as(owner).post(f"/api/admin/organizations/{org['id']}/members/bulk",
+                        json={"members": [{"email": m.email} for m in members]})
+    url = f"/api/admin/organizations/{org['id']}/credits/grant"
+
+    resp = auth_as(owner).post(url, json={"amount": 25, "role": "participant", "description": "Q3 top-up"})
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["granted_user_ids"] == sorted(m.id for m in members)
+    assert data["total_credits"] == 125
+
+    # Filtered to one member; the owner (org_admin) was skipped by the role filter above
+    resp = auth_as(owner).post(url, json={"amount": 5, "user_ids": [members[0].id, outsider.id]})
+    assert resp.json()["granted_user_ids"] == [members[0].id]
+
+    assert auth_as(members[0]).get("/api/credits/balance").json()["credits"] == 30
+    assert auth_as(members[3]).get("/api/credits/balance").json()["credits"] == 28
+    assert auth_as(outsider).get("/api/credits/balance").json()["credits"] == 0
+    # The sponsoring org admin paid for both grants (125 + 5)
+    assert auth_as(owner).get("/api/credits/balance").json()["credits"] == 70
+    grants = db_session.query(CreditTransaction).filter(CreditTransaction.kind == "grant").all()
+    assert len(grants) == 8
+    assert sorted(g.amount for g in grants if g.user_id == owner.id) == [-125, -5]
+    assert {g.description for g in grants if g.user_id != owner.id} == {"Q3 top-up", "Credits from Acme Corp"}
+
+
+def test_credit_grant_cannot_mint_credits_for_the_org_admin(client, auth_as, make_user, db_session):
+    creator = make_user(email="grant-self@example.com", credits=10)
+    participant = make_user(email="grant-self-member@example.com", credits=0)
+    org = _create_org(auth_as(creator))
+    auth_as(creator).post(f"/api/admin/organizations/{org['id']}/members", json={"email": participant.email})
+    url = f"/api/admin/organizations/{org['id']}/credits/grant"
+
+    # The sponsor is never a recipient of their own grant
+    resp = auth_as(creator).post(url, json={"amount": 10, "user_ids": [creator.id]})
+    assert (resp.status_code, resp.json()["granted_user_ids"]) == (200, [])
+    assert auth_as(creator).get("/api/credits/balance").json()["credits"] == 10
+    # A grant the sponsor can't cover is rolled back whole
+    resp = auth_as(creator).post(url, json={"amount": 1000})
+    assert resp.status_code == 402
+    assert auth_as(creator).get("/api/credits/balance").json()["credits"] == 10
+    assert auth_as(participant).get("/api/credits/balance").json()["credits"] == 0
+    assert db_session.query(CreditTransaction).filter(CreditTransaction.kind == "grant").count() == 0
+
+    # A platform admin's grant is not debited from anyone
+    platform_admin = make_user(email="grant-platform@example.com", credits=0, is_platform_admin=True)
+    assert auth_as(platform_admin).post(url, json={"amount": 1000}).status_code == 200
+    assert auth_as(creator).get("/api/credits/balance").json()["credits"] == 1010
+    assert auth_as(platform_admin).get("/api/credits/balance").json()["credits"] == 0
+
+
+def test_member_sponsor_pays_only_for_the_other_members(client, auth_as, make_user, db_session):
+    sponsor = make_user(email="grant-sponsor@example.com", credits=100)
+    org = _create_org(auth_as(sponsor))
+    members = [make_user(email=f"grant-sponsored{i}@example.com", credits=0) for i in range(3)]
+    auth_as(sponsor).post(f"/api/admin/organizations/{org['id']}/members/bulk",
+                          json={"members": [{"email": m.email} for m in members]})
+
+    # No role filter: the sponsor's own org_admin membership matches too
+    resp = auth_as(sponsor).post(f"/api/admin/organizations/{org['id']}/credits/grant", json={"amount": 20})
+    assert resp.json()["granted_user_ids"] == sorted(m.id for m in members)
+    assert resp.json()["total_credits"] == 60
+    assert auth_as(sponsor).get("/api/credits/balance").json()["credits"] == 40
+    assert [g.amount for g in db_session.query(CreditTransaction)
+            .filter(CreditTransaction.kind == "grant", CreditTransaction.user_id == sponsor.id)] == [-60]
+
+
+def test_credit_grant_requires_org_admin_and_valid_amount(client, auth_as, make_user):
+    owner = make_user(email="owner17@example.com")
+    participant = make_user(email="grant-participant@example.com")
+    org = _create_org(auth_as(owner))
+    auth_as(owner).post(f"/api/admin/organizations/{org['id']}/members", json={"email": participant.email})
+    url = f"/api/admin/organizations/{org['id']}/credits/grant"
+
+    assert auth_as(participant).post(url, json={"amount": 10}).status_code == 403
+    assert auth_as(owner).post(url, json={"amount": 0}).status_code == 400
+    assert auth_as(owner).post(url, json={"amount": 10, "role": "superuser"}).status_code == 400
+    assert auth_as(owner).post(url, json={"amount": 10, "user_ids": []}).status_code == 400
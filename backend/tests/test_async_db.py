@@ -0,0 +1,148 @@
+"""
+Async DB path — the AsyncSession versions of get_current_user and the
+credit hold helpers must behave exactly like the sync ones, and
+/api/chat/message runs on them end to end. Runs against aiosqlite on a
+file-backed DB (an in-memory DB isn't shared across the sync setup engine
+and the async engine).
+"""
+import asyncio
+
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+pytest.importorskip("aiosqlite")
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app import user_cache
+from app.auth import create_access_token, get_current_user_async
+from app.database import Base, _async_url_and_connect_args, get_async_db
+from app.main import app
+from app.models import CreditHold, CreditTransaction, DailyUsageRollup, User
+from app.routers import ai_chat
+from app.routers.credits import release_credits_async, settle_credits_async, user_key_or_reserve_async
+
+
+@pytest.fixture()
+def async_db_path(tmp_path):
+    path = tmp_path / "async.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    with sessionmaker(bind=engine)() as setup:
+        setup.add(User(email="async@example.com", hashed_password="x", credits=10))
+        setup.commit()
+    engine.dispose()
+    return path
+
+
+def _run(path, fn):
+    async def _main():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        try:
+            async with async_sessionmaker(engine, expire_on_commit=False)() as db:
+                return await fn(db)
+        finally:
+            await engine.dispose()
+    return asyncio.run(_main())
+
+
+def _check_db(path):
+    engine = create_engine(f"sqlite:///{path}")
+    return engine, sessionmaker(bind=engine)()
+
+
+def test_async_url_maps_drivers_and_sslmode(monkeypatch):
+    monkeypatch.delenv("DATABASE_SSL", raising=False)
+    url, connect_args = _async_url_and_connect_args("postgresql://u:p@db.example.com/app?sslmode=require")
+    assert url.drivername == "postgresql+asyncpg"
+    assert "sslmode" not in url.query
+    assert connect_args == {"ssl": "require"}
+
+    _, connect_args = _async_url_and_connect_args("postgresql://u:p@db.example.com/app?sslmode=verify-full")
+    assert connect_args == {"ssl": "verify-full"}
+    with pytest.raises(ValueError):
+        _async_url_and_connect_args("postgresql://u:p@db.example.com/app?sslmode=verify_full")
+    monkeypatch.setenv("DATABASE_SSL", "true")
+    assert _async_url_and_connect_args("postgresql://u:p@db.example.com/app")[1] == {"ssl": "require"}
+
+    url, connect_args = _async_url_and_connect_args("sqlite:///:memory:")
+    assert url.drivername == "sqlite+aiosqlite"
+    assert connect_args == {}
+
+
+def test_async_holds_settle_release_and_reject_like_sync(async_db_path):
+    async def _flow(db):
+        user = await db.get(User, 1)
+        hold, _ = await user_key_or_reserve_async(db, user, 7, "usage", "Async Feature")
+        await settle_credits_async(db, hold)
+        hold, _ = await user_key_or_reserve_async(db, user, 2, "usage", "Async Feature")
+        assert await release_credits_async(db, hold) == 3
+        with pytest.raises(HTTPException) as exc_info:
+            await user_key_or_reserve_async(db, user, 5, "usage", "Async Feature")
+        return exc_info.value
+
+    exc = _run(async_db_path, _flow)
+    assert exc.status_code == 402
+    assert exc.headers["X-Credits-Remaining"] == "3"
+
+    engine, check = _check_db(async_db_path)
+    with check:
+        assert check.query(User).one().credits == 3
+        assert [tx.amount for tx in check.query(CreditTransaction).all()] == [-7]
+        assert check.query(CreditHold).count() == 0
+        assert check.query(DailyUsageRollup).one().credits_used == 7
+    engine.dispose()
+
+
+def test_get_current_user_async_resolves_token(async_db_path):
+    user_cache.clear()
+    token = create_access_token({"sub": "1"})
+    user = _run(async_db_path, lambda db: get_current_user_async(token=token, db=db))
+    assert user.email == "async@example.com"
+
+    with pytest.raises(HTTPException) as exc_info:
+        _run(async_db_path, lambda db: get_current_user_async(token=create_access_token({"sub": "999"}), db=db))
+    assert exc_info.value.status_code == 401
+
+
+@pytest.fixture()
+def async_client(async_db_path):
+    # NullPool: TestClient may run each request on a fresh event loop
+    engine = create_async_engine(f"sqlite+aiosqlite:///{async_db_path}", poolclass=NullPool)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with session_factory() as db:
+            yield db
+
+    user_cache.clear()
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.pop(get_async_db, None)
+        asyncio.run(engine.dispose())
+
+
+def test_chat_message_runs_on_the_async_stack(async_client, async_db_path, monkeypatch):
+    replies = iter(["Focus on SIEM triage.", "All AI quota is temporarily used. Try again later."])
+    monkeypatch.setattr(ai_chat, "get_gemini_response", lambda prompt, user_api_key=None: next(replies))
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': '1'})}"}
+
+    resp = async_client.post("/api/chat/message", json={"message": "Where do I start?"}, headers=headers)
+    assert resp.status_code == 200
+    assert resp.json() == {"response": "Focus on SIEM triage.", "credits_used": 1, "credits_remaining": 9}
+
+    # A quota reply releases the hold instead of charging
+    resp = async_client.post("/api/chat/message", json={"message": "And then?"}, headers=headers)
+    assert resp.json()["credits_remaining"] == 9
+
+    assert async_client.post("/api/chat/message", json={"message": "hi"}).status_code == 401
+    engine, check = _check_db(async_db_path)
+    with check:
+        assert check.query(User).one().credits == 9
+        assert [(tx.amount, tx.description) for tx in check.query(CreditTransaction)] == [(-1, "AI Career Mentor chat")]
+    engine.dispose()
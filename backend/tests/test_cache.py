@@ -0,0 +1,311 @@
+"""
+app/cache.py — the bounded in-memory LRU (TTL expiry on read, periodic
+sweep), the L1 near-cache in front of a (fake) Upstash client, the
+per-tier counters behind /admin/metrics/cache, and stale-while-revalidate
+in cache_get_or_fetch.
+"""
+import asyncio
+import json
+import time
+
+from fastapi import BackgroundTasks, HTTPException
+import pytest
+
+from app import cache
+from app.cache import MemoryCache
+from app.routers import video
+
+
+@pytest.fixture()
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    return now
+
+
+def test_lru_bound_evicts_least_recently_used(clock):
+    cache = MemoryCache(max_entries=3, sweep_seconds=60)
+    for key in "abc":
+        cache.set(key, key.upper(), ttl_seconds=30)
+    assert cache.get("a") == "A"  # a is now the most recently used
+
+    cache.set("d", "D", ttl_seconds=30)
+
+    assert cache.get("b") is None
+    assert [cache.get(key) for key in "acd"] == ["A", "C", "D"]
+    stats = cache.stats()
+    assert (stats["entries"], stats["evictions"], stats["hits"], stats["misses"]) == (3, 1, 4, 1)
+
+
+def test_expired_entries_are_missed_and_swept(clock):
+    cache = MemoryCache(max_entries=100, sweep_seconds=60)
+    for i in range(10):
+        cache.set(f"ratelimit:chat:{i}:1", 1, ttl_seconds=5)
+    cache.set("video:search", [{"id": "abc"}], ttl_seconds=600)
+
+    clock[0] += 10
+    assert cache.get("ratelimit:chat:0:1") is None
+    assert cache.stats()["entries"] == 10  # the rest wait for the sweep
+
+    clock[0] += 60
+    cache.set("jobs:search", {"results": []}, ttl_seconds=600)  # a write past the sweep interval
+
+    stats = cache.stats()
+    assert (stats["entries"], stats["expirations"], stats["sweeps"]) == (2, 10, 1)
+    assert cache.get("video:search") == [{"id": "abc"}]
+
+
+def test_incr_keeps_window_expiry_and_size_tracks_entries(clock):
+    cache = MemoryCache(max_entries=100, sweep_seconds=60)
+    assert [cache.incr("ratelimit:x", ttl_seconds=10) for _ in range(3)] == [1, 2, 3]
+    clock[0] += 11
+    assert cache.incr("ratelimit:x", ttl_seconds=10) == 1
+
+    cache.set("big", "x" * 10_000, ttl_seconds=60)
+    assert cache.stats()["approx_bytes"] > 10_000
+    cache.set("big", "small", ttl_seconds=60)
+    assert cache.stats()["approx_bytes"] < 1_000
+    cache.clear()
+    assert (cache.stats()["entries"], cache.stats()["approx_bytes"]) == (0, 0)
+
+
+def test_cache_metrics_are_platform_admin_only(client, auth_as, make_user):
+    assert auth_as(make_user(email="cm1@example.com")).get("/api/admin/metrics/cache").status_code == 403
+    resp = auth_as(make_user(email="cm2@example.com", is_platform_admin=True)).get("/api/admin/metrics/cache")
+    assert resp.status_code == 200
+    assert resp.json()["backend"] == "memory"
+    assert resp.json()["memory"]["max_entries"] > 0
+
+
+class FakeUpstash:
+    """Records one entry in `calls` per REST request, like the real client."""
+    def __init__(self):
+        self.store, self.ttls, self.calls = {}, {}, []
+
+    def get(self, key):
+        self.calls.append(("get", key))
+        return self.store.get(key)
+
+    def set(self, key, value, ex=None):
+        self.calls.append(("set", key))
+        self._set(key, value, ex=ex)
+
+    def mget(self, *keys):
+        self.calls.append(("mget", keys))
+        return [self.store.get(key) for key in keys]
+
+    def multi(self):
+        return FakePipeline(self, "multi-exec")
+
+    def _set(self, key, value, nx=None, ex=None):
+        if nx and key in self.store:
+            return None
+        self.store[key] = value
+        if ex:
+            self.ttls[key] = ex
+        return True
+
+    def _incr(self, key):
+        self.store[key] = str(int(self.store.get(key, 0)) + 1)  # Redis keeps counters as strings
+        return int(self.store[key])
+
+
+class FakePipeline:
+    def __init__(self, redis, kind):
+        self.redis, self.kind, self.commands = redis, kind, []
+
+    def set(self, key, value, nx=None, ex=None):
+        self.commands.append(lambda: self.redis._set(key, value, nx=nx, ex=ex))
+        return self
+
+    def incr(self, key):
+        self.commands.append(lambda: self.redis._incr(key))
+        return self
+
+    def mset(self, values):
+        self.commands.append(lambda: all(self.redis._set(key, value) for key, value in values.items()))
+        return self
+
+    def expire(self, key, seconds):
+        self.commands.append(lambda: self.redis.ttls.__setitem__(key, seconds) or 1)
+        return self
+
+    def exec(self):
+        self.redis.calls.append((self.kind, len(self.commands)))
+        return [command() for command in self.commands]
+
+
+@pytest.fixture()
+def upstash(monkeypatch):
+    fake = FakeUpstash()
+    monkeypatch.setattr(cache, "_redis_client", fake)
+    monkeypatch.setattr(cache, "_redis_checked", True)
+    monkeypatch.setattr(cache, "_near", MemoryCache(max_entries=100, sweep_seconds=60))
+    monkeypatch.setattr(cache, "_redis_stats", {"hits": 0, "misses": 0, "errors": 0})
+    return fake
+
+
+def test_near_cache_serves_hot_prefixed_keys_without_a_redis_call(upstash, clock):
+    fake = upstash
+    assert cache.cache_get("video_search:python") is None
+    fake.store["video_search:python"] = '{"items": [1, 2]}'  # written by another instance
+
+    assert cache.cache_get("video_search:python") == {"items": [1, 2]}
+    assert cache.cache_get("video_search:python") == {"items": [1, 2]}
+    assert cache.cache_get("video_search:python") == {"items": [1, 2]}
+    assert [call for call in fake.calls if call[0] == "get"] == [("get", "video_search:python")] * 2
+
+    # Past the L1 policy TTL the next read goes back to Redis
+    clock[0] += cache.CACHE_NEAR_POLICIES["video_search:"] + 1
+    cache.cache_get("video_search:python")
+    assert len([call for call in fake.calls if call[0] == "get"]) == 3
+
+    stats = cache.cache_stats()
+    assert (stats["near"]["hits"], stats["redis"]["hits"], stats["redis"]["misses"]) == (2, 2, 1)
+    assert stats["redis"]["hit_ratio"] == round(2 / 3, 4)
+
+
+def test_near_cache_writes_through_and_skips_keys_without_a_policy(upstash):
+    fake = upstash
+    cache.cache_set("jobs_search:us:soc", [{"id": 1}], 3600)
+    assert fake.store["jobs_search:us:soc"] == '[{"id": 1}]'
+    assert cache.cache_get("jobs_search:us:soc") == [{"id": 1}]  # from L1
+
+    cache.cache_set("db:primary_until:7", 123.0, 10)
+    cache.cache_get("db:primary_until:7")
+    cache.cache_get("db:primary_until:7")
+    assert [call for call in fake.calls if call[0] == "get"] == [("get", "db:primary_until:7")] * 2
+
+
+def test_near_cache_policies_parse_prefix_ttls():
+    assert cache._parse_near_policies("video_search:=300, jobs_search:=0,bad,x:=abc") == {"video_search:": 300.0}
+
+
+def test_get_many_and_set_many_are_one_round_trip_each(upstash):
+    fake = upstash
+    fake.store["jobs_search:a"] = '{"id": "a"}'
+    cache.cache_set_many({"video_search:x": {"id": "x"}, "video_search:y": {"id": "y"}, "other:z": 1}, 600)
+    # MSET plus an EXPIRE per key, in one MULTI/EXEC request
+    assert fake.calls == [("multi-exec", 4)]
+    assert fake.ttls == {"video_search:x": 600, "video_search:y": 600, "other:z": 600}
+
+    found = cache.cache_get_many(["video_search:x", "jobs_search:a", "other:z", "missing", "jobs_search:a"])
+
+    assert found == {"video_search:x": {"id": "x"}, "jobs_search:a": {"id": "a"}, "other:z": 1}
+    # video_search:x came from the near-cache; everything else in a single MGET
+    assert fake.calls[1:] == [("mget", ("jobs_search:a", "other:z", "missing"))]
+    assert cache.cache_get_many(["jobs_search:a"]) == {"jobs_search:a": {"id": "a"}}  # now near-cached too
+    assert len(fake.calls) == 2
+
+
+def test_incr_creates_counter_with_expiry_in_one_transaction(upstash):
+    fake = upstash
+    assert [cache.cache_incr("ratelimit:chat:1:99", 60) for _ in range(3)] == [1, 2, 3]
+    assert fake.calls == [("multi-exec", 2)] * 3
+    assert fake.ttls == {"ratelimit:chat:1:99": 60}
+
+
+def test_cached_video_lookup_fetches_misses_and_writes_them_in_one_request(client, auth_as, make_user, upstash, monkeypatch):
+    fake = upstash
+    fake.store["video_search:python loops"] = json.dumps({"swr_fresh_until": time.time() + 60, "value": {"video_id": "abc"}})
+
+    async def fetch_video(q):
+        if q == "cobol":
+            raise HTTPException(status_code=404, detail="No video found")
+        return {"video_id": q.replace(" ", "-")}
+    monkeypatch.setattr(video, "_fetch_video", fetch_video)
+    user = make_user(email="vid1@example.com")
+    fake.calls.clear()
+
+    resp = auth_as(user).get(
+        "/api/video/search/cached", params={"q": ["Python Loops", "rust traits", "go channels", "cobol"]},
+    )
+    assert resp.status_code == 200
+    assert resp.json() == {
+        "Python Loops": {"video_id": "abc"}, "rust traits": {"video_id": "rust-traits"},
+        "go channels": {"video_id": "go-channels"}, "cobol": None,
+    }
+    # The rate limiter's counter, one MGET for the lookups, one MSET + EXPIREs for the misses
+    assert fake.calls[1:] == [
+        ("mget", ("video_search:python loops", "video_search:rust traits", "video_search:go channels", "video_search:cobol")),
+        ("multi-exec", 3),
+    ]
+    assert cache.swr_value(json.loads(fake.store["video_search:rust traits"])) == {"video_id": "rust-traits"}
+    assert fake.ttls["video_search:go channels"] == video.CACHE_TTL
+    assert "video_search:cobol" not in fake.store
+
+
+class CountingFetch:
+    def __init__(self, fail=False):
+        self.calls, self.fail = 0, fail
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(0)
+        if self.fail:
+            raise RuntimeError("upstream down")
+        return {"version": self.calls}
+
+
+def _swr_reads(key, fetch, reads=1):
+    """`reads` concurrent-ish lookups in one event loop, then let refreshes finish."""
+    async def _main():
+        background_tasks = BackgroundTasks()
+        results = [await cache.cache_get_or_fetch(key, fetch, 60, 600, background_tasks) for _ in range(reads)]
+        await background_tasks()  # what Starlette does once the response is sent
+        return results
+    return asyncio.run(_main())
+
+
+def test_swr_serves_stale_immediately_and_refreshes_once(clock):
+    fetch = CountingFetch()
+    assert _swr_reads("video_search:swr", fetch) == [({"version": 1}, "miss")]
+    assert _swr_reads("video_search:swr", fetch) == [({"version": 1}, "fresh")]
+
+    clock[0] += 61  # past the soft TTL
+    assert _swr_reads("video_search:swr", fetch, reads=3) == [({"version": 1}, "stale")] * 3
+    assert fetch.calls == 2  # one background refresh for three stale reads
+    assert _swr_reads("video_search:swr", fetch) == [({"version": 2}, "fresh")]
+
+    clock[0] += 601  # past the hard TTL: the request waits for the upstream
+    assert _swr_reads("video_search:swr", fetch) == [({"version": 3}, "miss")]
+
+
+def test_swr_failed_refresh_keeps_stale_value_and_backs_off(clock):
+    cache.cache_set("jobs_search:legacy", [{"id": 1}], 600)  # written before SWR
+    fetch = CountingFetch(fail=True)
+
+    assert _swr_reads("jobs_search:legacy", fetch) == [([{"id": 1}], "stale")]
+    assert _swr_reads("jobs_search:legacy", fetch) == [([{"id": 1}], "stale")]
+    assert fetch.calls == 1  # the refresh lock holds off a retry
+
+    clock[0] += cache.SWR_REFRESH_LOCK_SECONDS + 1
+    fetch.fail = False
+    _swr_reads("jobs_search:legacy", fetch)
+    assert cache.cache_get("jobs_search:legacy")["value"] == {"version": 2}
+
+
+def test_swr_stale_near_cache_entry_defers_to_a_fresher_redis_copy(upstash, clock):
+    fake, fetch = upstash, CountingFetch()
+    _swr_reads("video_search:hot", fetch)
+    clock[0] += 61
+    # Another instance already refreshed Redis; our L1 copy is still the old one
+    fake.store["video_search:hot"] = '{"swr_fresh_until": %f, "value": {"version": 9}}' % (clock[0] + 60)
+
+    assert _swr_reads("video_search:hot", fetch) == [({"version": 1}, "stale")]
+    assert fetch.calls == 1  # the refresh saw the fresh Redis copy and skipped YouTube
+    assert _swr_reads("video_search:hot", fetch) == [({"version": 9}, "fresh")]
+
+
+def test_swr_stale_hit_under_a_held_lock_is_one_get(upstash, clock):
+    fake, fetch = upstash, CountingFetch(fail=True)
+    _swr_reads("jobs_search:lock", CountingFetch())
+    clock[0] += 61
+    _swr_reads("jobs_search:lock", fetch)  # takes the lock; the refresh fails
+    fake.calls.clear()
+
+    assert _swr_reads("jobs_search:lock", fetch) == [({"version": 1}, "stale")]
+    # The entry itself comes from L1 (the failed refresh re-read it); no MULTI/EXEC
+    assert fake.calls == [("get", "swr_lock:jobs_search:lock")]
+    assert fetch.calls == 1
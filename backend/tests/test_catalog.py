@@ -0,0 +1,88 @@
+"""
+Catalog course progress — completing units sets bits in completed_mask,
+`completed` flips when the last unit is done, unknown courses/units are
+rejected, and completion rates come from one aggregate query.
+"""
+from alembic import command
+from sqlalchemy import create_engine, text
+
+from app.models import CourseEnrollment
+from app.schema_version import SCHEMA_VERSION
+from app.services.course_catalog import CATALOG_COURSES
+from tests.test_schema_version import _alembic_config
+
+
+def test_completing_every_unit_marks_the_course_completed(client, auth_as, make_user, db_session):
+    client = auth_as(make_user(email="cat1@example.com"))
+    units = CATALOG_COURSES["sql-databases"]["units"]
+
+    for unit in [3, 0, 3]:
+        resp = client.post(f"/api/catalog/complete-unit/sql-databases/{unit}")
+    assert resp.json() == {"course_id": "sql-databases", "completed_units": [0, 3], "completed": False}
+
+    for unit in range(units):
+        resp = client.post(f"/api/catalog/complete-unit/sql-databases/{unit}")
+    assert resp.json()["completed"] is True
+
+    enrollment = db_session.query(CourseEnrollment).one()
+    assert enrollment.completed_mask == (1 << units) - 1
+    assert enrollment.completed_count == units
+    assert client.get("/api/catalog/enrollments").json()[0]["completed_units"] == list(range(units))
+
+
+def test_unknown_course_or_unit_is_rejected(client, auth_as, make_user, db_session):
+    client = auth_as(make_user(email="cat2@example.com"))
+
+    assert client.post("/api/catalog/enroll/not-a-course").status_code == 404
+    assert client.post("/api/catalog/complete-unit/not-a-course/0").status_code == 404
+    assert client.post("/api/catalog/complete-unit/git-devops/10").status_code == 400
+    assert client.post("/api/catalog/complete-unit/git-devops/-1").status_code == 400
+    assert db_session.query(CourseEnrollment).count() == 0
+
+
+def test_completion_rates_aggregate_all_learners_in_one_query(client, auth_as, make_user, count_statements):
+    learners = [make_user(email=f"cat-rate{i}@example.com") for i in range(4)]
+    for i, learner in enumerate(learners):
+        client = auth_as(learner)
+        client.post("/api/catalog/enroll/python-fundamentals")
+        for unit in range(10 if i < 1 else 5):
+            client.post(f"/api/catalog/complete-unit/python-fundamentals/{unit}")
+    auth_as(learners[0]).post("/api/catalog/enroll/git-devops")
+
+    platform_admin = make_user(email="cat-rate-admin@example.com", is_platform_admin=True)
+    assert auth_as(learners[0]).get("/api/catalog/completion-rates").status_code == 403
+
+    with count_statements() as statements:
+        rates = {r["course_id"]: r for r in auth_as(platform_admin).get("/api/catalog/completion-rates").json()}
+
+    assert len(statements) == 1
+    assert set(rates) == set(CATALOG_COURSES)
+    python = rates["python-fundamentals"]
+    assert (python["enrolled"], python["completed"], python["completion_rate"]) == (4, 1, 0.25)
+    assert python["average_progress"] == 0.625  # (10 + 5 + 5 + 5) / 4 of 10 units
+    assert (rates["git-devops"]["enrolled"], rates["git-devops"]["completion_rate"]) == (1, 0.0)
+    assert rates["react-development"]["enrolled"] == 0
+
+
+def test_unit_lists_are_folded_in_before_and_after_the_rollout(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'enrollments.db'}")
+    config = _alembic_config()
+    with engine.begin() as conn:
+        config.attributes["connection"] = conn
+        command.upgrade(config, "0006_ledger_archive")
+        conn.execute(text("INSERT INTO users (id, email, hashed_password, credits) VALUES (1, 'old@example.com', 'x', 0)"))
+        conn.execute(text(
+            "INSERT INTO course_enrollments (id, user_id, course_id, completed_units) "
+            "VALUES (1, 1, 'sql-databases', '[0, 1, 2, 3, 4, 5, 6, 7, 8]'), (2, 1, 'git-devops', '[2]')"
+        ))
+        command.upgrade(config, SCHEMA_VERSION)
+        assert conn.execute(text("SELECT completed_mask FROM course_enrollments ORDER BY id")).scalars().all() == [511, 4]
+        # The previous build, still serving, finishes the SQL course in the old column
+        conn.execute(text("UPDATE course_enrollments SET completed_units = '[0, 1, 2, 3, 4, 5, 6, 7, 8, 9]' WHERE id = 1"))
+        command.upgrade(config, "head")
+        rows = conn.execute(text(
+            "SELECT completed_mask, completed_count, completed FROM course_enrollments ORDER BY id"
+        )).all()
+    engine.dispose()
+
+    assert [tuple(row) for row in rows] == [(1023, 10, 1), (4, 1, 0)]
@@ -4,11 +4,24 @@ in the app — every workforce/career/roadmap endpoint relies on this behaving
 correctly. This was previously only verified manually (per the audit); these
 tests make that reproducible.
 """
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
 from fastapi import HTTPException
 import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
 
-from app.routers.credits import deduct_credits, refund_credits
-from app.models import CreditTransaction
+from app.database import Base
+from app.routers.credits import (
+    deduct_credits,
+    refund_credits,
+    reserve_credits,
+    settle_credits,
+    release_credits,
+    release_expired_holds,
+)
+from app.models import CreditTransaction, CreditHold, User
 
 
 def test_deduct_credits_reduces_balance_and_logs_transaction(db_session, make_user):
@@ -69,3 +82,120 @@ def test_refund_credits_restores_balance_and_logs_transaction(db_session, make_u
 def test_refund_credits_on_unknown_user_is_a_noop(db_session):
     result = refund_credits(db_session, user_id=999999, amount=10)
     assert result == 0
+
+
+def test_deduct_credits_keeps_loaded_user_in_sync(db_session, make_user):
+    """Routes read current_user.credits right after charging (e.g. chat's
+    credits_remaining) — the UPDATE must be reflected on the loaded row."""
+    user = make_user(credits=40)
+
+    deduct_credits(db_session, user.id, 15, "usage", "Sync Check")
+
+    assert user.credits == 25
+
+
+def test_deduct_credits_is_a_single_update_plus_ledger_insert(db_session, make_user, count_statements):
+    user = make_user(credits=100)
+    with count_statements() as statements:
+        deduct_credits(db_session, user.id, 10, "usage", "Round Trip Check")
+
+    # Previously SELECT + UPDATE + INSERT + post-commit refresh SELECT.
+    # The second INSERT is the daily-rollup upsert, which rides the same commit.
+    assert [statement.split()[0].upper() for statement in statements] == ["UPDATE", "INSERT", "INSERT"]
+
+
+def test_concurrent_deductions_never_overspend(tmp_path):
+    """Two requests racing on the same balance must not both pass the check.
+    Uses a file-backed DB so each thread gets its own connection."""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'credits.db'}",
+        connect_args={"check_same_thread": False, "timeout": 30},
+    )
+    Base.metadata.create_all(bind=engine)
+    SessionFactory = sessionmaker(bind=engine)
+
+    with SessionFactory() as setup:
+        user = User(email="race@example.com", hashed_password="x", credits=10)
+        setup.add(user)
+        setup.commit()
+        user_id = user.id
+
+    def _attempt(_):
+        with SessionFactory() as session:
+            try:
+                deduct_credits(session, user_id, 1, "usage", "Race")
+                return True
+            except HTTPException as exc:
+                assert exc.status_code == 402
+                return False
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(_attempt, range(25)))
+
+    assert results.count(True) == 10
+    with SessionFactory() as check:
+        assert check.query(User).filter(User.id == user_id).one().credits == 0
+        assert check.query(CreditTransaction).filter(CreditTransaction.user_id == user_id).count() == 10
+    engine.dispose()
+
+
+def test_reserve_then_settle_writes_a_single_usage_row(db_session, make_user):
+    user = make_user(credits=50)
+
+    hold = reserve_credits(db_session, user.id, 10, "usage", "Held Feature")
+    db_session.refresh(user)
+    assert user.credits == 40  # held credits are not spendable
+    assert db_session.query(CreditTransaction).count() == 0
+
+    settle_credits(db_session, hold)
+
+    assert db_session.query(CreditHold).count() == 0
+    tx = db_session.query(CreditTransaction).filter(CreditTransaction.user_id == user.id).one()
+    assert tx.amount == -10
+    assert tx.kind == "usage"
+    assert tx.description == "Held Feature"
+
+
+def test_release_restores_balance_without_ledger_rows(db_session, make_user):
+    user = make_user(credits=50)
+
+    hold = reserve_credits(db_session, user.id, 10, "usage", "Failing Feature")
+    new_balance = release_credits(db_session, hold)
+
+    assert new_balance == 50
+    assert db_session.query(CreditHold).count() == 0
+    assert db_session.query(CreditTransaction).count() == 0
+    # A second release (e.g. from an outer except block) must not double-credit
+    assert release_credits(db_session, hold) is None
+    db_session.refresh(user)
+    assert user.credits == 50
+
+
+def test_reserve_raises_402_when_insufficient(db_session, make_user):
+    user = make_user(credits=3)
+
+    with pytest.raises(HTTPException) as exc_info:
+        reserve_credits(db_session, user.id, 5, "usage", "Too Expensive")
+
+    assert exc_info.value.status_code == 402
+    assert exc_info.value.headers["X-Credits-Remaining"] == "3"
+    assert db_session.query(CreditHold).count() == 0
+
+
+def test_expired_holds_are_released(db_session, make_user):
+    """A worker that dies mid-call never settles or releases its hold —
+    the credits must come back once the hold expires."""
+    user = make_user(credits=20)
+    db_session.add(CreditHold(
+        user_id=user.id, amount=8, kind="usage", description="Orphaned",
+        expires_at=datetime.now(timezone.utc) - timedelta(minutes=1),
+    ))
+    db_session.query(User).filter(User.id == user.id).update({User.credits: 12})
+    db_session.commit()
+
+    assert release_expired_holds(db_session) == 1
+
+    db_session.refresh(user)
+    assert user.credits == 20
+    assert db_session.query(CreditHold).count() == 0
+    assert db_session.query(CreditTransaction).count() == 0
@@ -0,0 +1,75 @@
+"""
+Per-request SQL instrumentation — the Server-Timing header carries the
+request's query count, statements over DB_SLOW_QUERY_MS are logged with
+the route template, and pool telemetry counts waits, connects and
+invalidations.
+"""
+import logging
+import re
+import threading
+import time
+
+from sqlalchemy import create_engine
+
+from app import db_metrics
+from app.database import warm_pool
+from app.db_metrics import InstrumentedQueuePool, instrument_engine
+from app.models import CreditTransaction
+
+SERVER_TIMING = re.compile(r'^db;dur=(\d+\.\d);desc="(\d+) queries"$')
+
+
+def test_server_timing_counts_the_requests_queries(client, auth_as, make_user, db_session):
+    instrument_engine(db_session.get_bind(), "test")
+    user = make_user(email="metrics1@example.com")
+    client = auth_as(user)
+
+    no_db = SERVER_TIMING.match(client.get("/").headers["server-timing"])
+    assert no_db.group(2) == "0"
+
+    history = SERVER_TIMING.match(client.get("/api/credits/history").headers["server-timing"])
+    assert int(history.group(2)) >= 1
+
+
+def test_slow_statements_are_logged_with_the_route(client, auth_as, make_user, db_session, monkeypatch, caplog):
+    instrument_engine(db_session.get_bind(), "test")
+    user = make_user(email="metrics2@example.com")
+    db_session.add(CreditTransaction(user_id=user.id, amount=5, kind="purchase"))
+    db_session.commit()
+    monkeypatch.setattr(db_metrics, "DB_SLOW_QUERY_MS", 0.000001)
+
+    with caplog.at_level(logging.WARNING, logger="app.db_metrics"):
+        auth_as(user).get("/api/credits/history")
+        auth_as(user).get(f"/api/admin/organizations/{user.id + 1000}/members")
+
+    messages = [r.getMessage() for r in caplog.records]
+    assert any("GET /api/credits/history" in m and "credit_transactions" in m for m in messages)
+    assert any("GET /api/admin/organizations/{org_id}/members" in m for m in messages)
+
+
+def test_pool_telemetry_tracks_warmup_waits_and_invalidations(tmp_path, client, auth_as, make_user):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=InstrumentedQueuePool,
+                           pool_size=2, max_overflow=0, pool_timeout=5)
+    instrument_engine(engine, "test-pool")
+    try:
+        assert warm_pool(engine, 2) == 2
+
+        held = [engine.connect(), engine.connect()]
+        threading.Timer(0.2, held[0].close).start()
+        waiting = engine.connect()  # blocks until the timer returns a connection
+        waiting.invalidate()
+        waiting.close()
+        held[1].close()
+
+        stats = next(p for p in db_metrics.pool_stats() if p["engine"] == "test-pool")
+        assert (stats["connects"], stats["invalidations"], stats["checked_out"]) == (2, 1, 0)
+        assert stats["checkout_wait_max_ms"] >= 150
+        assert stats["checkout_wait_ms"]["<=500ms"] == 1
+
+        assert auth_as(make_user(email="metrics3@example.com")).get("/api/admin/metrics/db").status_code == 403
+        admin = make_user(email="metrics-admin@example.com", is_platform_admin=True)
+        pools = auth_as(admin).get("/api/admin/metrics/db").json()["pools"]
+        assert "test-pool" in {p["engine"] for p in pools}
+    finally:
+        db_metrics._instrumented.pop("test-pool", None)
+        engine.dispose()
@@ -0,0 +1,63 @@
+"""
+Credit ledger archival — old months move to the archive table with a
+carry-forward summary, and the org AI-interaction totals (from rollups)
+read the same before and after, including after a rollup rebuild.
+"""
+from datetime import date, datetime, timezone
+
+from app.models import CreditLedgerMonth, CreditTransaction, CreditTransactionArchive
+from app.services.ledger_archive import archive_credit_ledger
+from app.services.usage_rollup import rebuild_usage_rollups
+
+
+def _ledger(db_session, user_id, amount, kind, description, created_at):
+    db_session.add(CreditTransaction(
+        user_id=user_id, amount=amount, kind=kind, description=description, created_at=created_at,
+    ))
+
+
+def test_archive_moves_old_months_and_keeps_totals(client, auth_as, make_user, db_session):
+    owner = make_user(email="ledger-owner@example.com")
+    org = auth_as(owner).post("/api/admin/organizations", json={"name": "Ledger Org"}).json()
+    rows = [
+        (-10, "usage", "Workforce Analysis & Comparison", datetime(2026, 1, 5, tzinfo=timezone.utc)),
+        (-10, "usage", "Workforce Analysis & Comparison", datetime(2026, 1, 20, tzinfo=timezone.utc)),
+        (100, "purchase", None, datetime(2026, 1, 21, tzinfo=timezone.utc)),
+        (-1, "usage", "AI Career Mentor chat", datetime(2026, 2, 14, tzinfo=timezone.utc)),
+        (-10, "usage", "Workforce Analysis & Comparison", datetime(2026, 3, 2, tzinfo=timezone.utc)),
+    ]
+    for amount, kind, description, created_at in rows:
+        _ledger(db_session, owner.id, amount, kind, description, created_at)
+    db_session.commit()
+    rebuild_usage_rollups(db_session, since=date(2026, 1, 1))
+    url = f"/api/admin/organizations/{org['id']}/ai-interactions"
+    before = auth_as(owner).get(url).json()
+
+    assert archive_credit_ledger(db_session, before=date(2026, 3, 1)) == 4
+    assert archive_credit_ledger(db_session, before=date(2026, 3, 1)) == 0  # re-run is a no-op
+
+    assert db_session.query(CreditTransaction).count() == 1
+    assert db_session.query(CreditTransactionArchive).count() == 4
+    months = {
+        (m.month, m.kind, m.description): (m.transaction_count, m.amount)
+        for m in db_session.query(CreditLedgerMonth)
+    }
+    assert months == {
+        (date(2026, 1, 1), "usage", "Workforce Analysis & Comparison"): (2, -20),
+        (date(2026, 1, 1), "purchase", "Unknown"): (1, 100),
+        (date(2026, 2, 1), "usage", "AI Career Mentor chat"): (1, -1),
+    }
+
+    after = auth_as(owner).get(url).json()
+    assert after["by_feature"] == before["by_feature"]
+    assert after["total_credits_used"] == before["total_credits_used"] == 31
+    # Rollups keep day granularity for archived months too
+    bounded = auth_as(owner).get(url, params={"start": "2026-02-10T00:00:00+00:00"}).json()
+    assert bounded["by_feature"] == [
+        {"feature": "AI Career Mentor chat", "count": 1, "total_credits_used": 1},
+        {"feature": "Workforce Analysis & Comparison", "count": 1, "total_credits_used": 10},
+    ]
+
+    # A rebuild over archived months reads the archive instead of wiping them
+    assert rebuild_usage_rollups(db_session, since=date(2026, 1, 1)) == 4
+    assert auth_as(owner).get(url).json()["by_feature"] == before["by_feature"]
@@ -0,0 +1,53 @@
+"""
+Keyset pagination on the per-user list endpoints — pages must be disjoint,
+ordered newest-first, stable when rows share a created_at, and scoped to the
+caller.
+"""
+from datetime import datetime, timezone
+
+from app.models import ExceptionModel, Lesson
+
+
+def test_my_lessons_pages_through_every_row_exactly_once(client, auth_as, make_user, db_session):
+    user = make_user(email="pager1@example.com")
+    other = make_user(email="pager2@example.com")
+    # Same timestamp for several rows: the id tiebreaker has to keep pages disjoint
+    same_time = datetime(2026, 3, 1, tzinfo=timezone.utc)
+    for i in range(5):
+        db_session.add(Lesson(user_id=user.id, title=f"Lesson {i}", modules=[], quiz_questions=[], created_at=same_time))
+    db_session.add(Lesson(user_id=other.id, title="Someone else's lesson", modules=[], quiz_questions=[], created_at=same_time))
+    db_session.commit()
+
+    client = auth_as(user)
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        page = client.get("/api/lessons/my-lessons", params=params).json()
+        seen.extend(lesson["title"] for lesson in page["items"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+    assert seen == [f"Lesson {i}" for i in reversed(range(5))]
+
+
+def test_exceptions_list_uses_page_envelope(client, auth_as, make_user, db_session):
+    user = make_user(email="pager3@example.com")
+    db_session.add(ExceptionModel(user_id=user.id, type="late", remarks="traffic", duration=60))
+    db_session.commit()
+
+    data = auth_as(user).get("/api/exceptions/exceptions").json()
+
+    assert data["next_cursor"] is None
+    assert [(e["type"], e["duration"]) for e in data["items"]] == [("late", 60)]
+
+
+def test_list_endpoints_reject_malformed_cursor_and_oversized_limit(client, auth_as, make_user):
+    client = auth_as(make_user(email="pager4@example.com"))
+
+    for path in ("/api/roadmap/all", "/api/resume/my-resumes", "/api/workforce/context"):
+        assert client.get(path).json() == {"items": [], "next_cursor": None}
+        assert client.get(path, params={"cursor": "garbage"}).status_code == 400
+        assert client.get(path, params={"limit": 10_000}).status_code == 422
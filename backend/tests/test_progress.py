@@ -0,0 +1,127 @@
+"""
+Progress upserts — repeated saves for the same lesson update one row
+(latest completion, accumulated time, appended quiz scores), and the
+dashboard counts completions in SQL.
+"""
+from alembic import command
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from app.auth import get_current_user_optional
+from app.main import app
+from app.models import Lesson, UserProgress
+from app.schema_version import SCHEMA_VERSION, schema_status
+from app.services.progress import record_progress
+from tests.test_schema_version import _alembic_config
+
+
+def _lesson(db_session, user, title):
+    lesson = Lesson(user_id=user.id, title=title, modules=[], quiz_questions=[])
+    db_session.add(lesson)
+    db_session.commit()
+    return lesson.id
+
+
+def test_repeated_saves_update_a_single_row(client, auth_as, make_user, db_session):
+    user = make_user(email="progress1@example.com")
+    lesson_id = _lesson(db_session, user, "Phishing triage")
+    client = auth_as(user)
+
+    saves = [
+        {"completion_percentage": 20, "time_spent_minutes": 5},
+        {"completion_percentage": 60, "time_spent_minutes": 7, "quiz_score": 70},
+        {"completion_percentage": 100, "time_spent_minutes": 3, "quiz_score": 90},
+    ]
+    ids = {
+        client.post("/api/dashboard/progress", json={"lesson_id": lesson_id, "progress_type": "lesson", **save})
+        .json()["progress_id"]
+        for save in saves
+    }
+
+    assert len(ids) == 1
+    db_session.expire_all()
+    row = db_session.query(UserProgress).one()
+    assert (row.completion_percentage, row.time_spent, row.quiz_scores) == (100, 15, [70, 90])
+
+
+def test_dashboard_counts_completed_and_in_progress_lessons(client, auth_as, make_user, db_session):
+    user = make_user(email="progress2@example.com")
+    done, started = _lesson(db_session, user, "Done"), _lesson(db_session, user, "Started")
+    client = auth_as(user)
+
+    for lesson_id, pct in ((done, 40), (done, 100), (started, 10), (started, 30)):
+        client.post("/api/dashboard/progress", json={
+            "lesson_id": lesson_id, "progress_type": "lesson",
+            "completion_percentage": pct, "time_spent_minutes": 1,
+        })
+
+    app.dependency_overrides[get_current_user_optional] = lambda: user
+    try:
+        stats = client.get("/api/dashboard/stats").json()
+    finally:
+        app.dependency_overrides.pop(get_current_user_optional, None)
+    assert (stats["courses_completed"], stats["lessons_in_progress"]) == (1, 1)
+
+
+def test_migration_collapses_existing_progress_history(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'progress.db'}")
+    config = _alembic_config()
+    with engine.begin() as conn:
+        config.attributes["connection"] = conn
+        command.upgrade(config, "0002_holds_rollups")
+        conn.execute(text("INSERT INTO users (id, email, hashed_password, credits) VALUES (1, 'old@example.com', 'x', 0)"))
+        conn.execute(text("INSERT INTO lessons (id, user_id, title) VALUES (5, 1, 'Old lesson')"))
+        conn.execute(text(
+            "INSERT INTO user_progress (user_id, lesson_id, progress_type, completion_percentage, time_spent, quiz_scores) "
+            "VALUES (1, 5, 'lesson', 30, 10, '[60]'), (1, 5, 'lesson', 80, 20, NULL), "
+            "(1, 5, 'lesson', 90, 5, '[75]'), (1, NULL, 'certification', 50, 1, NULL)"
+        ))
+        command.upgrade(config, "head")
+
+    with engine.connect() as conn:
+        rows = conn.execute(text(
+            "SELECT progress_type, target_id, completion_percentage, time_spent, quiz_scores "
+            "FROM user_progress ORDER BY progress_type"
+        )).all()
+    engine.dispose()
+
+    assert [tuple(row) for row in rows] == [
+        ("certification", 0, 50, 1, None),
+        ("lesson", 5, 90, 35, "[60, 75]"),
+    ]
+
+
+def test_saves_before_the_contract_migration_merge_with_the_previous_builds_rows(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'rollout.db'}")
+    config = _alembic_config()
+    with engine.begin() as conn:
+        config.attributes["connection"] = conn
+        command.upgrade(config, SCHEMA_VERSION)
+        conn.execute(text("INSERT INTO users (id, email, hashed_password, credits) VALUES (1, 'old@example.com', 'x', 0)"))
+        conn.execute(text("INSERT INTO lessons (id, user_id, title) VALUES (5, 1, 'Old lesson')"))
+        # The previous build, still serving: a new row per save, target_id left at 0
+        conn.execute(text(
+            "INSERT INTO user_progress (user_id, lesson_id, progress_type, completion_percentage, time_spent) "
+            "VALUES (1, 5, 'lesson', 30, 10), (1, 5, 'lesson', 40, 5)"
+        ))
+
+    schema_status.clear()
+    try:
+        with Session(engine) as db:
+            first = record_progress(db, 1, "lesson", 60, 2, lesson_id=5, quiz_score=70)
+            second = record_progress(db, 1, "lesson", 80, 3, lesson_id=5)
+            db.commit()
+        assert first == second
+    finally:
+        schema_status.clear()
+
+    with engine.begin() as conn:
+        config.attributes["connection"] = conn
+        command.upgrade(config, "head")
+    with engine.connect() as conn:
+        rows = conn.execute(text(
+            "SELECT target_id, completion_percentage, time_spent, quiz_scores FROM user_progress"
+        )).all()
+    engine.dispose()
+
+    assert [tuple(row) for row in rows] == [(5, 80, 20, "[70]")]
@@ -0,0 +1,70 @@
+"""
+Replica routing decisions — GETs go to the replica, writes pin the writing
+user to the primary for the sticky window, and nothing changes when no
+replica is configured.
+"""
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.testclient import TestClient
+import pytest
+
+from app import replica_routing
+from app.auth import create_access_token
+
+
+def _probe_app():
+    probe = FastAPI()
+    probe.middleware("http")(replica_routing.replica_routing_middleware)
+
+    @probe.get("/read")
+    def read(request: Request):
+        return {"use_replica": getattr(request.state, "use_replica", False)}
+
+    @probe.post("/write")
+    def write():
+        return {"ok": True}
+
+    @probe.post("/fail")
+    def fail():
+        raise HTTPException(status_code=400, detail="nope")
+
+    return TestClient(probe)
+
+
+@pytest.fixture()
+def with_replica(monkeypatch):
+    monkeypatch.setattr(replica_routing, "has_replica", lambda: True)
+
+
+def _auth(user_id):
+    return {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"}
+
+
+def test_reads_route_to_replica_until_the_user_writes(with_replica):
+    client = _probe_app()
+    alice, bob = _auth(9001), _auth(9002)
+
+    assert client.get("/read", headers=alice).json() == {"use_replica": True}
+    assert client.get("/read").json() == {"use_replica": True}  # anonymous reads too
+
+    client.post("/write", headers=alice)
+
+    assert client.get("/read", headers=alice).json() == {"use_replica": False}
+    assert client.get("/read", headers=bob).json() == {"use_replica": True}
+
+
+def test_failed_writes_and_expired_windows_do_not_pin(with_replica, monkeypatch):
+    client = _probe_app()
+    carol = _auth(9003)
+
+    client.post("/fail", headers=carol)
+    assert client.get("/read", headers=carol).json() == {"use_replica": True}
+
+    client.post("/write", headers=carol)
+    clock = replica_routing.time.time() + replica_routing.REPLICA_STICKY_SECONDS + 1
+    monkeypatch.setattr(replica_routing.time, "time", lambda: clock)
+    assert client.get("/read", headers=carol).json() == {"use_replica": True}
+
+
+def test_no_replica_means_no_routing():
+    client = _probe_app()
+    assert client.get("/read", headers=_auth(9004)).json() == {"use_replica": False}
@@ -0,0 +1,83 @@
+"""
+Migrations are now the only thing that creates tables outside of tests, so
+they must stay in lockstep with the models — and the startup check's
+SCHEMA_VERSION/SCHEMA_CONTRACT must name the Alembic head.
+"""
+from pathlib import Path
+
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine, text
+
+from app import schema_version
+from app.database import Base
+from app.schema_version import SCHEMA_CONTRACT, SCHEMA_VERSION, check_schema_version, schema_status
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def _alembic_config() -> Config:
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND_DIR / "alembic"))
+    return config
+
+
+def test_schema_version_matches_alembic_head():
+    scripts = ScriptDirectory.from_config(_alembic_config())
+    assert scripts.get_current_head() == (SCHEMA_CONTRACT or SCHEMA_VERSION)
+    if SCHEMA_CONTRACT:
+        # The contract is a single migration straight after what the build needs
+        assert scripts.get_revision(SCHEMA_CONTRACT).down_revision == SCHEMA_VERSION
+
+
+def test_migrations_produce_the_model_schema(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'migrated.db'}")
+    config = _alembic_config()
+    with engine.begin() as conn:
+        config.attributes["connection"] = conn
+        command.upgrade(config, "head")
+
+    with engine.connect() as conn:
+        assert compare_metadata(MigrationContext.configure(conn), Base.metadata) == []
+
+    schema_status.clear()
+    try:
+        assert check_schema_version(engine)["ok"] is True
+    finally:
+        schema_status.clear()
+    engine.dispose()
+
+
+def test_mismatch_is_rechecked_until_the_migration_lands(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(schema_version.time, "monotonic", lambda: now[0])
+    engine = create_engine(f"sqlite:///{tmp_path / 'behind.db'}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE alembic_version (version_num VARCHAR(32) NOT NULL)"))
+        conn.execute(text("INSERT INTO alembic_version VALUES ('0001_baseline')"))
+
+    schema_status.clear()
+    try:
+        assert check_schema_version(engine)["current"] == "0001_baseline"
+        with engine.begin() as conn:
+            conn.execute(text("UPDATE alembic_version SET version_num = :head"), {"head": SCHEMA_VERSION})
+        assert check_schema_version(engine)["ok"] is False  # within the recheck interval
+
+        now[0] += schema_version.SCHEMA_RECHECK_SECONDS
+        assert check_schema_version(engine)["ok"] is True
+        if SCHEMA_CONTRACT:
+            assert schema_status["contract_pending"] is True
+            with engine.begin() as conn:
+                conn.execute(text("UPDATE alembic_version SET version_num = :head"), {"head": SCHEMA_CONTRACT})
+            now[0] += schema_version.SCHEMA_RECHECK_SECONDS
+            assert check_schema_version(engine)["contract_pending"] is False
+        with engine.begin() as conn:
+            conn.execute(text("DROP TABLE alembic_version"))
+        now[0] += schema_version.SCHEMA_RECHECK_SECONDS
+        assert check_schema_version(engine)["ok"] is True  # a match is cached for good
+    finally:
+        schema_status.clear()
+    engine.dispose()
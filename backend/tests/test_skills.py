@@ -0,0 +1,77 @@
+"""
+Skill taxonomy — spelling variants resolve to one canonical skill, workforce
+extraction writes participant-skill facts, and org analytics count canonical
+skills rather than raw strings.
+"""
+from unittest.mock import patch
+
+from app.models import ParticipantSkill, Skill, WorkforceAnalysis, WorkforceProfile
+from app.services.skills import normalize_skill_key, rebuild_participant_skills, record_participant_skills, resolve_skill_ids
+
+
+def test_spelling_variants_resolve_to_one_canonical_skill(db_session):
+    assert normalize_skill_key("SIEM (Splunk)") == normalize_skill_key("splunk  SIEM") == "siem splunk"
+
+    ids = resolve_skill_ids(db_session, ["Splunk", "splunk SIEM", "SIEM (Splunk)", "SIEM", "  siem ", "", None])
+    assert len(ids) == 2
+    assert resolve_skill_ids(db_session, ["SPLUNK", "Security Information and Event Management"]) == ids
+    assert sorted(name for (name,) in db_session.query(Skill.name)) == ["SIEM", "Splunk"]
+
+    # Lookups never write: a builtin spelling not seen yet still resolves, anything else is dropped
+    splunk_id = resolve_skill_ids(db_session, ["Splunk"])
+    assert resolve_skill_ids(db_session, ["Splunk Enterprise", "COBOL"], create=False) == splunk_id
+    assert db_session.query(Skill).count() == 2
+
+
+def test_resume_extraction_records_extracted_skill_facts(client, auth_as, make_user, db_session):
+    user = make_user(email="skills1@example.com", credits=100)
+    with patch("app.routers.workforce.get_gemini_json_response",
+               return_value={"skills": ["splunk SIEM", "Incident Handling", "Python"]}):
+        auth_as(user).post(
+            "/api/workforce/profile/upload-resume",
+            files={"file": ("resume.txt", b"Jane Doe", "text/plain")},
+        )
+
+    facts = (
+        db_session.query(Skill.name)
+        .join(ParticipantSkill, ParticipantSkill.skill_id == Skill.id)
+        .filter(ParticipantSkill.user_id == user.id, ParticipantSkill.source == "extracted")
+    )
+    assert sorted(name for (name,) in facts) == ["Incident Response", "Python", "Splunk"]
+
+
+def test_readiness_summary_counts_canonical_missing_skills(client, auth_as, make_user, db_session):
+    owner = make_user(email="skills-owner@example.com")
+    org = auth_as(owner).post("/api/admin/organizations", json={"name": "Skills Org"}).json()
+    spellings = ["Splunk", "splunk SIEM", "SIEM (Splunk)"]
+    for i, spelling in enumerate(spellings):
+        member = make_user(email=f"skills-member{i}@example.com")
+        auth_as(owner).post(f"/api/admin/organizations/{org['id']}/members", json={"email": member.email})
+        record_participant_skills(db_session, member.id, "missing", [spelling, "IAM"] if i else [spelling])
+    db_session.commit()
+
+    summary = auth_as(owner).get(f"/api/admin/organizations/{org['id']}/readiness-summary").json()
+    assert summary["most_common_missing_skills"] == [
+        {"skill": "Splunk", "count": 3},
+        {"skill": "Identity and Access Management", "count": 2},
+    ]
+
+
+def test_rebuild_backfills_facts_from_latest_json(db_session, make_user):
+    user = make_user(email="skills2@example.com")
+    db_session.add_all([
+        WorkforceProfile(user_id=user.id, primary_skills=["Linux"], extracted_skills=["Azure Sentinel"]),
+        WorkforceAnalysis(user_id=user.id, missing_skills=["Active Directory"]),
+    ])
+    db_session.commit()
+
+    assert rebuild_participant_skills(db_session) == 1
+    facts = (
+        db_session.query(ParticipantSkill.source, Skill.name)
+        .join(Skill, Skill.id == ParticipantSkill.skill_id)
+        .order_by(ParticipantSkill.source)
+        .all()
+    )
+    assert [tuple(f) for f in facts] == [
+        ("extracted", "Microsoft Sentinel"), ("missing", "Active Directory"), ("self_reported", "Linux"),
+    ]
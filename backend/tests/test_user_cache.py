@@ -0,0 +1,55 @@
+"""
+get_current_user's short-TTL user cache — warm requests must skip the users
+SELECT, and any committed change to the user (ORM edit or bulk credit
+UPDATE) must be visible on the very next request.
+"""
+from fastapi import HTTPException
+import pytest
+
+from app import user_cache
+from app.auth import create_access_token, get_current_user
+from app.routers.credits import deduct_credits
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache():
+    # Each test gets a new in-memory DB, so user ids repeat across tests.
+    user_cache.clear()
+    yield
+    user_cache.clear()
+
+
+def test_warm_lookup_skips_the_users_select(db_session, make_user, count_statements):
+    user = make_user(email="cache1@example.com")
+    token = create_access_token({"sub": str(user.id)})
+    db_session.expunge_all()
+
+    get_current_user(token=token, db=db_session)
+    db_session.expunge_all()
+    with count_statements() as statements:
+        cached = get_current_user(token=token, db=db_session)
+
+    assert statements == []
+    assert cached.email == "cache1@example.com"
+    assert cached in db_session  # attached, so routes can still modify and commit it
+
+
+def test_profile_and_credit_changes_invalidate(db_session, make_user):
+    user_id = make_user(email="cache2@example.com", credits=50).id
+    token = create_access_token({"sub": str(user_id)})
+
+    current = get_current_user(token=token, db=db_session)
+    current.full_name = "Renamed"
+    db_session.commit()
+    db_session.expunge_all()
+    assert get_current_user(token=token, db=db_session).full_name == "Renamed"
+
+    deduct_credits(db_session, user_id, 20, "usage", "Cache Check")
+    db_session.expunge_all()
+    assert get_current_user(token=token, db=db_session).credits == 30
+
+
+def test_unknown_user_is_rejected(db_session):
+    with pytest.raises(HTTPException) as exc_info:
+        get_current_user(token=create_access_token({"sub": "424242"}), db=db_session)
+    assert exc_info.value.status_code == 401
@@ -6,6 +6,10 @@ separately been verified against the real API — see docs/TrainPi-Remaining-Che
 """
 from unittest.mock import patch
 
+from sqlalchemy import event
+
+from app.models import OrganizationDocument
+
 
 def test_resume_upload_deducts_credits_on_success(client, auth_as, make_user):
     user = make_user(email="wf1@example.com", credits=100)
@@ -50,7 +54,11 @@ def test_resume_upload_refunds_credits_on_ai_failure(client, auth_as, make_user)
     assert data["extracted_skills"] == []
 
     balance = client.get("/api/credits/balance").json()
-    assert balance["credits"] == 100  # refunded back to full
+    assert balance["credits"] == 100  # hold released back to full
+
+    # The failed call leaves no deduct/refund pair behind in the ledger
+    history = client.get("/api/credits/history").json()
+    assert history == []
 
 
 def test_resume_upload_rejects_when_insufficient_credits(client, auth_as, make_user):
@@ -131,3 +139,42 @@ def test_context_upload_extracts_all_documented_fields(client, auth_as, make_use
     assert data["document_type"] == "Incident Response SOP"
     assert data["extracted_compliance_requirements"] == ["CP-114"]
     assert data["extracted_mission_objectives"] == ["24/7 coverage"]
+
+
+def test_listing_context_documents_never_loads_parsed_text(client, auth_as, make_user, db_session, count_statements):
+    user = make_user(email="wf8@example.com")
+    db_session.add(OrganizationDocument(
+        user_id=user.id, name="sop.txt", category="sop", size_kb=15, parsed_text="confidential " * 1000,
+    ))
+    db_session.commit()
+
+    with count_statements() as statements:
+        resp = auth_as(user).get("/api/workforce/context")
+
+    assert [d["name"] for d in resp.json()["items"]] == ["sop.txt"]
+    assert not any("parsed_text" in statement for statement in statements)
+    # Still there when something actually asks for it
+    doc = db_session.query(OrganizationDocument).one()
+    assert doc.parsed_text.startswith("confidential")
+
+
+def test_resume_upload_commits_once_before_and_once_after_the_ai_call(client, auth_as, make_user, db_session):
+    user = make_user(email="wf9@example.com", credits=100)
+    client = auth_as(user)
+
+    commits = []
+    record = lambda session: commits.append(session)
+    event.listen(db_session, "after_commit", record)
+    try:
+        with patch("app.routers.workforce.get_gemini_json_response", return_value={"skills": ["triage"]}):
+            resp = client.post(
+                "/api/workforce/profile/upload-resume",
+                files={"file": ("resume.txt", b"Jane Doe, SOC Analyst", "text/plain")},
+            )
+    finally:
+        event.remove(db_session, "after_commit", record)
+
+    assert resp.status_code == 200
+    assert resp.json()["resume_filename"] == "resume.txt"
+    # Profile + hold, then extraction + settle — no transaction held across the AI call
+    assert len(commits) == 2
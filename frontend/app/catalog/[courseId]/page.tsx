@@ -9,7 +9,7 @@ import {
 } from 'lucide-react'
 import YouTubePlayer from '@/components/YouTubePlayer'
 import { getCourse, getCompletionPct } from '@/lib/courseCatalog'
-import { catalogAPI, chatAPI } from '@/lib/api'
+import { catalogAPI, chatAPI, videoAPI } from '@/lib/api'
 import { useAuthStore } from '@/store/authStore'
 import DashboardShell from '@/components/layout/DashboardShell'
 import toast from 'react-hot-toast'
@@ -36,6 +36,8 @@ export default function CourseViewerPage({ params }: { params: { courseId: strin
   const [enrolling, setEnrolling] = useState(false)
   const [activeUnit, setActiveUnit] = useState(0)
   const [marking, setMarking] = useState(false)
+  // unit.search -> video_id from /search/cached (null: search on demand)
+  const [cachedVideos, setCachedVideos] = useState<Record<string, string | null> | null>(null)
 
   const [messages, setMessages] = useState<ChatMsg[]>([])
   const [chatInput, setChatInput] = useState('')
@@ -54,6 +56,18 @@ export default function CourseViewerPage({ params }: { params: { courseId: strin
       .finally(() => setLoading(false))
   }, [isAuthenticated, courseId, course, router])
 
+  // One request for every unit's video, so switching units doesn't cost a
+  // /search round trip each; the server fills in and caches misses, and any
+  // unit it left null still searches on demand.
+  useEffect(() => {
+    if (!enrollment || !course || cachedVideos) return
+    videoAPI.searchCached(course.units.map((u) => u.search))
+      .then((found) => setCachedVideos(Object.fromEntries(
+        Object.entries(found).map(([q, video]) => [q, video?.video_id ?? null]),
+      )))
+      .catch(() => setCachedVideos({}))
+  }, [enrollment, course, cachedVideos])
+
   useEffect(() => {
     chatEndRef.current?.scrollIntoView({ behavior: 'smooth' })
   }, [messages, chatLoading])
@@ -161,8 +175,12 @@ export default function CourseViewerPage({ params }: { params: { courseId: strin
 
           {/* Video player */}
           <div className="space-y-3">
-            {enrollment ? (
-              <YouTubePlayer query={unit.search} title={unit.title} />
+            {enrollment && cachedVideos ? (
+              <YouTubePlayer query={unit.search} title={unit.title} cachedVideoId={cachedVideos[unit.search]} />
+            ) : enrollment ? (
+              <div className="rounded-2xl overflow-hidden border border-slate-200 bg-slate-900 flex items-center justify-center" style={{ aspectRatio: '16/9' }}>
+                <Loader2 className="animate-spin text-white/40" size={32} />
+              </div>
             ) : (
               <div className="rounded-2xl overflow-hidden border border-slate-200 bg-gradient-to-br from-slate-900 to-slate-800" style={{ aspectRatio: '16/9' }}>
                 <div className="w-full h-full flex flex-col items-center justify-center text-white gap-3">
@@ -7,9 +7,11 @@ import { Loader2, Youtube } from 'lucide-react'
 interface Props {
   query: string
   title?: string
+  // Already-resolved video for `query` (e.g. from videoAPI.searchCached) — skips the search call
+  cachedVideoId?: string | null
 }
 
-export default function YouTubePlayer({ query, title }: Props) {
+export default function YouTubePlayer({ query, title, cachedVideoId }: Props) {
   const [videoId, setVideoId] = useState<string | null>(null)
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState<string | null>(null)
@@ -18,9 +20,14 @@ export default function YouTubePlayer({ query, title }: Props) {
   useEffect(() => {
     if (!query || query === lastQuery.current) return
     lastQuery.current = query
+    setError(null)
+    if (cachedVideoId) {
+      setVideoId(cachedVideoId)
+      setLoading(false)
+      return
+    }
     setLoading(true)
     setVideoId(null)
-    setError(null)
     videoAPI.search(query)
       .then((res) => setVideoId(res.video_id))
       .catch((err) => {
@@ -28,7 +35,7 @@ export default function YouTubePlayer({ query, title }: Props) {
         setError(detail)
       })
       .finally(() => setLoading(false))
-  }, [query])
+  }, [query, cachedVideoId])
 
   return (
     <div className="rounded-2xl overflow-hidden shadow-xl border border-slate-200 bg-slate-900">
@@ -72,6 +72,21 @@ api.interceptors.response.use(
 
 const delay = (ms: number) => new Promise((r) => setTimeout(r, ms));
 
+// List endpoints return keyset pages ({ items, next_cursor }); follow the
+// cursor so callers still get the whole list, at the backend's max page size.
+async function getAllPages<T = any>(url: string): Promise<T[]> {
+  const items: T[] = [];
+  let cursor: string | null = null;
+  do {
+    const { data }: { data: { items: T[]; next_cursor: string | null } } = await api.get(url, {
+      params: { limit: 200, ...(cursor ? { cursor } : {}) },
+    });
+    items.push(...data.items);
+    cursor = data.next_cursor;
+  } while (cursor);
+  return items;
+}
+
 function mockUser(email: string, fullName?: string) {
   const name = fullName || email.replace(/@.*/, '').replace(/[._]/g, ' ') || 'User';
   return {
@@ -179,6 +194,15 @@ export const authAPI = {
     return data;
   },
 
+  deleteAccount: async () => {
+    if (MOCK_ONLY) {
+      await delay(200);
+      return { message: 'Account deleted' };
+    }
+    const { data } = await api.delete('/api/auth/me');
+    return data;
+  },
+
   forgotPassword: async (_email: string) => {
     if (MOCK_ONLY) {
       await delay(300);
@@ -295,8 +319,7 @@ export const roadmapAPI = {
         created_at: new Date().toISOString(),
       }];
     }
-    const { data } = await api.get('/api/roadmap/all');
-    return data;
+    return getAllPages('/api/roadmap/all');
   },
 
   updateProgress: async (roadmapId: number, stepNumber: number) => {
@@ -344,8 +367,7 @@ export const resumeAPI = {
       await delay(200);
       return DEMO_RESUMES;
     }
-    const { data } = await api.get('/api/resume/my-resumes');
-    return data;
+    return getAllPages('/api/resume/my-resumes');
   },
 
   getResume: async (resumeId: number) => {
@@ -394,8 +416,7 @@ export const lessonsAPI = {
       await delay(200);
       return getLessonsWithDefaults();
     }
-    const { data } = await api.get('/api/lessons/my-lessons');
-    return data;
+    return getAllPages('/api/lessons/my-lessons');
   },
 
   getLesson: async (lessonId: number) => {
@@ -665,8 +686,7 @@ export const exceptionsAPI = {
         duration: e.duration_seconds ?? undefined,
       }));
     }
-    const { data } = await api.get('/api/exceptions/exceptions');
-    return data;
+    return getAllPages('/api/exceptions/exceptions');
   },
 
   createException: async (
@@ -727,6 +747,14 @@ export const catalogAPI = {
     const { data } = await api.post(`/api/catalog/complete-unit/${courseId}/${unitIndex}`);
     return data;
   },
+  getCompletionRates: async (): Promise<{
+    course_id: string; title: string; unit_count: number; enrolled: number;
+    completed: number; completion_rate: number; average_progress: number;
+  }[]> => {
+    if (MOCK_ONLY) return [];
+    const { data } = await api.get('/api/catalog/completion-rates');
+    return data;
+  },
 };
 
 // Save any provider API key
@@ -749,6 +777,16 @@ export const videoAPI = {
     const { data } = await api.get('/api/video/search', { params: { q } });
     return data;
   },
+
+  // Several searches at once; misses are looked up and cached server-side (null = not found or over the per-request limit; use search() for those)
+  searchCached: async (queries: string[]): Promise<Record<string, { video_id: string; title: string; channel: string; thumbnail: string } | null>> => {
+    if (MOCK_ONLY) return Object.fromEntries(queries.map((q) => [q, null]));
+    const { data } = await api.get('/api/video/search/cached', {
+      params: { q: queries },
+      paramsSerializer: { indexes: null },
+    });
+    return data;
+  },
 };
 
 // ──────────────────────────────────────────────────────────────────────────
@@ -837,8 +875,7 @@ export const workforceAPI = {
   },
 
   listContextDocuments: async () => {
-    const { data } = await api.get('/api/workforce/context');
-    return data;
+    return getAllPages('/api/workforce/context');
   },
 
   deleteContextDocument: async (docId: number) => {
@@ -937,6 +974,23 @@ export const adminAPI = {
     return data;
   },
 
+  bulkInviteMembers: async (
+    orgId: number,
+    members: { email: string; role?: 'participant' | 'org_admin' }[] = [],
+    csv?: string,
+  ) => {
+    const { data } = await api.post(`/api/admin/organizations/${orgId}/members/bulk`, { members, csv });
+    return data;
+  },
+
+  grantCredits: async (
+    orgId: number,
+    grant: { amount: number; description?: string; role?: 'participant' | 'org_admin'; user_ids?: number[] },
+  ) => {
+    const { data } = await api.post(`/api/admin/organizations/${orgId}/credits/grant`, grant);
+    return data;
+  },
+
   removeMember: async (orgId: number, userId: number) => {
     const { data } = await api.delete(`/api/admin/organizations/${orgId}/members/${userId}`);
     return data;